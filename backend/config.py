@@ -19,6 +19,81 @@ SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_KEY")  # Service role key
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")  # Default to HS256 if not set
 
+# How get_current_user verifies access tokens: "supabase" (ask Supabase Auth on every request)
+# or "local" (check signature, expiry and audience here: HS* with JWT_SECRET_KEY, RS*/ES* with the project's JWKS)
+AUTH_VERIFICATION_MODE = os.getenv("AUTH_VERIFICATION_MODE", "supabase").lower()
+SUPABASE_AUTH_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_AUTH_TIMEOUT_SECONDS", "5"))  # "supabase" mode: GET /auth/v1/user
+SUPABASE_AUTH_MAX_CONNECTIONS = int(os.getenv("SUPABASE_AUTH_MAX_CONNECTIONS", "20"))
+JWT_AUDIENCE = os.getenv("JWT_AUDIENCE", "authenticated")
+JWT_LEEWAY_SECONDS = int(os.getenv("JWT_LEEWAY_SECONDS", "10"))  # Allowed clock skew for exp/iat
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL", f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+JWKS_CACHE_SECONDS = int(os.getenv("JWKS_CACHE_SECONDS", "600"))
+# Verified tokens are reused until they expire or for this long, whichever is sooner (0 = verify every request)
+AUTH_TOKEN_CACHE_TTL_SECONDS = float(os.getenv("AUTH_TOKEN_CACHE_TTL_SECONDS", "60"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# User IDs known to have a profile row, so authenticated requests skip the profile lookup
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "50000"))
+
+# Local replica of user roles (roles/user_roles tables), bulk-synced from Supabase user_metadata
+ROLE_SYNC_ENABLED = os.getenv("ROLE_SYNC_ENABLED", "true").lower() == "true"
+ROLE_SYNC_INTERVAL_SECONDS = int(os.getenv("ROLE_SYNC_INTERVAL_SECONDS", "3600"))
+ROLE_SYNC_PAGE_SIZE = int(os.getenv("ROLE_SYNC_PAGE_SIZE", "1000"))  # Users per Supabase admin list_users page
+
+# Background tracker refresh scheduler
+# Set TRACKER_REFRESH_ENABLED=false on API processes when dedicated workers (python -m worker) do the scraping
+TRACKER_REFRESH_ENABLED = os.getenv("TRACKER_REFRESH_ENABLED", "true").lower() == "true"
+TRACKER_REFRESH_INTERVAL_SECONDS = int(os.getenv("TRACKER_REFRESH_INTERVAL_SECONDS", "900"))  # 15 minutes
+TRACKER_REFRESH_CONCURRENCY = int(os.getenv("TRACKER_REFRESH_CONCURRENCY", "10"))  # Max scrapes in flight
+TRACKER_REFRESH_JITTER_SECONDS = int(os.getenv("TRACKER_REFRESH_JITTER_SECONDS", "60"))  # Random spread of next run
+TRACKER_BULK_REFRESH_CONCURRENCY = int(os.getenv("TRACKER_BULK_REFRESH_CONCURRENCY", "8"))  # Scrapes in flight per POST /trackers/refresh
+
+# Postgres-backed scrape queue (claimed with FOR UPDATE SKIP LOCKED)
+SCRAPE_QUEUE_BATCH_SIZE = int(os.getenv("SCRAPE_QUEUE_BATCH_SIZE", "20"))
+SCRAPE_QUEUE_LEASE_SECONDS = int(os.getenv("SCRAPE_QUEUE_LEASE_SECONDS", "300"))  # Reclaimed if a worker dies
+SCRAPE_QUEUE_POLL_SECONDS = int(os.getenv("SCRAPE_QUEUE_POLL_SECONDS", "5"))
+SCRAPE_QUEUE_GROUP_SIZE = int(os.getenv("SCRAPE_QUEUE_GROUP_SIZE", "1000"))  # Trackers of one URL served by one fetch
+SCRAPE_QUEUE_MAX_CLAIMED = int(os.getenv("SCRAPE_QUEUE_MAX_CLAIMED", "1000"))  # Watches one process holds leases on at once
+
+# Scraper HTTP connection pool
+SCRAPE_HTTP2_ENABLED = os.getenv("SCRAPE_HTTP2_ENABLED", "true").lower() == "true"
+SCRAPE_MAX_CONNECTIONS = int(os.getenv("SCRAPE_MAX_CONNECTIONS", "100"))  # Across all hosts
+SCRAPE_MAX_CONNECTIONS_PER_HOST = int(os.getenv("SCRAPE_MAX_CONNECTIONS_PER_HOST", "6"))
+SCRAPE_KEEPALIVE_SECONDS = float(os.getenv("SCRAPE_KEEPALIVE_SECONDS", "60"))
+SCRAPE_MAX_BODY_BYTES = int(os.getenv("SCRAPE_MAX_BODY_BYTES", str(5 * 1024 * 1024)))  # Larger pages are rejected
+
+# Per-host scrape rate limits (token bucket, slowed down adaptively on 429/503 and slow responses)
+SCRAPE_RATE_LIMIT_PER_SECOND = float(os.getenv("SCRAPE_RATE_LIMIT_PER_SECOND", "2"))  # Default requests/s per host
+SCRAPE_RATE_LIMIT_BURST = int(os.getenv("SCRAPE_RATE_LIMIT_BURST", "5"))
+SCRAPE_RATE_LIMIT_MIN_PER_SECOND = float(os.getenv("SCRAPE_RATE_LIMIT_MIN_PER_SECOND", "0.1"))  # Floor when backing off
+SCRAPE_HOST_RATE_LIMITS = os.getenv("SCRAPE_HOST_RATE_LIMITS", "")  # e.g. "collegeadmissions.gndu.ac.in=1,example.com=5"
+SCRAPE_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("SCRAPE_RATE_LIMIT_MAX_WAIT_SECONDS", "20"))  # Longer waits fail as "rate limited"
+
+# Per-host circuit breaker (fail fast while a target site is down)
+SCRAPE_BREAKER_FAILURE_THRESHOLD = int(os.getenv("SCRAPE_BREAKER_FAILURE_THRESHOLD", "5"))  # Consecutive failures to open
+SCRAPE_BREAKER_RESET_SECONDS = float(os.getenv("SCRAPE_BREAKER_RESET_SECONDS", "60"))  # Open time before probing
+SCRAPE_BREAKER_HALF_OPEN_PROBES = int(os.getenv("SCRAPE_BREAKER_HALF_OPEN_PROBES", "1"))
+
+# Scraper HTML parsing: "html.parser", "lxml" (pip install lxml) or "selectolax" (pip install selectolax)
+HTML_PARSER_BACKEND = os.getenv("HTML_PARSER_BACKEND", "html.parser").lower()
+
+# Scraper caches
+SCRAPE_PAGE_CACHE_SIZE = int(os.getenv("SCRAPE_PAGE_CACHE_SIZE", "1000"))  # URLs with stored ETag/Last-Modified
+SCRAPE_CONTENT_HASH_CACHE_SIZE = int(os.getenv("SCRAPE_CONTENT_HASH_CACHE_SIZE", "10000"))  # (URL, rule) body digests
+SCRAPE_RULE_CACHE_SIZE = int(os.getenv("SCRAPE_RULE_CACHE_SIZE", "512"))  # Compiled regexes / CSS selectors
+SCRAPE_REGEX_TIMEOUT_SECONDS = float(os.getenv("SCRAPE_REGEX_TIMEOUT_SECONDS", "2"))  # Budget for each user regex search
+SCRAPE_REGEX_WORKERS = int(os.getenv("SCRAPE_REGEX_WORKERS", "2"))  # Processes user regexes run in
+SCRAPE_RESULT_TTL_SECONDS = float(os.getenv("SCRAPE_RESULT_TTL_SECONDS", "30"))  # Reuse identical API scrapes (0 = off)
+SCRAPE_RESULT_CACHE_SIZE = int(os.getenv("SCRAPE_RESULT_CACHE_SIZE", "1000"))
+
+# GNDU result portal form fields (used by the "gndu" site adapter)
+GNDU_RESULT_YEAR = os.getenv("GNDU_RESULT_YEAR", "2025")
+GNDU_RESULT_MONTH = os.getenv("GNDU_RESULT_MONTH", "May")
+GNDU_RESULT_SEMESTER = os.getenv("GNDU_RESULT_SEMESTER", "4")
+GNDU_RESULT_COURSE_TYPE = os.getenv("GNDU_RESULT_COURSE_TYPE", "CBES")
+GNDU_RESULT_COURSE = os.getenv("GNDU_RESULT_COURSE", "1702")
+GNDU_SESSION_POOL_SIZE = int(os.getenv("GNDU_SESSION_POOL_SIZE", "4"))  # Warm ASP.NET sessions per form URL
+GNDU_BATCH_SIZE = int(os.getenv("GNDU_BATCH_SIZE", "200"))  # Roll numbers per scheduled batch (keep within the lease)
+
 # Regular client for normal operations
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
 
@@ -0,0 +1,288 @@
+"""
+Access token verification for get_current_user
+
+In "supabase" mode every token is checked by asking Supabase Auth for its user
+(GET /auth/v1/user with the token). The request is stateless and goes over a
+pooled async client, so concurrent requests never share per-user session
+state and don't block the event loop. In "local"
+mode (AUTH_VERIFICATION_MODE=local) the token's signature, expiry and audience
+are checked here with PyJWT and the user is built from its claims, so
+authenticating costs no network round-trip and keeps working while Supabase
+Auth is unreachable. Tokens signed with the project's shared secret (HS256)
+need JWT_SECRET_KEY; tokens signed with asymmetric keys (RS256/ES256) are
+checked against the project's JWKS, fetched once and cached.
+
+Either way a verified token is kept in a small in-process cache, keyed by its
+SHA-256, until it expires or AUTH_TOKEN_CACHE_TTL_SECONDS pass, so the burst
+of requests a browser makes with one token is verified once.
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import jwt
+from gotrue.types import User
+from jwt import PyJWKClient
+
+from config import (
+    SUPABASE_URL,
+    SUPABASE_ANON_KEY,
+    SUPABASE_AUTH_TIMEOUT_SECONDS,
+    SUPABASE_AUTH_MAX_CONNECTIONS,
+    AUTH_VERIFICATION_MODE,
+    JWT_SECRET_KEY,
+    JWT_ALGORITHM,
+    JWT_AUDIENCE,
+    JWT_LEEWAY_SECONDS,
+    SUPABASE_JWKS_URL,
+    JWKS_CACHE_SECONDS,
+    AUTH_TOKEN_CACHE_TTL_SECONDS,
+    AUTH_TOKEN_CACHE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+# PyJWT needs cryptography for RS256/ES256 keys
+try:
+    import cryptography  # noqa: F401
+    ASYMMETRIC_JWT_AVAILABLE = True
+except ImportError:
+    ASYMMETRIC_JWT_AVAILABLE = False
+    if AUTH_VERIFICATION_MODE == "local":
+        logger.warning("⚠️ cryptography not installed. Only HS256 tokens can be verified locally. Install with: pip install cryptography")
+
+# Asymmetric algorithms Supabase signs with, checked against the JWKS
+JWKS_ALGORITHMS = ("RS256", "ES256")
+
+_jwks_client: Optional[PyJWKClient] = None
+_auth_client: Optional[httpx.AsyncClient] = None
+_auth_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class TokenVerificationError(Exception):
+    """Raised when an access token is invalid, expired or can't be checked."""
+
+
+class VerifiedTokenCache:
+    """LRU of verified identities keyed by token digest, each kept until the earlier of token expiry and ttl_seconds."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        # Only a digest is kept, so the cache never holds usable tokens
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Identity of a token verified earlier, if it is still fresh."""
+        key = self.key_for(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, identity = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return identity
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, token: str, identity: Dict[str, Any]) -> None:
+        """Remember a verified token until it expires or ttl_seconds pass."""
+        if self.ttl_seconds <= 0:
+            return
+
+        lifetime = self.ttl_seconds
+        try:
+            # The token was just verified, so its exp can be read without checking the signature again
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+            if exp is not None:
+                lifetime = min(lifetime, float(exp) - time.time())
+        except jwt.PyJWTError:
+            pass
+        if lifetime <= 0:
+            return
+
+        key = self.key_for(token)
+        self._entries[key] = (time.monotonic() + lifetime, identity)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Forget every cached token of a user (e.g. after their role changed)."""
+        stale = [key for key, (_, identity) in self._entries.items() if str(identity["user_id"]) == str(user_id)]
+        for key in stale:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for monitoring."""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache(AUTH_TOKEN_CACHE_TTL_SECONDS, AUTH_TOKEN_CACHE_SIZE)
+
+
+def _get_jwks_client() -> PyJWKClient:
+    global _jwks_client
+    if _jwks_client is None:
+        _jwks_client = PyJWKClient(SUPABASE_JWKS_URL, cache_keys=True, lifespan=JWKS_CACHE_SECONDS)
+    return _jwks_client
+
+
+async def decode_token(token: str) -> Dict[str, Any]:
+    """
+    Check a token's signature, expiry and audience locally.
+
+    Args:
+        token: Bearer access token issued by Supabase Auth
+
+    Returns:
+        Dict[str, Any]: The token's claims
+
+    Raises:
+        TokenVerificationError: If the token doesn't verify
+    """
+    try:
+        algorithm = jwt.get_unverified_header(token).get("alg", "")
+        if algorithm.startswith("HS"):
+            if not JWT_SECRET_KEY:
+                raise TokenVerificationError("JWT_SECRET_KEY is not set")
+            key, algorithms = JWT_SECRET_KEY, [JWT_ALGORITHM]
+        elif algorithm in JWKS_ALGORITHMS:
+            if not ASYMMETRIC_JWT_AVAILABLE:
+                raise TokenVerificationError(f"{algorithm} tokens need the cryptography package")
+            # Only the first token with a new key id fetches the JWKS; the thread keeps that off the event loop
+            signing_key = await asyncio.to_thread(_get_jwks_client().get_signing_key_from_jwt, token)
+            key, algorithms = signing_key.key, [algorithm]
+        else:
+            raise TokenVerificationError(f"Unsupported token algorithm: {algorithm or 'none'}")
+
+        return jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            audience=JWT_AUDIENCE,
+            leeway=JWT_LEEWAY_SECONDS,
+            options={"require": ["exp", "sub"]}
+        )
+    except jwt.PyJWTError as e:
+        raise TokenVerificationError(str(e))
+
+
+def identity_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the current_user fields from a verified token's claims."""
+    user_metadata = claims.get("user_metadata") or {}
+    return {
+        "user_id": claims["sub"],
+        "email": claims.get("email"),
+        "role": user_metadata.get("role", "user"),  # default to user
+        "user_metadata": user_metadata,
+        "user": None  # No Supabase user object without asking Supabase
+    }
+
+
+def get_auth_client() -> httpx.AsyncClient:
+    """
+    Get the pooled client for Supabase Auth, creating it on first use.
+
+    The client is tied to the event loop it was created on, so a new one is
+    made if called from a different loop.
+    """
+    global _auth_client, _auth_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _auth_client is None or _auth_client.is_closed or _auth_client_loop is not loop:
+        _auth_client = httpx.AsyncClient(
+            base_url=f"{SUPABASE_URL}/auth/v1",
+            headers={"apikey": SUPABASE_ANON_KEY or ""},
+            timeout=SUPABASE_AUTH_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_AUTH_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_AUTH_MAX_CONNECTIONS
+            )
+        )
+        _auth_client_loop = loop
+    return _auth_client
+
+
+async def close_auth_client() -> None:
+    """Close the Supabase Auth client (call on application shutdown)."""
+    global _auth_client, _auth_client_loop
+    if _auth_client is not None:
+        await _auth_client.aclose()
+        _auth_client = None
+        _auth_client_loop = None
+
+
+async def verify_with_supabase(token: str) -> Dict[str, Any]:
+    """
+    Verify a token by asking Supabase Auth for its user.
+
+    The token only travels in this request's Authorization header; no shared
+    client state is touched.
+
+    Raises:
+        TokenVerificationError: If Supabase rejects the token or can't be reached
+    """
+    try:
+        response = await get_auth_client().get("/user", headers={"Authorization": f"Bearer {token}"})
+    except httpx.HTTPError as e:
+        logger.error(f"Supabase token verification failed: {e}")
+        raise TokenVerificationError("Supabase verification failed")
+
+    if response.status_code == 404:
+        raise TokenVerificationError("user not found")
+    if response.status_code != 200:
+        logger.error(f"Supabase token verification failed: HTTP {response.status_code}")
+        raise TokenVerificationError("Supabase verification failed")
+
+    try:
+        user = User.model_validate(response.json())
+    except ValueError as e:
+        logger.error(f"Unexpected Supabase user response: {e}")
+        raise TokenVerificationError("Supabase verification failed")
+
+    user_metadata = user.user_metadata or {}
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "role": user_metadata.get("role", "user"),  # default to user
+        "user_metadata": user_metadata,
+        "user": user  # Include the full Supabase user object
+    }
+
+
+async def verify_access_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a bearer token the way AUTH_VERIFICATION_MODE says, or reuse a recent verification of it.
+
+    Args:
+        token: Bearer access token
+
+    Returns:
+        Dict[str, Any]: user_id, email, role, user_metadata and (in "supabase" mode) the Supabase user
+
+    Raises:
+        TokenVerificationError: If the token is not valid
+    """
+    identity = token_cache.get(token)
+    if identity is not None:
+        return identity
+
+    if AUTH_VERIFICATION_MODE == "local":
+        identity = identity_from_claims(await decode_token(token))
+    else:
+        identity = await verify_with_supabase(token)
+
+    token_cache.put(token, identity)
+    return identity
@@ -1,16 +1,50 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from config import AsyncSessionLocal, TRACKER_REFRESH_ENABLED, ROLE_SYNC_ENABLED
 from routers.auth.auth import auth_router
 from routers.auth.sync import router as sync_router
 from routers.users import users_router
 from routers.admin.admin import router as admin_router
 from routers.trackers.trackers import router as trackers_router
+from services.tracker_scheduler import TrackerRefreshScheduler
+from services.role_sync import RoleSyncScheduler
+from services.http_client import close_async_client
+from dependencies.auth_verifier import close_auth_client
+from services import regex_sandbox
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background tracker refreshes and role syncs with the app and stop them on shutdown."""
+    scheduler = None
+    if TRACKER_REFRESH_ENABLED and AsyncSessionLocal is not None:
+        scheduler = TrackerRefreshScheduler()
+        scheduler.start()
+    app.state.tracker_scheduler = scheduler
+
+    role_sync = None
+    if ROLE_SYNC_ENABLED and AsyncSessionLocal is not None:
+        role_sync = RoleSyncScheduler()
+        role_sync.start()
+    app.state.role_sync = role_sync
+
+    yield
+
+    if scheduler is not None:
+        await scheduler.stop()
+    if role_sync is not None:
+        await role_sync.stop()
+    await close_async_client()
+    await close_auth_client()
+    regex_sandbox.shutdown()
 
 
 app = FastAPI(
     title="Supabase FastAPI Boilerplate",
     description="A FastAPI application with Supabase authentication and GNDU result tracking",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
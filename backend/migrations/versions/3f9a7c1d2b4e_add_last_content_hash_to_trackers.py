@@ -0,0 +1,28 @@
+"""add_last_content_hash_to_trackers
+
+Revision ID: 3f9a7c1d2b4e
+Revises: e6e284c89e9e
+Create Date: 2026-10-17 11:02:47.915306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a7c1d2b4e'
+down_revision: Union[str, Sequence[str], None] = 'e6e284c89e9e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trackers', sa.Column('last_content_hash', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trackers', 'last_content_hash')
@@ -0,0 +1,29 @@
+"""add_validation_status_to_trackers
+
+Revision ID: 5a0c3e8b71f2
+Revises: d4b91e7f3a26
+Create Date: 2026-10-17 15:18:03.271904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0c3e8b71f2'
+down_revision: Union[str, Sequence[str], None] = 'd4b91e7f3a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every existing tracker was validated before it was saved
+    op.add_column('trackers', sa.Column('validation_status', sa.String(), server_default='valid', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trackers', 'validation_status')
@@ -0,0 +1,35 @@
+"""seed_roles
+
+Revision ID: 8e2f6b4d9c13
+Revises: 5a0c3e8b71f2
+Create Date: 2026-10-17 17:42:26.508137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2f6b4d9c13'
+down_revision: Union[str, Sequence[str], None] = '5a0c3e8b71f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The roles user_metadata.role can take; user_roles is filled by services.role_sync
+    op.execute(
+        "INSERT INTO roles (id, name, description) VALUES "
+        "(gen_random_uuid(), 'user', 'Regular user'), "
+        "(gen_random_uuid(), 'admin', 'Administrator') "
+        "ON CONFLICT (name) DO NOTHING"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM user_roles")
+    op.execute("DELETE FROM roles WHERE name IN ('user', 'admin')")
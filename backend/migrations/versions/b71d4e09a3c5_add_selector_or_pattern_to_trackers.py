@@ -0,0 +1,28 @@
+"""add_selector_or_pattern_to_trackers
+
+Revision ID: b71d4e09a3c5
+Revises: 3f9a7c1d2b4e
+Create Date: 2026-10-17 11:48:05.226741
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71d4e09a3c5'
+down_revision: Union[str, Sequence[str], None] = '3f9a7c1d2b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trackers', sa.Column('selector_or_pattern', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trackers', 'selector_or_pattern')
@@ -0,0 +1,34 @@
+"""add_adapter_to_trackers
+
+Revision ID: c2a85f6e1d07
+Revises: b71d4e09a3c5
+Create Date: 2026-10-17 12:26:40.118592
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a85f6e1d07'
+down_revision: Union[str, Sequence[str], None] = 'b71d4e09a3c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trackers', sa.Column('adapter', sa.String(), nullable=True))
+
+    # Same URL matching the adapters use for new trackers
+    op.execute(
+        "UPDATE trackers SET adapter = CASE WHEN lower(target_url) LIKE '%gndu%' "
+        "THEN 'gndu' ELSE 'generic' END"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('trackers', 'adapter')
@@ -0,0 +1,99 @@
+"""add_watches_shared_by_trackers
+
+Revision ID: d4b91e7f3a26
+Revises: c2a85f6e1d07
+Create Date: 2026-10-17 14:05:12.640391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b91e7f3a26'
+down_revision: Union[str, Sequence[str], None] = 'c2a85f6e1d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'watches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('target_url', sa.String(), nullable=False),
+        sa.Column('search_term', sa.String(), nullable=False),
+        sa.Column('selector_or_pattern', sa.Text(), nullable=True),
+        sa.Column('adapter', sa.String(), nullable=True),
+        sa.Column('last_status', sa.Text(), nullable=True),
+        sa.Column('last_content_hash', sa.String(length=32), nullable=True),
+        sa.Column('next_run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_watches_id'), 'watches', ['id'], unique=False)
+    op.create_index(op.f('ix_watches_next_run_at'), 'watches', ['next_run_at'], unique=False)
+    op.create_index(
+        'uq_watches_scrape_key', 'watches',
+        ['target_url', 'search_term', sa.text("coalesce(selector_or_pattern, '')")],
+        unique=True
+    )
+
+    # One watch per distinct scrape, carrying the state of its most recently updated tracker
+    op.execute(
+        "INSERT INTO watches (target_url, search_term, selector_or_pattern, adapter, "
+        "last_status, last_content_hash, next_run_at) "
+        "SELECT DISTINCT ON (target_url, search_term, coalesce(selector_or_pattern, '')) "
+        "target_url, search_term, selector_or_pattern, adapter, last_status, last_content_hash, next_run_at "
+        "FROM trackers "
+        "ORDER BY target_url, search_term, coalesce(selector_or_pattern, ''), "
+        "updated_at DESC NULLS LAST, id DESC"
+    )
+
+    op.add_column('trackers', sa.Column('watch_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE trackers SET watch_id = watches.id FROM watches "
+        "WHERE watches.target_url = trackers.target_url "
+        "AND watches.search_term = trackers.search_term "
+        "AND coalesce(watches.selector_or_pattern, '') = coalesce(trackers.selector_or_pattern, '')"
+    )
+    # Merged subscribers start from the shared status
+    op.execute(
+        "UPDATE trackers SET last_status = watches.last_status FROM watches "
+        "WHERE watches.id = trackers.watch_id"
+    )
+    op.alter_column('trackers', 'watch_id', nullable=False)
+    op.create_index(op.f('ix_trackers_watch_id'), 'trackers', ['watch_id'], unique=False)
+    op.create_foreign_key('trackers_watch_id_fkey', 'trackers', 'watches', ['watch_id'], ['id'])
+
+    # Scrape queue and page digest now live on the watch
+    op.drop_index(op.f('ix_trackers_next_run_at'), table_name='trackers')
+    op.drop_column('trackers', 'locked_until')
+    op.drop_column('trackers', 'next_run_at')
+    op.drop_column('trackers', 'last_content_hash')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('trackers', sa.Column('last_content_hash', sa.String(length=32), nullable=True))
+    op.add_column('trackers', sa.Column('next_run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('trackers', sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_trackers_next_run_at'), 'trackers', ['next_run_at'], unique=False)
+    op.execute(
+        "UPDATE trackers SET last_content_hash = watches.last_content_hash, "
+        "next_run_at = watches.next_run_at FROM watches "
+        "WHERE watches.id = trackers.watch_id"
+    )
+
+    op.drop_constraint('trackers_watch_id_fkey', 'trackers', type_='foreignkey')
+    op.drop_index(op.f('ix_trackers_watch_id'), table_name='trackers')
+    op.drop_column('trackers', 'watch_id')
+
+    op.drop_index('uq_watches_scrape_key', table_name='watches')
+    op.drop_index(op.f('ix_watches_next_run_at'), table_name='watches')
+    op.drop_index(op.f('ix_watches_id'), table_name='watches')
+    op.drop_table('watches')
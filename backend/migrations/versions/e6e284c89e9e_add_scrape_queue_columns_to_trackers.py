@@ -0,0 +1,34 @@
+"""add_scrape_queue_columns_to_trackers
+
+Revision ID: e6e284c89e9e
+Revises: 868302a1a3bb
+Create Date: 2026-10-17 10:12:31.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6e284c89e9e'
+down_revision: Union[str, Sequence[str], None] = '868302a1a3bb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('trackers', sa.Column('next_run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('trackers', sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_trackers_next_run_at'), 'trackers', ['next_run_at'], unique=False)
+    # Existing trackers are backfilled with the server default, now(): they are due
+    # right away and the scheduler's claim limits pace their first refresh
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_trackers_next_run_at'), table_name='trackers')
+    op.drop_column('trackers', 'locked_until')
+    op.drop_column('trackers', 'next_run_at')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Integer
+from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Integer, Index, literal_column
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -36,18 +36,71 @@ class Tracker(Base):
     application_id = Column(String, nullable=False)  # Original field
     target_url = Column(String, nullable=False)  # Added by migration
     search_term = Column(String, nullable=False)  # Added by migration
+    selector_or_pattern = Column(Text, nullable=True)  # CSS selector or "regex:<pattern>"; None = plain search
+    adapter = Column(String, nullable=True)  # Site adapter picked for target_url at creation
+    watch_id = Column(Integer, ForeignKey('watches.id'), nullable=False, index=True)  # Shared scrape this tracker subscribes to
     last_status = Column(Text, nullable=True)
+    validation_status = Column(String, server_default="valid", nullable=False)  # "pending" until a background-created tracker's first scrape
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationship to user
     user = relationship("Profile", back_populates="trackers")
     
+    # Relationship to the shared scrape
+    watch = relationship("Watch", back_populates="trackers")
+    
     def __repr__(self):
         return f"<Tracker(id={self.id}, name={self.name}, url={self.target_url}, search={self.search_term})>"
 
 
+class Watch(Base):
+    """One unique scrape (URL, search term and rule), shared by every tracker subscribed to it."""
+    __tablename__ = "watches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    target_url = Column(String, nullable=False)
+    search_term = Column(String, nullable=False)
+    selector_or_pattern = Column(Text, nullable=True)  # CSS selector or "regex:<pattern>"; None = plain search
+    adapter = Column(String, nullable=True)  # Site adapter picked for target_url
+    last_status = Column(Text, nullable=True)
+    last_content_hash = Column(String(32), nullable=True)  # Digest of the page body last_status came from
+    next_run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)  # Scrape queue: when due
+    locked_until = Column(DateTime(timezone=True), nullable=True)  # Scrape queue: worker lease expiry
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationship to subscribed trackers
+    trackers = relationship("Tracker", back_populates="watch")
+    
+    def __repr__(self):
+        return f"<Watch(id={self.id}, url={self.target_url}, search={self.search_term})>"
 
 
+class Role(Base):
+    __tablename__ = "roles"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(50), unique=True, nullable=False)
+    description = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Role(id={self.id}, name={self.name})>"
+
+
+class UserRole(Base):
+    """Local replica of each user's role (the source of truth is Supabase user_metadata.role)."""
+    __tablename__ = "user_roles"
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey('profiles.id'), primary_key=True)
+    role_id = Column(UUID(as_uuid=True), ForeignKey('roles.id'), primary_key=True)
+    
+    def __repr__(self):
+        return f"<UserRole(user_id={self.user_id}, role_id={self.role_id})>"
 
 
+# A NULL rule is "plain search", so it has to collide with other NULL rules. The
+# literal (not a bound parameter) lets ON CONFLICT match this index expression.
+WATCH_SCRAPE_KEY = (Watch.target_url, Watch.search_term, func.coalesce(Watch.selector_or_pattern, literal_column("''")))
+Index("uq_watches_scrape_key", *WATCH_SCRAPE_KEY, unique=True)
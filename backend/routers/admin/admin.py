@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Form
 from dependencies.rbac import require_admin, require_admin_write, require_user_management, require_user_management_write
 from dependencies.get_current_user import get_current_user
-from routers.admin.schemas import UserListItem, UserListResponse, RoleUpdateResponse, UserRoleUpdate
-from routers.admin.helpers import get_paginated_users, get_user_by_id_admin, update_user_role_admin
+from routers.admin.schemas import UserListItem, UserListResponse, RoleUpdateResponse, UserRoleUpdate, ScraperStatsResponse, AuthStatsResponse
+from routers.admin.helpers import get_paginated_users, get_user_by_id_admin, update_user_role_admin, get_scraper_stats, get_auth_stats
 from sqlalchemy.ext.asyncio import AsyncSession
 from config import get_db
 from typing import Optional
@@ -65,3 +65,25 @@ async def get_user_by_id(
     Admin only: Get specific user by ID
     """
     return await get_user_by_id_admin(user_id, db)
+
+
+@router.get("/scraper/stats", response_model=ScraperStatsResponse)
+async def scraper_stats(
+    current_user = Depends(get_current_user),
+    _rbac_check = Depends(require_admin)
+):
+    """
+    Admin only: Scraper cache counters and per-host request rates for this process
+    """
+    return get_scraper_stats()
+
+
+@router.get("/auth/stats", response_model=AuthStatsResponse)
+async def auth_stats(
+    current_user = Depends(get_current_user),
+    _rbac_check = Depends(require_admin)
+):
+    """
+    Admin only: Verified-token cache counters for this process
+    """
+    return get_auth_stats()
@@ -2,6 +2,7 @@
 Helper functions for admin operations
 Contains business logic separated from route handlers for better maintainability
 """
+import asyncio
 import logging
 import math
 from typing import Dict, Any, Optional, List
@@ -11,9 +12,18 @@ from sqlalchemy import select, func
 from datetime import datetime
 
 from config import supabase_admin
-from models import Profile
-from routers.admin.schemas import UserListItem, UserListResponse, RoleUpdateResponse
+from models import Profile, Role, UserRole
+from dependencies.auth_verifier import token_cache
+from routers.admin.schemas import UserListItem, UserListResponse, RoleUpdateResponse, ScraperStatsResponse, AuthStatsResponse
 from routers.users.helpers import get_all_user_profiles
+from services.circuit_breaker import circuit_breaker
+from services.content_hashes import content_hashes
+from services.extraction_rules import cache_stats as rule_cache_stats
+from services.page_cache import page_cache
+from services.profiles import known_profiles
+from services.rate_limiter import rate_limiter
+from services.role_sync import profile_role, profiles_with_roles, set_user_role
+from services.single_flight import scrape_flights
 
 logger = logging.getLogger(__name__)
 
@@ -48,22 +58,23 @@ async def get_paginated_users(
         
         offset = (page - 1) * limit
         
-        # Get total count
+        # Get total count (of the filtered users, so pages line up with the filter)
         count_query = select(func.count(Profile.id))
+        if role:
+            count_query = (
+                count_query
+                .outerjoin(UserRole, UserRole.user_id == Profile.id)
+                .outerjoin(Role, Role.id == UserRole.role_id)
+                .where(profile_role == role)
+            )
         count_result = await db.execute(count_query)
         total = count_result.scalar()
         
-        # Use existing helper function to get user profiles
-        all_users = await get_all_user_profiles(db, offset, limit)
-        
-        # Apply role filter if specified
-        if role:
-            filtered_users = [user for user in all_users if user.role == role]
-        else:
-            filtered_users = all_users
+        # Use existing helper function to get user profiles, filtered by role in SQL
+        page_users = await get_all_user_profiles(db, offset, limit, role)
         
         # Convert to UserListItem format
-        users = [UserListItem.model_validate(user.model_dump()) for user in filtered_users]
+        users = [UserListItem.model_validate(user.model_dump()) for user in page_users]
         
         # Calculate total pages
         total_pages = math.ceil(total / limit)
@@ -102,42 +113,26 @@ async def get_user_by_id_admin(
         HTTPException: If user not found or retrieval fails
     """
     try:
-        # Get user profile from database
+        # Get user profile and role (from the local role replica) in one query
         result = await db.execute(
-            select(Profile).where(Profile.id == user_id)
+            profiles_with_roles().where(Profile.id == user_id)
         )
-        profile = result.scalar_one_or_none()
+        row = result.first()
         
-        if not profile:
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Get user role from Supabase
-        try:
-            supabase_user = supabase_admin.auth.admin.get_user_by_id(str(profile.id))
-            user_role = "user"  # Default fallback
-            
-            if supabase_user.user and supabase_user.user.user_metadata:
-                user_role = supabase_user.user.user_metadata.get("role", "user")
-            
-            user_data = {
-                **profile.__dict__,
-                "user_id": str(profile.id),
-                "role": user_role
-            }
-            
-            return UserListItem.model_validate(user_data)
-            
-        except Exception as role_error:
-            logger.warning(f"Failed to get role for user {profile.id}: {str(role_error)}")
-            user_data = {
-                **profile.__dict__,
-                "user_id": str(profile.id),
-                "role": "user"
-            }
-            return UserListItem.model_validate(user_data)
+        profile, user_role = row
+        user_data = {
+            **profile.__dict__,
+            "user_id": str(profile.id),
+            "role": user_role
+        }
+        
+        return UserListItem.model_validate(user_data)
         
     except HTTPException:
         raise
@@ -177,29 +172,22 @@ async def update_user_role_admin(
                 detail="Invalid role. Must be one of: user, admin"
             )
         
-        # Get current user role from Supabase first to show in response
-        try:
-            supabase_user = supabase_admin.auth.admin.get_user_by_id(user_id)
-            if not supabase_user.user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
-            
-            old_role = "user"  # Default fallback
-            if supabase_user.user.user_metadata:
-                old_role = supabase_user.user.user_metadata.get("role", "user")
-            
-        except Exception as e:
-            logger.error(f"Failed to get user from Supabase: {str(e)}")
+        # Get current user role from the local replica to show in response
+        result = await db.execute(
+            profiles_with_roles().where(Profile.id == user_id)
+        )
+        row = result.first()
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+        profile, old_role = row
         
-        # Update user metadata using Supabase Admin API
+        # Update user metadata using Supabase Admin API (blocking client, keep it off the event loop)
         try:
-            response = supabase_admin.auth.admin.update_user_by_id(
+            response = await asyncio.to_thread(
+                supabase_admin.auth.admin.update_user_by_id,
                 uid=user_id,
                 attributes={
                     "user_metadata": {
@@ -216,6 +204,9 @@ async def update_user_role_admin(
             
             logger.info(f"Updated Supabase user metadata for {user_id} with role: {new_role}")
             
+            # Don't keep serving the old role from verified tokens cached in this process
+            token_cache.invalidate_user(user_id)
+            
         except Exception as supabase_error:
             logger.error(f"Failed to update Supabase metadata: {str(supabase_error)}")
             raise HTTPException(
@@ -223,19 +214,15 @@ async def update_user_role_admin(
                 detail="Failed to update user role in authentication system"
             )
         
-        # Update profile timestamp for consistency (optional)
+        # Mirror the role into the local replica and update profile timestamp for consistency
         try:
-            result = await db.execute(
-                select(Profile).where(Profile.id == user_id)
-            )
-            profile = result.scalar_one_or_none()
-            
-            if profile:
-                profile.updated_at = datetime.utcnow()
-                await db.commit()
+            await set_user_role(db, user_id, new_role)
+            profile.updated_at = datetime.utcnow()
+            await db.commit()
                 
         except Exception as db_error:
-            logger.warning(f"Failed to update profile timestamp: {str(db_error)}")
+            # The periodic role sync brings the replica back in line
+            logger.warning(f"Failed to update local role replica: {str(db_error)}")
         
         return RoleUpdateResponse(
             message=f"User role updated from {old_role} to {new_role}",
@@ -255,3 +242,33 @@ async def update_user_role_admin(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update user role"
         )
+
+
+def get_scraper_stats() -> ScraperStatsResponse:
+    """
+    Collect cache counters and per-host rates and circuits from the scraper running in this process
+    
+    Returns:
+        ScraperStatsResponse: Current scraper cache statistics
+    """
+    return ScraperStatsResponse(
+        page_cache=page_cache.stats(),
+        content_hashes=content_hashes.stats(),
+        rule_cache=rule_cache_stats(),
+        single_flight=scrape_flights.stats(),
+        host_rates=rate_limiter.stats(),
+        open_circuits=circuit_breaker.stats()
+    )
+
+
+def get_auth_stats() -> AuthStatsResponse:
+    """
+    Collect the verified-token and known-profile cache counters of this process
+    
+    Returns:
+        AuthStatsResponse: Current auth cache statistics
+    """
+    return AuthStatsResponse(
+        token_cache=token_cache.stats(),
+        known_profiles=known_profiles.stats()
+    )
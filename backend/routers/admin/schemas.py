@@ -1,5 +1,5 @@
 from pydantic import BaseModel, field_validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 import uuid
 
@@ -58,3 +58,17 @@ class RoleUpdateResponse(BaseModel):
     updated_by: str
     metadata_updated: bool
     note: str
+
+
+class ScraperStatsResponse(BaseModel):
+    page_cache: Dict[str, int]
+    content_hashes: Dict[str, int]
+    rule_cache: Dict[str, int]
+    single_flight: Dict[str, int]
+    host_rates: Dict[str, float]
+    open_circuits: Dict[str, str]
+
+
+class AuthStatsResponse(BaseModel):
+    token_cache: Dict[str, int]
+    known_profiles: Dict[str, int]
@@ -1,9 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from dependencies.get_current_user import get_current_user
 from config import get_db, supabase
-from models import Profile
+from services.profiles import ensure_profile
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,31 +25,14 @@ async def sync_profile(
         user_id = current_user["user_id"]
         email = current_user["email"]
         
-        # Check if profile already exists
-        result = await db.execute(select(Profile).where(Profile.id == user_id))
-        existing_profile = result.scalar_one_or_none()
+        # Get additional user info from the verified token
+        user_metadata = current_user.get("user_metadata") or {}
         
-        if existing_profile:
-            return {"message": "Profile already exists", "profile_id": str(user_id)}
-        
-        # Get additional user info from Supabase
-        user_data = current_user.get("user")
-        user_metadata = user_data.user_metadata if user_data else {}
+        # Create the profile unless it already exists (one statement, safe to call concurrently)
+        created = await ensure_profile(db, user_id, email, user_metadata)
         
-        # Create new profile
-        new_profile = Profile(
-            id=user_id,
-            email=email,
-            first_name=user_metadata.get("first_name"),
-            last_name=user_metadata.get("last_name"),
-            avatar_url=user_metadata.get("avatar_url"),
-            phone=user_metadata.get("phone"),
-            is_active=True
-        )
-        
-        db.add(new_profile)
-        await db.commit()
-        await db.refresh(new_profile)
+        if not created:
+            return {"message": "Profile already exists", "profile_id": str(user_id)}
         
         logger.info(f"Profile synced successfully for user {user_id}")
         return {"message": "Profile created successfully", "profile_id": str(user_id)}
@@ -1,37 +1,72 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import bisect
 import logging
 from datetime import datetime
 import re
+from typing import Callable, Dict, List, Optional
 from urllib.parse import urlparse, urljoin
 
+import httpx
+
+from config import (
+    SCRAPE_MAX_BODY_BYTES,
+    GNDU_RESULT_YEAR,
+    GNDU_RESULT_MONTH,
+    GNDU_RESULT_SEMESTER,
+    GNDU_RESULT_COURSE_TYPE,
+    GNDU_RESULT_COURSE,
+    GNDU_SESSION_POOL_SIZE,
+    GNDU_BATCH_SIZE
+)
+from services import http_client
+from services.aspnet_sessions import AspNetSessionPool
+from services.circuit_breaker import circuit_breaker
+from services.content_hashes import content_hashes
+from services.early_exit import stop_condition_for
+from services.extraction_rules import has_regex_rule, regex_executor, regex_first_match, RegexTimeout
+from services.html_parser import html_parser
+from services.notifications import send_whatsapp_notification
+from services.page_cache import page_cache, RuleKey
+from services.single_flight import scrape_flights
+from services.site_adapters import SiteAdapter, get_adapter, register_adapter
+from services.watches import StatusChange, is_error_status
+from services.text_matching import MultiTermMatcher
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
+SCRAPE_TIMEOUT_SECONDS = 20
+
+# Scrapes refused before or while fetching (oversized page, host's circuit open) or
+# while extracting (regex over its time budget) - reported as "Error: ..."
+SCRAPE_REJECTED_ERRORS = (http_client.ResponseTooLarge, http_client.CircuitOpenError, http_client.RateLimited, RegexTimeout)
+
+# Statuses that mean the scrape found its target (as opposed to "not found" ones)
+MATCH_STATUS_PREFIXES = ("Found: ", "Content: ")
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Result form fields of the GNDU adapter (overridable from the environment)
+GNDU_FORM_DEFAULTS = {
+    'ddlYear': GNDU_RESULT_YEAR, 'ddlMonth': GNDU_RESULT_MONTH, 'ddlSem': GNDU_RESULT_SEMESTER,
+    'ddlCourseType': GNDU_RESULT_COURSE_TYPE, 'ddlCourse': GNDU_RESULT_COURSE,
+    'btnSubmit': 'Submit'
+}
+
 # --- Universal Web Scraper Engine ---
 
-def scrape_website(target_url: str, selector_or_pattern: str = None, search_term: str = None) -> str:
-    """
-    Universal web scraper that can scrape any website.
-    
-    Args:
-        target_url: The URL to scrape
-        selector_or_pattern: CSS selector or regex pattern to find content
-        search_term: Term to search for on the page
-    
-    Returns:
-        Scraped content or status message
-    """
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    logger.info(f"� [{timestamp}] Universal Scraper: Starting scrape for {target_url}")
-    print(f"� [{timestamp}] Universal Scraper: Starting scrape for {target_url}")
-    
-    # --- DEMO MODES FOR TESTING ---
+def _demo_status(search_term: Optional[str]) -> Optional[str]:
+    """Return a canned status for demo search terms, or None for real scrapes."""
+    if not search_term:
+        return None
+
     if "DEMO123" in search_term:
         import random
         statuses = [
             "Result Pending",
-            "Pass - SGPA: 8.75", 
+            "Pass - SGPA: 8.75",
             "Pass - SGPA: 9.25",
             "Result Under Review",
             "Pass - SGPA: 8.90",
@@ -42,126 +77,571 @@ def scrape_website(target_url: str, selector_or_pattern: str = None, search_term
         logger.info(f"🎲 DEMO MODE: Returning random status: {demo_status}")
         print(f"🎲 DEMO MODE: Returning random status: {demo_status}")
         return demo_status
-    
+
     if "12345DEMO" in search_term:
         logger.info("🎭 DEMO MODE: Returning fake successful result.")
         print("🎭 DEMO MODE: Returning fake successful result.")
         return "Pass - SGPA: 9.25"
+
+    return None
+
+
+def shared_fetch_limit(target_url: str, adapter_name: str = None) -> Optional[int]:
+    """
+    How many trackers on this URL one async_scrape_many batch may serve.
+
+    Returns:
+        Optional[int]: 1 if the adapter can't batch, None for no limit
+    """
+    adapter = get_adapter(adapter_name, target_url)
+    return adapter.max_batch_size if adapter.supports_batching else 1
+
+
+def scrape_website(
+    target_url: str,
+    selector_or_pattern: str = None,
+    search_term: str = None,
+    adapter_name: str = None
+) -> str:
+    """
+    Universal web scraper that can scrape any website.
+
+    Args:
+        target_url: The URL to scrape
+        selector_or_pattern: CSS selector or regex pattern to find content
+        search_term: Term to search for on the page
+        adapter_name: Site adapter stored on the tracker (matched from the URL if not given)
+
+    Returns:
+        Scraped content or status message
+    """
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    logger.info(f"� [{timestamp}] Universal Scraper: Starting scrape for {target_url}")
+    print(f"� [{timestamp}] Universal Scraper: Starting scrape for {target_url}")
+
+    # --- DEMO MODES FOR TESTING ---
+    demo_status = _demo_status(search_term)
+    if demo_status is not None:
+        return demo_status
     # --- END DEMO MODES ---
-    
+
     try:
-        # Handle different URL patterns and form submissions
-        if "gndu" in target_url.lower():
-            return _scrape_gndu_specific(target_url, search_term)
-        else:
-            return _scrape_generic_website(target_url, selector_or_pattern, search_term)
-            
+        # The site adapter handles site-specific requests such as form submissions
+        return get_adapter(adapter_name, target_url).scrape(target_url, selector_or_pattern, search_term)
+
     except Exception as e:
         error_msg = f"Error scraping {target_url}: {str(e)}"
         logger.error(f"❌ {error_msg}")
         print(f"❌ {error_msg}")
         return f"Error: {str(e)}"
 
-def _scrape_gndu_specific(target_url: str, roll_number: str) -> str:
+def _parse_gndu_page(html: str) -> str:
+    """Extract the SGPA or the error message from a GNDU result page."""
+    # Only the two result spans are parsed, not the whole page
+    result_text, error_text = html_parser.texts_by_id(html, 'span', ['lblSGPA', 'lblMsg'])
+
+    # Look for result span
+    if result_text:
+        result = f"Pass - SGPA: {result_text.strip()}"
+        logger.info(f"🎯 GNDU result found: {result}")
+        return result
+
+    # Look for error message
+    if error_text:
+        error_msg = error_text.strip()
+        logger.warning(f"⚠️ GNDU error: {error_msg}")
+        return error_msg
+
+    return "No result found on GNDU page"
+
+def _is_gndu_result_page(html: str) -> bool:
+    """Cheap check that a response is the result form, before parsing it."""
+    return 'lblSGPA' in html or 'lblMsg' in html
+
+def _scrape_gndu_specific(target_url: str, roll_number: str, form_fields: Dict[str, str] = GNDU_FORM_DEFAULTS) -> str:
     """Specialized scraper for GNDU website with form submission."""
     try:
-        form_payload = {
-            'ddlYear': '2025', 'ddlMonth': 'May', 'ddlSem': '4',
-            'ddlCourseType': 'CBES', 'ddlCourse': '1702',
-            'txtRollNo': roll_number, 'btnSubmit': 'Submit'
-        }
-        
-        response = requests.post(target_url, data=form_payload, timeout=20)
-        response.raise_for_status()
-        logger.info(f"✅ GNDU response received: {response.status_code}")
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Look for result span
-        result_span = soup.find('span', {'id': 'lblSGPA'})
-        if result_span and result_span.text:
-            result = f"Pass - SGPA: {result_span.text.strip()}"
-            logger.info(f"🎯 GNDU result found: {result}")
-            return result
-        
-        # Look for error message
-        error_span = soup.find('span', {'id': 'lblMsg'})
-        if error_span and error_span.text:
-            error_msg = error_span.text.strip()
-            logger.warning(f"⚠️ GNDU error: {error_msg}")
-            return error_msg
-            
-        return "No result found on GNDU page"
-        
+        form_payload = {**form_fields, 'txtRollNo': roll_number}
+
+        page = http_client.fetch_page_sync(
+            "POST", target_url, max_bytes=SCRAPE_MAX_BODY_BYTES, data=form_payload, timeout=SCRAPE_TIMEOUT_SECONDS
+        )
+        page.response.raise_for_status()
+        logger.info(f"✅ GNDU response received: {page.response.status_code}")
+
+        return _parse_gndu_page(page.text)
+
+    except SCRAPE_REJECTED_ERRORS as e:
+        return f"Error: {str(e)}"
     except Exception as e:
         return f"GNDU scraping error: {str(e)}"
 
+def _parse_generic_page(html: str, selector_or_pattern: str, search_term: str) -> str:
+    """Apply a selector, regex or search term to a fetched page and build its status."""
+    # If selector is provided, use it
+    if selector_or_pattern:
+        if selector_or_pattern.startswith('regex:'):
+            # Use regex pattern
+            pattern = selector_or_pattern[6:]  # Remove 'regex:' prefix
+            match = regex_first_match(pattern, html)
+            if match is not None:
+                result = f"Found: {match}"
+                logger.info(f"🎯 Regex match found: {result}")
+                return result
+            else:
+                return "No regex matches found"
+
+        # Use CSS selector
+        content = html_parser.select_first_text(html, selector_or_pattern)
+        if content is not None:
+            result = f"Content: {content[:100]}..." if len(content) > 100 else f"Content: {content}"
+            logger.info(f"🎯 CSS selector match: {result}")
+            return result
+        else:
+            return "No elements found with given selector"
+
+    # If no selector, search for the term in page text
+    if search_term:
+        page_text = html_parser.page_text(html)
+        if search_term.lower() in page_text.lower():
+            # Try to find surrounding context
+            lines = page_text.split('\n')
+            for line in lines:
+                if search_term.lower() in line.lower():
+                    result = f"Found: {line.strip()[:150]}..."
+                    logger.info(f"🎯 Search term found: {result}")
+                    return result
+            return f"Term '{search_term}' found on page"
+        else:
+            return f"Term '{search_term}' not found on page"
+
+    # Fallback: return page title and first paragraph
+    title_text, p_text = html_parser.title_and_first_paragraph(html)
+    title_text = title_text if title_text is not None else "No title"
+    p_text = p_text[:100] if p_text is not None else "No content"
+
+    return f"Page: {title_text} | Content: {p_text}..."
+
+def _match_search_terms(html: str, search_terms: List[str]) -> Dict[str, str]:
+    """
+    Build the status of many search terms from one page in a single pass.
+
+    Gives the same statuses as _parse_generic_page would for each term alone.
+    """
+    page_text = html_parser.page_text(html)
+    lowered_text = page_text.lower()
+    positions = MultiTermMatcher(search_terms).first_occurrences(page_text)
+
+    # Lowercasing keeps line breaks in place, so offsets map back to page lines
+    lines = page_text.split('\n')
+    line_starts = [0] + [match.end() for match in re.finditer('\n', lowered_text)]
+
+    statuses = {}
+    for search_term in search_terms:
+        position = positions.get(search_term.lower())
+        if position is None:
+            statuses[search_term] = f"Term '{search_term}' not found on page"
+        else:
+            line = lines[bisect.bisect_right(line_starts, position) - 1]
+            statuses[search_term] = f"Found: {line.strip()[:150]}..."
+
+    logger.info(f"🎯 Matched {len(positions)} of {len(search_terms)} search terms in one pass")
+    return statuses
+
 def _scrape_generic_website(target_url: str, selector_or_pattern: str, search_term: str) -> str:
     """Generic website scraper that works with any URL."""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        response = requests.get(target_url, headers=headers, timeout=20)
-        response.raise_for_status()
-        logger.info(f"✅ Website response received: {response.status_code}")
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # If selector is provided, use it
-        if selector_or_pattern:
-            if selector_or_pattern.startswith('regex:'):
-                # Use regex pattern
-                pattern = selector_or_pattern[6:]  # Remove 'regex:' prefix
-                matches = re.findall(pattern, response.text, re.IGNORECASE)
-                if matches:
-                    result = f"Found: {matches[0]}"
-                    logger.info(f"🎯 Regex match found: {result}")
-                    return result
-                else:
-                    return "No regex matches found"
-            else:
-                # Use CSS selector
-                elements = soup.select(selector_or_pattern)
-                if elements:
-                    content = elements[0].get_text(strip=True)
-                    result = f"Content: {content[:100]}..." if len(content) > 100 else f"Content: {content}"
-                    logger.info(f"🎯 CSS selector match: {result}")
-                    return result
-                else:
-                    return "No elements found with given selector"
-        
-        # If no selector, search for the term in page text
-        if search_term:
-            page_text = soup.get_text().lower()
-            if search_term.lower() in page_text:
-                # Try to find surrounding context
-                lines = soup.get_text().split('\n')
-                for line in lines:
-                    if search_term.lower() in line.lower():
-                        result = f"Found: {line.strip()[:150]}..."
-                        logger.info(f"🎯 Search term found: {result}")
-                        return result
-                return f"Term '{search_term}' found on page"
+        rule_key = (selector_or_pattern, search_term)
+        headers = {**DEFAULT_HEADERS, **page_cache.conditional_headers(target_url, [rule_key])}
+
+        page = http_client.fetch_page_sync(
+            "GET", target_url, max_bytes=SCRAPE_MAX_BODY_BYTES, headers=headers, timeout=SCRAPE_TIMEOUT_SECONDS
+        )
+        if page.response.status_code == 304:
+            cached_statuses = page_cache.not_modified(target_url, [rule_key])
+            if cached_statuses is not None:
+                logger.info(f"♻️ Page not modified, reusing status for {target_url}")
+                return cached_statuses[rule_key]
+            # Nothing cached to answer the 304 with any more - fetch the page unconditionally
+            page_cache.discard(target_url)
+            page = http_client.fetch_page_sync(
+                "GET", target_url, max_bytes=SCRAPE_MAX_BODY_BYTES, headers=DEFAULT_HEADERS, timeout=SCRAPE_TIMEOUT_SECONDS
+            )
+        page.response.raise_for_status()
+        logger.info(f"✅ Website response received: {page.response.status_code}")
+
+        result = _parse_generic_page(page.text, selector_or_pattern, search_term)
+        page_cache.store(
+            target_url,
+            etag=page.response.headers.get('ETag'),
+            last_modified=page.response.headers.get('Last-Modified'),
+            body_size=page.body_size,
+            statuses={rule_key: result}
+        )
+        return result
+
+    except SCRAPE_REJECTED_ERRORS as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"Generic scraping error: {str(e)}"
+
+# --- Async Scraper Engine ---
+#
+# Awaitable counterparts of the scrapers above. Network waits go through the
+# shared httpx pool in services.http_client so they never block the event loop
+# and reuse kept-alive connections, and HTML parsing runs in a worker thread
+# so a large page doesn't stall other requests.
+
+async def async_scrape_website(
+    target_url: str,
+    selector_or_pattern: str = None,
+    search_term: str = None,
+    adapter_name: str = None
+) -> str:
+    """
+    Async version of scrape_website.
+
+    Args:
+        target_url: The URL to scrape
+        selector_or_pattern: CSS selector or regex pattern to find content
+        search_term: Term to search for on the page
+        adapter_name: Site adapter stored on the tracker (matched from the URL if not given)
+
+    Returns:
+        Scraped content or status message
+    """
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    logger.info(f"� [{timestamp}] Universal Scraper (async): Starting scrape for {target_url}")
+
+    demo_status = _demo_status(search_term)
+    if demo_status is not None:
+        return demo_status
+
+    try:
+        adapter = get_adapter(adapter_name, target_url)
+        return await adapter.async_scrape(target_url, selector_or_pattern, search_term)
+
+    except Exception as e:
+        error_msg = f"Error scraping {target_url}: {str(e)}"
+        logger.error(f"❌ {error_msg}")
+        return f"Error: {str(e)}"
+
+async def _async_scrape_gndu_specific(
+    session_pool: AspNetSessionPool,
+    roll_number: str,
+    form_fields: Dict[str, str] = GNDU_FORM_DEFAULTS
+) -> str:
+    """Async GNDU form submission scraper, posting through a warm ASP.NET session."""
+    form_url = session_pool.form_url
+    try:
+        form_payload = {**form_fields, 'txtRollNo': roll_number}
+
+        # One circuit breaker outcome per lookup, however many requests it took
+        circuit_breaker.before_request(form_url)
+        try:
+            async with session_pool.session() as form_session:
+                page = await form_session.post(form_payload)
+                if page.response.is_error or not _is_gndu_result_page(page.text):
+                    # The server rejected the session's state (expired session, stale view state) - reload the form once
+                    logger.info("🔁 GNDU session state rejected, reloading the form")
+                    form_session.reset()
+                    page = await form_session.post(form_payload)
+        except httpx.TransportError as e:
+            circuit_breaker.record_failure(form_url, type(e).__name__)
+            raise
+        except httpx.HTTPStatusError as e:
+            # The form itself couldn't be loaded
+            if e.response.status_code >= 500:
+                circuit_breaker.record_failure(form_url, f"HTTP {e.response.status_code}")
             else:
-                return f"Term '{search_term}' not found on page"
-        
-        # Fallback: return page title and first paragraph
-        title = soup.find('title')
-        title_text = title.get_text(strip=True) if title else "No title"
-        
-        first_p = soup.find('p')
-        p_text = first_p.get_text(strip=True)[:100] if first_p else "No content"
-        
-        return f"Page: {title_text} | Content: {p_text}..."
-        
+                circuit_breaker.record_success(form_url)
+            raise
+        if page.response.status_code >= 500:
+            circuit_breaker.record_failure(form_url, f"HTTP {page.response.status_code}")
+        else:
+            circuit_breaker.record_success(form_url)
+        page.response.raise_for_status()
+        logger.info(f"✅ GNDU response received: {page.response.status_code}")
+
+        return await asyncio.to_thread(_parse_gndu_page, page.text)
+
+    except SCRAPE_REJECTED_ERRORS as e:
+        return f"Error: {str(e)}"
+    except Exception as e:
+        return f"GNDU scraping error: {str(e)}"
+
+async def _run_parse(rule_keys: List[RuleKey], parse: Callable[[str], Dict[RuleKey, str]], html: str) -> Dict[RuleKey, str]:
+    """Run a page parse off the event loop; parses with regex rules wait for a sandbox worker on their own threads."""
+    if has_regex_rule(rule_keys):
+        return await asyncio.get_running_loop().run_in_executor(regex_executor, parse, html)
+    return await asyncio.to_thread(parse, html)
+
+async def _parse_unless_unchanged(
+    target_url: str,
+    rule_keys: List[RuleKey],
+    parse: Callable[[str], Dict[RuleKey, str]],
+    page: http_client.FetchedPage
+) -> Dict[RuleKey, str]:
+    """Parse a fetched page, or reuse the stored statuses if its bytes are unchanged."""
+    if not page.complete:
+        # Where an early exit stops depends on how the network chunked the body,
+        # so a partial read's digest identifies nothing - neither look it up nor keep it
+        return await _run_parse(rule_keys, parse, page.text)
+
+    cached_statuses = content_hashes.lookup(target_url, rule_keys, page.content_hash)
+    if cached_statuses is not None:
+        logger.info(f"♻️ Page content unchanged, skipping parse for {target_url}")
+        return cached_statuses
+
+    statuses = await _run_parse(rule_keys, parse, page.text)
+    content_hashes.store(target_url, page.content_hash, statuses)
+    return statuses
+
+def _all_matched(statuses: Dict[RuleKey, str]) -> bool:
+    return all(status.startswith(MATCH_STATUS_PREFIXES) for status in statuses.values())
+
+async def _async_fetch_generic_page(
+    target_url: str,
+    rule_keys: List[RuleKey],
+    parse: Callable[[str], Dict[RuleKey, str]],
+    stop_when: Optional[Callable[[str], bool]] = None
+) -> Dict[RuleKey, str]:
+    """
+    GET a generic page once and compute the status of each rule from it.
+
+    Sends the page cache's validators so an unchanged page (304) is answered
+    from the cache without downloading or parsing it, and skips parsing when
+    the body is byte-identical to the last one seen. The body is streamed
+    and capped at SCRAPE_MAX_BODY_BYTES; with stop_when, reading stops as soon
+    as the target has been seen.
+    """
+    headers = {**DEFAULT_HEADERS, **page_cache.conditional_headers(target_url, rule_keys)}
+
+    page = await http_client.fetch_page(
+        "GET", target_url, max_bytes=SCRAPE_MAX_BODY_BYTES, stop_when=stop_when,
+        headers=headers, timeout=SCRAPE_TIMEOUT_SECONDS
+    )
+    if page.response.status_code == 304:
+        cached_statuses = page_cache.not_modified(target_url, rule_keys)
+        if cached_statuses is not None:
+            logger.info(f"♻️ Page not modified, reusing status for {target_url}")
+            return cached_statuses
+        # Nothing cached to answer the 304 with any more - fetch the page unconditionally
+        page_cache.discard(target_url)
+        page = await http_client.fetch_page(
+            "GET", target_url, max_bytes=SCRAPE_MAX_BODY_BYTES, stop_when=stop_when,
+            headers=DEFAULT_HEADERS, timeout=SCRAPE_TIMEOUT_SECONDS
+        )
+    page.response.raise_for_status()
+    logger.info(f"✅ Website response received: {page.response.status_code}")
+
+    statuses = await _parse_unless_unchanged(target_url, rule_keys, parse, page)
+
+    if not page.complete and not _all_matched(statuses):
+        # The early-exit hint was wrong (e.g. the term was only in markup) - read the whole page
+        logger.info(f"🔁 Early exit missed the target on {target_url}, reading full page")
+        page = await http_client.fetch_page(
+            "GET", target_url, max_bytes=SCRAPE_MAX_BODY_BYTES,
+            headers=DEFAULT_HEADERS, timeout=SCRAPE_TIMEOUT_SECONDS
+        )
+        page.response.raise_for_status()
+        statuses = await _parse_unless_unchanged(target_url, rule_keys, parse, page)
+
+    page_cache.store(
+        target_url,
+        etag=page.response.headers.get('ETag'),
+        last_modified=page.response.headers.get('Last-Modified'),
+        body_size=page.body_size,
+        statuses=statuses
+    )
+    return statuses
+
+async def _async_scrape_generic_website(target_url: str, selector_or_pattern: str, search_term: str) -> str:
+    """Async generic website scraper."""
+    try:
+        rule_key = (selector_or_pattern, search_term)
+        statuses = await _async_fetch_generic_page(
+            target_url,
+            [rule_key],
+            lambda html: {rule_key: _parse_generic_page(html, selector_or_pattern, search_term)},
+            stop_when=stop_condition_for(selector_or_pattern, search_term)
+        )
+        return statuses[rule_key]
+
+    except SCRAPE_REJECTED_ERRORS as e:
+        return f"Error: {str(e)}"
     except Exception as e:
         return f"Generic scraping error: {str(e)}"
 
+async def async_scrape_many(target_url: str, rules: List[RuleKey], adapter_name: str = None) -> Dict[RuleKey, str]:
+    """
+    Scrape one URL for many extraction rules at once.
+
+    Adapters that support batching serve all rules together: generic pages
+    are fetched once (all plain search terms matched in one pass, each
+    selector or regex rule applied to the same page) and GNDU roll numbers
+    are spread over a pool of warm form sessions. Other adapters run one
+    request per rule (concurrently).
+
+    Args:
+        target_url: The URL shared by all rules
+        rules: (selector_or_pattern, search_term) pairs to evaluate on the page
+        adapter_name: Site adapter stored on the trackers (matched from the URL if not given)
+
+    Returns:
+        Dict mapping each rule to its status
+    """
+    statuses = {}
+    real_rules = []
+    for rule_key in dict.fromkeys(rules):
+        demo_status = _demo_status(rule_key[1])
+        if demo_status is not None:
+            statuses[rule_key] = demo_status
+        else:
+            real_rules.append(rule_key)
+
+    if len(real_rules) == 1:
+        selector_or_pattern, search_term = real_rules[0]
+        statuses[real_rules[0]] = await async_scrape_website(target_url, selector_or_pattern, search_term, adapter_name)
+    elif real_rules:
+        adapter = get_adapter(adapter_name, target_url)
+        statuses.update(await adapter.async_scrape_many(target_url, real_rules))
+
+    return statuses
+
+async def _async_scrape_generic_batch(target_url: str, rules: List[RuleKey]) -> Dict[RuleKey, str]:
+    """Evaluate many rules on one fetch of a generic page."""
+    # Rules without a selector or term (page summary) go through the single-rule scraper
+    single_rules = [rule_key for rule_key in rules if not any(rule_key)]
+    rules = [rule_key for rule_key in rules if any(rule_key)]
+
+    statuses = {}
+    if single_rules:
+        results = await asyncio.gather(*(
+            _async_scrape_generic_website(target_url, selector_or_pattern, search_term)
+            for selector_or_pattern, search_term in single_rules
+        ))
+        statuses.update(zip(single_rules, results))
+
+    if not rules:
+        return statuses
+
+    logger.info(f"� Universal Scraper (async): Evaluating {len(rules)} rules on {target_url}")
+    try:
+        rule_statuses = await _async_fetch_generic_page(
+            target_url,
+            rules,
+            lambda html: _evaluate_rules(html, rules)
+        )
+        statuses.update(rule_statuses)
+    except SCRAPE_REJECTED_ERRORS as e:
+        error_status = f"Error: {str(e)}"
+        statuses.update({rule_key: error_status for rule_key in rules})
+    except Exception as e:
+        error_status = f"Generic scraping error: {str(e)}"
+        statuses.update({rule_key: error_status for rule_key in rules})
+
+    return statuses
+
+def _evaluate_rules(html: str, rules: List[RuleKey]) -> Dict[RuleKey, str]:
+    """Statuses of many rules on one page, with all plain search terms matched in one pass."""
+    search_terms = [search_term for selector_or_pattern, search_term in rules if not selector_or_pattern]
+    statuses = {}
+    if search_terms:
+        statuses.update({
+            (None, search_term): status
+            for search_term, status in _match_search_terms(html, search_terms).items()
+        })
+    for selector_or_pattern, search_term in rules:
+        if not selector_or_pattern:
+            continue
+        # One bad rule must not fail the other trackers sharing this page
+        try:
+            status = _parse_generic_page(html, selector_or_pattern, search_term)
+        except SCRAPE_REJECTED_ERRORS as e:
+            status = f"Error: {str(e)}"
+        except Exception as e:
+            status = f"Generic scraping error: {str(e)}"
+        statuses[(selector_or_pattern, search_term)] = status
+    return statuses
+
+# --- Site Adapters ---
+#
+# Registered in services.site_adapters; each tracker stores the name of the
+# adapter picked for its URL at creation.
+
+class GnduAdapter(SiteAdapter):
+    """
+    GNDU result portal: an ASP.NET form posted once per roll number (the search term).
+
+    Lookups go through a small pool of warm sessions per form URL, so a batch
+    of roll numbers reuses the form's cookies and hidden state instead of
+    starting a fresh server session for each one.
+    """
+
+    name = "gndu"
+    supports_batching = True
+    max_batch_size = GNDU_BATCH_SIZE
+
+    def __init__(self, form_fields: Dict[str, str], session_pool_size: int):
+        self.form_fields = form_fields
+        self.session_pool_size = session_pool_size
+        self._session_pools: Dict[str, AspNetSessionPool] = {}
+
+    def matches(self, target_url: str) -> bool:
+        return "gndu" in target_url.lower()
+
+    def _session_pool(self, target_url: str) -> AspNetSessionPool:
+        session_pool = self._session_pools.get(target_url)
+        if session_pool is None:
+            session_pool = AspNetSessionPool(
+                target_url, self.session_pool_size, max_bytes=SCRAPE_MAX_BODY_BYTES,
+                headers=DEFAULT_HEADERS, timeout=SCRAPE_TIMEOUT_SECONDS
+            )
+            self._session_pools[target_url] = session_pool
+        return session_pool
+
+    def scrape(self, target_url: str, selector_or_pattern: Optional[str], search_term: Optional[str]) -> str:
+        return _scrape_gndu_specific(target_url, search_term, self.form_fields)
+
+    async def async_scrape(self, target_url: str, selector_or_pattern: Optional[str], search_term: Optional[str]) -> str:
+        return await _async_scrape_gndu_specific(self._session_pool(target_url), search_term, self.form_fields)
+
+    async def async_scrape_many(self, target_url: str, rules: List[RuleKey]) -> Dict[RuleKey, str]:
+        logger.info(f"🎓 GNDU batch: looking up {len(rules)} roll numbers over {self.session_pool_size} sessions")
+        return await super().async_scrape_many(target_url, rules)
+
+
+class GenericAdapter(SiteAdapter):
+    """Any other page: one GET, then a selector, regex or search term applied to it."""
+
+    name = "generic"
+    supports_batching = True
+
+    def matches(self, target_url: str) -> bool:
+        return True
+
+    def scrape(self, target_url: str, selector_or_pattern: Optional[str], search_term: Optional[str]) -> str:
+        return _scrape_generic_website(target_url, selector_or_pattern, search_term)
+
+    async def async_scrape(self, target_url: str, selector_or_pattern: Optional[str], search_term: Optional[str]) -> str:
+        return await _async_scrape_generic_website(target_url, selector_or_pattern, search_term)
+
+    async def async_scrape_many(self, target_url: str, rules: List[RuleKey]) -> Dict[RuleKey, str]:
+        return await _async_scrape_generic_batch(target_url, rules)
+
+
+register_adapter(GnduAdapter(GNDU_FORM_DEFAULTS, GNDU_SESSION_POOL_SIZE))
+register_adapter(GenericAdapter(), fallback=True)
+
 # --- Main Platform Engine ---
 
-def run_scrape_task(target_url: str, selector_or_pattern: str = None, search_term: str = None) -> str:
+def run_scrape_task(
+    target_url: str,
+    selector_or_pattern: str = None,
+    search_term: str = None,
+    adapter_name: str = None
+) -> str:
     """
     Universal scraping engine that can handle any website.
     """
@@ -171,15 +651,95 @@ def run_scrape_task(target_url: str, selector_or_pattern: str = None, search_ter
     print(f"   URL: {target_url}")
     print(f"   Selector: {selector_or_pattern}")
     print(f"   Search Term: {search_term}")
-    
-    result = scrape_website(target_url, selector_or_pattern, search_term)
-    
+
+    result = scrape_website(target_url, selector_or_pattern, search_term, adapter_name)
+
     logger.info(f"✅ [{timestamp}] Universal Platform: Scrape completed")
     print(f"✅ [{timestamp}] Universal Platform: Scrape completed")
     print(f"   Result: {result}")
-    
+
     return result
 
+async def async_run_scrape_task(
+    target_url: str,
+    selector_or_pattern: str = None,
+    search_term: str = None,
+    adapter_name: str = None
+) -> str:
+    """
+    Awaitable counterpart of run_scrape_task for use inside request handlers.
+
+    Identical concurrent scrapes share one upstream request, and a successful
+    result is reused for SCRAPE_RESULT_TTL_SECONDS (see services.single_flight).
+    """
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    logger.info(f"🚀 [{timestamp}] Universal Platform: Starting async scrape of {target_url} (selector: {selector_or_pattern}, search term: {search_term})")
+
+    result = await scrape_flights.run(
+        (target_url, selector_or_pattern, search_term, adapter_name),
+        lambda: async_scrape_website(target_url, selector_or_pattern, search_term, adapter_name),
+        cacheable=lambda status: not is_error_status(status)
+    )
+
+    logger.info(f"✅ [{timestamp}] Universal Platform: Async scrape completed: {result}")
+
+    return result
+
+# --- Change Detection & Notifications ---
+
+# HARDCODED FOR TESTING - Always send to this number
+NOTIFICATION_PHONE_NUMBER = "+919877235405"
+
+async def notify_if_status_changed(tracker_name: str, old_status: Optional[str], new_status: str) -> bool:
+    """
+    Send a WhatsApp notification when a tracker's status has changed.
+
+    Args:
+        tracker_name: Name of the tracker that was refreshed
+        old_status: Status stored before the refresh
+        new_status: Status returned by the scraper
+
+    Returns:
+        bool: True if a notification was sent successfully
+    """
+    if old_status == new_status:
+        print("📝 Status unchanged - no notification needed")
+        return False
+
+    print(f"📱 Sending WhatsApp notification to {NOTIFICATION_PHONE_NUMBER}")
+    # Twilio's client is blocking, keep it off the event loop
+    success = await asyncio.to_thread(
+        send_whatsapp_notification,
+        user_phone_number=NOTIFICATION_PHONE_NUMBER,
+        tracker_name=tracker_name,
+        new_status=new_status
+    )
+    print(f"📨 Notification sent: {'✅ Success' if success else '❌ Failed'}")
+    return success
+
+
+async def notify_status_changes(changes: List[StatusChange]) -> int:
+    """
+    Send the notifications of one watch fan-out together.
+
+    Args:
+        changes: Subscribed trackers whose status changed
+
+    Returns:
+        int: Number of notifications sent successfully
+    """
+    if not changes:
+        return 0
+
+    sent = await asyncio.gather(
+        *(notify_if_status_changed(change.tracker_name, change.old_status, change.new_status) for change in changes),
+        return_exceptions=True
+    )
+    failures = [result for result in sent if isinstance(result, Exception)]
+    for error in failures:
+        logger.error(f"❌ Notification failed: {error}")
+    return sum(1 for result in sent if result is True)
+
 # Legacy function for backward compatibility
 def scrape_gndu_result(roll_no: str) -> str:
     """Legacy function - redirects to universal scraper"""
@@ -1,12 +1,20 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
 from datetime import datetime
 
+from services.extraction_rules import validate_rule
+
 
 class TrackerCreate(BaseModel):
     name: str 
     target_url: str  # URL to track
     search_term: str  # What to search for on the URL
+    selector_or_pattern: Optional[str] = None  # CSS selector or "regex:<pattern>" to extract instead of searching
+
+    @field_validator('selector_or_pattern')
+    @classmethod
+    def check_selector_or_pattern(cls, v):
+        return validate_rule(v)
 
 
 class TrackerResponse(BaseModel):
@@ -15,7 +23,10 @@ class TrackerResponse(BaseModel):
     application_id: str  # Original field
     target_url: str  # New URL field
     search_term: str  # New search term field
+    selector_or_pattern: Optional[str] = None
+    adapter: Optional[str] = None  # Site adapter used to scrape target_url
     last_status: Optional[str] = None
+    validation_status: Optional[str] = None  # "pending", "valid" or "failed"
     created_at: datetime
     updated_at: Optional[datetime] = None
     
@@ -23,10 +34,27 @@ class TrackerResponse(BaseModel):
         from_attributes = True
 
 
+class TrackerJobResponse(BaseModel):
+    tracker_id: int
+    status: str  # Tracker's validation_status: "pending", "valid" or "failed"
+    last_status: Optional[str] = None  # Scrape result once the job has run (the reason, if it failed)
+    status_url: str  # Poll this until status is no longer "pending"
+
+
+class TrackerBulkRefresh(BaseModel):
+    tracker_ids: Optional[List[int]] = None  # Trackers to refresh; all of the user's trackers if omitted
+
+
 class TrackerUpdate(BaseModel):
     name: Optional[str] = None
     tracker_type: Optional[str] = None  # Platform field (legacy)
     application_id: Optional[str] = None  # Legacy field
     target_url: Optional[str] = None  # New URL field
     search_term: Optional[str] = None  # New search term field
+    selector_or_pattern: Optional[str] = None  # Set to "" to go back to plain search
     last_status: Optional[str] = None
+
+    @field_validator('selector_or_pattern')
+    @classmethod
+    def check_selector_or_pattern(cls, v):
+        return validate_rule(v)
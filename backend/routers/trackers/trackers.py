@@ -1,38 +1,175 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+import json
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, update
+from sqlalchemy.sql import func
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from dependencies.get_current_user import get_current_user
-from config import get_db
-from models import Tracker
-from .schemas import TrackerCreate, TrackerResponse
-from .helpers import run_scrape_task
-from services.notifications import send_whatsapp_notification
+from config import get_db, AsyncSessionLocal, TRACKER_BULK_REFRESH_CONCURRENCY
+from models import Tracker, Watch
+from .schemas import TrackerBulkRefresh, TrackerCreate, TrackerJobResponse, TrackerResponse, TrackerUpdate
+from services.content_hashes import content_hashes
+from services.site_adapters import adapter_for_url
+from services.watches import (
+    VALIDATION_PENDING,
+    VALIDATION_VALID,
+    fan_out_statuses,
+    find_watch,
+    get_or_create_watch,
+    is_error_status,
+    release_watch
+)
+from .helpers import async_run_scrape_task, async_scrape_many, notify_status_changes, shared_fetch_limit
 
 router = APIRouter(
     prefix="/trackers",
     tags=["trackers"]
 )
 
+# Fields of TrackerUpdate a user may change, and those that change what is scraped
+UPDATABLE_TRACKER_FIELDS = ("name", "target_url", "search_term", "selector_or_pattern")
+SCRAPE_RULE_FIELDS = ("target_url", "search_term", "selector_or_pattern")
+
+
+async def subscribe_to_watch(
+    db: AsyncSession,
+    target_url: str,
+    search_term: str,
+    selector_or_pattern: Optional[str],
+    failure_message: str
+) -> Watch:
+    """
+    Find the shared watch for a scrape, or validate the scrape and create it.
+
+    Only the first tracker of a scrape pays for the initial request; later
+    subscribers start from the watch's current status. The session's
+    transaction is committed before scraping, so no pooled connection is
+    held while waiting on the target site.
+
+    Args:
+        db: Database session (the caller commits the subscription)
+        target_url: URL to scrape
+        search_term: Term to look for
+        selector_or_pattern: Extraction rule (None = plain search)
+        failure_message: Start of the 400 detail if the scrape fails
+
+    Returns:
+        Watch: The watch to subscribe the tracker to
+    """
+    watch = await find_watch(db, target_url, search_term, selector_or_pattern)
+    if watch is not None and watch.last_status is not None and not is_error_status(watch.last_status):
+        return watch
+
+    # Pick the site adapter once; refreshes dispatch on the stored name
+    adapter_name = adapter_for_url(target_url).name
+    
+    # Give the connection back to the pool for the (possibly long) scrape
+    await db.commit()
+    
+    # Use universal scraper with the new URL-based approach
+    initial_status = await async_run_scrape_task(
+        target_url=target_url,
+        selector_or_pattern=selector_or_pattern,
+        search_term=search_term,
+        adapter_name=adapter_name
+    )
+    
+    if is_error_status(initial_status):
+        raise HTTPException(status_code=400, detail=f"{failure_message}. Reason: {initial_status}")
+    
+    return await get_or_create_watch(
+        db,
+        target_url=target_url,
+        search_term=search_term,
+        selector_or_pattern=selector_or_pattern,
+        adapter_name=adapter_name,
+        last_status=initial_status,
+        last_content_hash=content_hashes.hash_for(target_url, (selector_or_pattern, search_term), initial_status)
+    )
 
-@router.post("", response_model=TrackerResponse)
+
+async def subscribe_to_watch_in_background(
+    db: AsyncSession,
+    target_url: str,
+    search_term: str,
+    selector_or_pattern: Optional[str]
+) -> Watch:
+    """
+    Find or create the shared watch for a scrape without scraping it now.
+
+    A watch that has no usable status yet is queued for an immediate scrape,
+    which validates the trackers subscribed to it in the meantime.
+
+    Args:
+        db: Database session (the caller commits)
+        target_url: URL to scrape
+        search_term: Term to look for
+        selector_or_pattern: Extraction rule (None = plain search)
+
+    Returns:
+        Watch: The watch to subscribe the tracker to
+    """
+    watch = await find_watch(db, target_url, search_term, selector_or_pattern)
+    if watch is None:
+        return await get_or_create_watch(
+            db,
+            target_url=target_url,
+            search_term=search_term,
+            selector_or_pattern=selector_or_pattern,
+            adapter_name=adapter_for_url(target_url).name
+        )
+
+    if watch.last_status is None or is_error_status(watch.last_status):
+        watch.next_run_at = func.now()
+    return watch
+
+
+def tracker_job(tracker: Tracker) -> TrackerJobResponse:
+    """Job handle of a tracker's background validation."""
+    return TrackerJobResponse(
+        tracker_id=tracker.id,
+        status=tracker.validation_status,
+        last_status=tracker.last_status,
+        status_url=f"{router.prefix}/{tracker.id}/job"
+    )
+
+
+@router.post("", response_model=TrackerResponse, responses={202: {"model": TrackerJobResponse}})
 async def add_tracker(
     tracker_data: TrackerCreate,
+    background: bool = Query(False, description="Validate the tracker in the background and return 202 with a job to poll"),
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Add a new tracker for the current user."""
+    """
+    Add a new tracker for the current user.
     
-    # Use universal scraper with the new URL-based approach
-    initial_status = run_scrape_task(
-        target_url=tracker_data.target_url, 
-        selector_or_pattern=None,  # Can be expanded later
-        search_term=tracker_data.search_term
-    )
+    By default the tracker's scrape is checked before it is saved. With
+    ?background=true it is saved right away as pending, the check runs in the
+    scrape queue, and the response is a 202 with the job to poll.
+    """
     
-    if "Error" in initial_status:
-        raise HTTPException(status_code=400, detail=f"Could not add tracker. Reason: {initial_status}")
+    if background:
+        watch = await subscribe_to_watch_in_background(
+            db,
+            target_url=tracker_data.target_url,
+            search_term=tracker_data.search_term,
+            selector_or_pattern=tracker_data.selector_or_pattern
+        )
+    else:
+        watch = await subscribe_to_watch(
+            db,
+            target_url=tracker_data.target_url,
+            search_term=tracker_data.search_term,
+            selector_or_pattern=tracker_data.selector_or_pattern,
+            failure_message="Could not add tracker"
+        )
+    has_status = watch.last_status is not None and not is_error_status(watch.last_status)
 
     try:
         # Create new tracker
@@ -42,13 +179,24 @@ async def add_tracker(
             application_id=tracker_data.search_term,  # Use search_term as application_id
             target_url=tracker_data.target_url,
             search_term=tracker_data.search_term,
-            last_status=initial_status
+            selector_or_pattern=tracker_data.selector_or_pattern,
+            adapter=watch.adapter,
+            watch_id=watch.id,
+            last_status=watch.last_status if has_status else None,
+            validation_status=VALIDATION_VALID if has_status else VALIDATION_PENDING
         )
         
         db.add(new_tracker)
         await db.commit()
         await db.refresh(new_tracker)
         
+        if background:
+            job = tracker_job(new_tracker)
+            return JSONResponse(
+                status_code=202,
+                content=jsonable_encoder(job),
+                headers={"Location": job.status_url}
+            )
         return new_tracker
 
     except Exception as e:
@@ -112,6 +260,94 @@ async def get_tracker(
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+@router.get("/{tracker_id}/job", response_model=TrackerJobResponse)
+async def get_tracker_job(
+    tracker_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the validation job of a tracker added with ?background=true."""
+    
+    result = await db.execute(
+        select(Tracker).where(
+            Tracker.id == tracker_id,
+            Tracker.user_id == current_user["user_id"]
+        )
+    )
+    tracker = result.scalar_one_or_none()
+    
+    if not tracker:
+        raise HTTPException(status_code=404, detail="Tracker not found")
+    
+    return tracker_job(tracker)
+
+
+@router.put("/{tracker_id}", response_model=TrackerResponse)
+async def update_tracker(
+    tracker_id: int,
+    tracker_data: TrackerUpdate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update a tracker's name or what it scrapes, re-checking the status if the scrape changed."""
+    
+    result = await db.execute(
+        select(Tracker).where(
+            Tracker.id == tracker_id,
+            Tracker.user_id == current_user["user_id"]
+        )
+    )
+    tracker = result.scalar_one_or_none()
+    
+    if not tracker:
+        raise HTTPException(status_code=404, detail="Tracker not found")
+    
+    changes = {
+        field: value
+        for field, value in tracker_data.model_dump(exclude_unset=True).items()
+        if field in UPDATABLE_TRACKER_FIELDS and (value is not None or field == "selector_or_pattern")
+    }
+    scrape_changed = any(
+        field in SCRAPE_RULE_FIELDS and getattr(tracker, field) != value
+        for field, value in changes.items()
+    )
+    
+    old_watch_id = tracker.watch_id
+    if scrape_changed:
+        # Move the tracker to the watch of its new scrape, validated like in add_tracker
+        watch = await subscribe_to_watch(
+            db,
+            target_url=changes.get("target_url", tracker.target_url),
+            search_term=changes.get("search_term", tracker.search_term),
+            selector_or_pattern=changes.get("selector_or_pattern", tracker.selector_or_pattern),
+            failure_message="Could not update tracker"
+        )
+        
+        changes["watch_id"] = watch.id
+        changes["last_status"] = watch.last_status
+        changes["validation_status"] = VALIDATION_VALID  # Checked just now, even if it was pending
+        changes["adapter"] = watch.adapter
+        if "search_term" in changes:
+            changes["application_id"] = changes["search_term"]  # Kept in step as in add_tracker
+    
+    try:
+        for field, value in changes.items():
+            setattr(tracker, field, value)
+        
+        if tracker.watch_id != old_watch_id:
+            await db.flush()
+            await release_watch(db, old_watch_id)
+        
+        await db.commit()
+        await db.refresh(tracker)
+        
+        return tracker
+        
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
 @router.post("/{tracker_id}/refresh", response_model=TrackerResponse)
 async def refresh_tracker(
     tracker_id: int,
@@ -134,14 +370,26 @@ async def refresh_tracker(
         
         # Store old status to compare
         old_status = tracker.last_status
+        watch = await db.get(Watch, tracker.watch_id)
+        rule_key = (watch.selector_or_pattern, watch.search_term)
+        content_hashes.seed(watch.target_url, rule_key, watch.last_content_hash, watch.last_status)
         
-        # Scrape new status using the universal scraper with new fields
-        new_status = run_scrape_task(
-            target_url=tracker.target_url,
-            selector_or_pattern=None,  # Can be expanded later
-            search_term=tracker.search_term
+        # Give the connection back to the pool for the (possibly long) scrape;
+        # the results are written in a new transaction
+        await db.commit()
+        
+        # Scrape new status using the universal scraper with the tracker's extraction rule
+        new_status = await async_run_scrape_task(
+            target_url=watch.target_url,
+            selector_or_pattern=watch.selector_or_pattern,
+            search_term=watch.search_term,
+            adapter_name=watch.adapter
         )
-        tracker.last_status = new_status
+        watch.last_status = new_status
+        watch.last_content_hash = content_hashes.hash_for(watch.target_url, rule_key, new_status)
+        
+        # Everyone subscribed to the watch gets the new status, not only this tracker
+        changes = await fan_out_statuses(db, {watch.id: new_status})
         
         await db.commit()
         await db.refresh(tracker)
@@ -153,19 +401,8 @@ async def refresh_tracker(
         print(f"   Status Changed: {old_status != new_status}")
         print(f"   User Phone: {current_user.get('phone', 'Not set')}")
         
-        # Send WhatsApp notification if status changed
-        if old_status != new_status:
-            # HARDCODED FOR TESTING - Always send to your number
-            hardcoded_phone = "+919877235405"
-            print(f"📱 Sending WhatsApp notification to {hardcoded_phone}")
-            success = send_whatsapp_notification(
-                user_phone_number=hardcoded_phone,
-                tracker_name=tracker.name,
-                new_status=new_status
-            )
-            print(f"📨 Notification sent: {'✅ Success' if success else '❌ Failed'}")
-        else:
-            print("📝 Status unchanged - no notification needed")
+        # Send WhatsApp notifications to the trackers whose status changed
+        await notify_status_changes(changes)
         
         return tracker
         
@@ -174,6 +411,145 @@ async def refresh_tracker(
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+def _scrape_groups(watches: List[Watch]) -> List[List[Watch]]:
+    """Split a bulk refresh's watches into groups one async_scrape_many batch can serve."""
+    watches_by_page: Dict[Tuple[str, Optional[str]], List[Watch]] = defaultdict(list)
+    for watch in watches:
+        watches_by_page[(watch.target_url, watch.adapter)].append(watch)
+
+    groups = []
+    for (target_url, adapter_name), page_watches in watches_by_page.items():
+        group_size = shared_fetch_limit(target_url, adapter_name) or len(page_watches)
+        groups += [page_watches[i:i + group_size] for i in range(0, len(page_watches), group_size)]
+    return groups
+
+
+async def _scrape_watch_group(
+    watches: List[Watch],
+    slots: asyncio.Semaphore
+) -> List[Tuple[Watch, str, Optional[str]]]:
+    """Scrape watches of one page in one batch for a bulk refresh; returns each watch, its new status and page digest."""
+    target_url = watches[0].target_url
+    rules = {watch.id: (watch.selector_or_pattern, watch.search_term) for watch in watches}
+    async with slots:
+        for watch in watches:
+            content_hashes.seed(target_url, rules[watch.id], watch.last_content_hash, watch.last_status)
+        try:
+            statuses = await async_scrape_many(target_url, list(rules.values()), adapter_name=watches[0].adapter)
+        except Exception as e:
+            statuses = {rule_key: f"Error: {e}" for rule_key in rules.values()}
+
+    return [
+        (watch, statuses[rules[watch.id]], content_hashes.hash_for(target_url, rules[watch.id], statuses[rules[watch.id]]))
+        for watch in watches
+    ]
+
+
+async def stream_bulk_refresh(
+    trackers_by_watch: Dict[int, List[Tracker]],
+    watches: List[Watch],
+    missing_ids: List[int]
+) -> AsyncIterator[str]:
+    """
+    Scrape the watches of a bulk refresh and yield one NDJSON line per tracker as each finishes.
+
+    Watches of the same page are scraped together, as the scheduler does, so
+    the page is fetched once rather than once per watch.
+
+    The new statuses are written back in one transaction once every scrape is
+    done (the request's own session is closed by then, so this opens its own),
+    followed by a summary line. If the client disconnects first, the remaining
+    scrapes are cancelled and nothing is written.
+    """
+    for tracker_id in missing_ids:
+        yield json.dumps({"tracker_id": tracker_id, "error": "Tracker not found"}) + "\n"
+
+    slots = asyncio.Semaphore(TRACKER_BULK_REFRESH_CONCURRENCY)
+    tasks = [asyncio.create_task(_scrape_watch_group(group, slots)) for group in _scrape_groups(watches)]
+    results: Dict[int, str] = {}
+    hashes: Dict[int, Optional[str]] = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            for watch, new_status, content_hash in await next_done:
+                results[watch.id] = new_status
+                hashes[watch.id] = content_hash
+                for tracker in trackers_by_watch[watch.id]:
+                    yield json.dumps({
+                        "tracker_id": tracker.id,
+                        "name": tracker.name,
+                        "old_status": tracker.last_status,
+                        "last_status": new_status,
+                        "changed": tracker.last_status != new_status
+                    }) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    async with AsyncSessionLocal() as session:
+        if results:
+            await session.execute(
+                update(Watch),
+                [
+                    {"id": watch_id, "last_status": new_status, "last_content_hash": hashes[watch_id]}
+                    for watch_id, new_status in results.items()
+                ]
+            )
+        changes = await fan_out_statuses(session, results)
+        await session.commit()
+
+    await notify_status_changes(changes)
+    yield json.dumps({
+        "done": True,
+        "refreshed": sum(len(trackers) for trackers in trackers_by_watch.values()),
+        "changed": len(changes)
+    }) + "\n"
+
+
+@router.post("/refresh", response_class=StreamingResponse)
+async def refresh_trackers(
+    refresh_data: Optional[TrackerBulkRefresh] = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Refresh all (or the chosen) trackers of the current user at once.
+    
+    Pages are scraped concurrently, TRACKER_BULK_REFRESH_CONCURRENCY at a
+    time and once for all the watches on them, and the response streams one JSON line
+    per tracker (application/x-ndjson) as its scrape finishes, then a
+    {"done": true, ...} line after the statuses are saved.
+    """
+    
+    tracker_ids = refresh_data.tracker_ids if refresh_data else None
+    query = (
+        select(Tracker, Watch)
+        .join(Watch, Tracker.watch_id == Watch.id)
+        .where(Tracker.user_id == current_user["user_id"])
+    )
+    if tracker_ids is not None:
+        query = query.where(Tracker.id.in_(tracker_ids))
+    
+    try:
+        rows = (await db.execute(query)).all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    
+    trackers_by_watch: Dict[int, List[Tracker]] = defaultdict(list)
+    watches: Dict[int, Watch] = {}
+    for tracker, watch in rows:
+        trackers_by_watch[watch.id].append(tracker)
+        watches[watch.id] = watch
+    
+    found_ids = {tracker.id for tracker, _ in rows}
+    missing_ids = [tracker_id for tracker_id in (tracker_ids or []) if tracker_id not in found_ids]
+    
+    print(f"🔄 Bulk refresh: {len(rows)} trackers over {len(watches)} watches")
+    return StreamingResponse(
+        stream_bulk_refresh(trackers_by_watch, list(watches.values()), missing_ids),
+        media_type="application/x-ndjson"
+    )
+
+
 @router.delete("/{tracker_id}")
 async def delete_tracker(
     tracker_id: int,
@@ -195,6 +571,8 @@ async def delete_tracker(
             raise HTTPException(status_code=404, detail="Tracker not found")
         
         await db.delete(tracker)
+        await db.flush()
+        await release_watch(db, tracker.watch_id)
         await db.commit()
         
         return {"message": "Tracker deleted successfully"}
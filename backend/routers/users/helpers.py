@@ -14,6 +14,8 @@ from sqlalchemy.sql import func
 
 from config import supabase, supabase_admin
 from models import Profile
+from services.profiles import ensure_profile
+from services.role_sync import profile_role, profiles_with_roles, set_user_role
 from routers.users.schemas import ProfileUpdate, UserProfileResponse
 
 logger = logging.getLogger(__name__)
@@ -35,25 +37,14 @@ async def get_or_create_user_profile(
     """
     user_id = current_user["user_id"]
     
+    # Create profile if it doesn't exist (safe against concurrent first requests)
+    await ensure_profile(db, user_id, current_user["email"], current_user.get("user_metadata"))
+    
     # Get user profile
     result = await db.execute(
         select(Profile).where(Profile.id == user_id)
     )
-    profile = result.scalar_one_or_none()
-    
-    if not profile:
-        # Create profile if it doesn't exist
-        profile = Profile(
-            id=user_id,
-            email=current_user["email"],
-            is_active=True
-        )
-        db.add(profile)
-        await db.commit()
-        await db.refresh(profile)
-        logger.info(f"Created new profile for user: {user_id}")
-    
-    return profile
+    return result.scalar_one()
 
 
 def create_user_response_data(
@@ -448,7 +439,8 @@ async def handle_profile_image_deletion(
 async def get_all_user_profiles(
     db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    role: Optional[str] = None
 ) -> list[UserProfileResponse]:
     """
     Get all user profiles for admin listing
@@ -457,6 +449,7 @@ async def get_all_user_profiles(
         db: Database session
         skip: Number of records to skip
         limit: Maximum number of records to return
+        role: Only list users with this role
         
     Returns:
         List[UserProfileResponse]: List of user profiles
@@ -465,41 +458,22 @@ async def get_all_user_profiles(
         HTTPException: If listing fails
     """
     try:
-        # Get all profiles
+        # Profiles and their roles from the local role replica in one query
+        query = profiles_with_roles()
+        if role:
+            query = query.where(profile_role == role)
         result = await db.execute(
-            select(Profile).offset(skip).limit(limit)
+            query.order_by(Profile.created_at, Profile.id).offset(skip).limit(limit)
         )
-        profiles = result.scalars().all()
-        
-        # Get user roles from Supabase for each profile
-        users = []
-        for profile in profiles:
-            try:
-                # Get user from Supabase to fetch role
-                supabase_user = supabase_admin.auth.admin.get_user_by_id(str(profile.id))
-                user_role = "user"  # Default fallback
-                
-                if supabase_user.user and supabase_user.user.user_metadata:
-                    user_role = supabase_user.user.user_metadata.get("role", "user")
-                
-                user_data = {
-                    **profile.__dict__,
-                    "user_id": str(profile.id),
-                    "role": user_role
-                }
-                users.append(UserProfileResponse.model_validate(user_data))
-                
-            except Exception as role_error:
-                logger.warning(f"Failed to get role for user {profile.id}: {str(role_error)}")
-                # Fallback to default role if can't fetch from Supabase
-                user_data = {
-                    **profile.__dict__,
-                    "user_id": str(profile.id),
-                    "role": "user"
-                }
-                users.append(UserProfileResponse.model_validate(user_data))
         
-        return users
+        return [
+            UserProfileResponse.model_validate({
+                **profile.__dict__,
+                "user_id": str(profile.id),
+                "role": user_role
+            })
+            for profile, user_role in result.all()
+        ]
         
     except Exception as e:
         logger.error(f"Error listing users: {str(e)}")
@@ -520,7 +494,7 @@ async def update_user_role_via_admin_api(
     Args:
         user_id: User ID to update
         role: New role to assign
-        db: Database session (kept for consistency but not used for role storage)
+        db: Database session (for the local role replica)
         
     Returns:
         Dict: Response with update status
@@ -545,8 +519,10 @@ async def update_user_role_via_admin_api(
                 detail="User not found"
             )
         
-        # Note: We don't store roles in the database, only in Supabase user_metadata
-        # This ensures consistency with JWT-based authentication
+        # Supabase user_metadata stays the source of truth (it's what JWTs carry);
+        # the local replica only serves listings
+        await set_user_role(db, user_id, role)
+        await db.commit()
         
         logger.info(f"Updated role for user {user_id} to {role}")
         
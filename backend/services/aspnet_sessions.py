@@ -0,0 +1,105 @@
+"""
+Warm ASP.NET form sessions for the scraper
+
+ASP.NET WebForms pages (like GNDU's result portal) expect each postback to
+carry the hidden state fields (__VIEWSTATE, __EVENTVALIDATION, ...) of the
+form and the session cookie it was served with. Posting a bare form works
+but makes the server rebuild state for every lookup.
+
+An AspNetFormSession fetches the form once, then reuses its cookie jar for
+every following POST, carrying forward the hidden fields of the latest page
+the server sent (a postback answers with the form again, with new state).
+An AspNetSessionPool keeps a few of them per form URL, so a large batch of
+lookups is spread over the sessions and each session posts its share back to
+back.
+
+Session requests bypass the per-request circuit breaker: a lookup may take
+a warm-up GET and a retried POST, so callers check and record the breaker
+once per lookup instead.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from services import http_client
+from services.html_parser import html_parser
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class AspNetFormSession:
+    """One server-side session: a cookie jar plus the form's hidden state fields."""
+
+    def __init__(self, form_url: str, max_bytes: int, **request_kwargs):
+        self.form_url = form_url
+        self.max_bytes = max_bytes
+        self.request_kwargs = request_kwargs
+        self.client: Optional[httpx.AsyncClient] = None
+        self.hidden_fields: Dict[str, str] = {}
+
+    async def warm_up(self) -> None:
+        """Load the form to get a session cookie and fresh hidden state fields."""
+        if self.client is None:
+            self.client = http_client.open_session_client()
+        page = await http_client.fetch_page(
+            "GET", self.form_url, max_bytes=self.max_bytes, client=self.client, breaker=False, **self.request_kwargs
+        )
+        page.response.raise_for_status()
+        self.hidden_fields = await asyncio.to_thread(html_parser.hidden_inputs, page.text)
+        logger.info(f"🔥 Warmed up form session for {self.form_url} ({len(self.hidden_fields)} hidden fields)")
+
+    async def post(self, fields: Dict[str, str]) -> http_client.FetchedPage:
+        """Submit the form with the session's state and the given fields, keeping the state the response carries."""
+        if not self.hidden_fields:
+            await self.warm_up()
+        page = await http_client.fetch_page(
+            "POST", self.form_url, max_bytes=self.max_bytes, client=self.client, breaker=False,
+            data={**self.hidden_fields, **fields}, **self.request_kwargs
+        )
+        if not page.response.is_error:
+            # __VIEWSTATE and __EVENTVALIDATION change with every postback; posting
+            # the warm-up page's values forever eventually gets them rejected
+            hidden_fields = await asyncio.to_thread(html_parser.hidden_inputs, page.text)
+            if hidden_fields:
+                self.hidden_fields = hidden_fields
+        return page
+
+    def reset(self) -> None:
+        """Drop the stored state (e.g. after the server rejected it); the next post re-fetches the form."""
+        self.hidden_fields = {}
+        if self.client is not None:
+            self.client.cookies.clear()
+
+
+class AspNetSessionPool:
+    """A fixed number of warm sessions for one form URL, handed out one caller at a time."""
+
+    def __init__(self, form_url: str, size: int, max_bytes: int, **request_kwargs):
+        self.form_url = form_url
+        self.size = size
+        self.max_bytes = max_bytes
+        self.request_kwargs = request_kwargs
+        self._idle: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AspNetFormSession]:
+        """Borrow a session, waiting for one to be free."""
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop:
+            # Sessions hold clients bound to the loop they were made on
+            self._idle = asyncio.Queue()
+            for _ in range(self.size):
+                self._idle.put_nowait(AspNetFormSession(self.form_url, self.max_bytes, **self.request_kwargs))
+            self._loop = loop
+
+        idle = self._idle
+        form_session = await idle.get()
+        try:
+            yield form_session
+        finally:
+            idle.put_nowait(form_session)
@@ -0,0 +1,137 @@
+"""
+Per-host circuit breaker for the scraper
+
+When a target site is down, every scrape of it would otherwise wait out the
+full request timeout before failing. The breaker counts consecutive failures
+(connection errors, timeouts and 5xx responses) per host:
+
+- closed: requests flow normally
+- open: after SCRAPE_BREAKER_FAILURE_THRESHOLD failures in a row, requests to
+  the host fail immediately with CircuitOpenError for
+  SCRAPE_BREAKER_RESET_SECONDS
+- half-open: after that, a few probe requests are let through; a success
+  closes the circuit again, a failure re-opens it for another period
+
+An outage of one portal then costs almost nothing to scrapes of other hosts.
+"""
+import logging
+import threading
+import time
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from config import (
+    SCRAPE_BREAKER_FAILURE_THRESHOLD,
+    SCRAPE_BREAKER_RESET_SECONDS,
+    SCRAPE_BREAKER_HALF_OPEN_PROBES
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class HostCircuit:
+    """Breaker state of one host."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at: List[float] = []
+
+
+class CircuitBreaker:
+    """Per-host circuit breakers shared by every scrape in this process."""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, half_open_probes: int):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.half_open_probes = half_open_probes
+        self._circuits: Dict[str, HostCircuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, url: str) -> HostCircuit:
+        host = (urlsplit(url).hostname or "").lower()
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = HostCircuit(host)
+            self._circuits[host] = circuit
+        return circuit
+
+    def before_request(self, url: str) -> None:
+        """
+        Check that a request to url's host may be sent.
+
+        Raises:
+            CircuitOpenError: If the host's circuit is open, or half-open with
+                all probe slots taken
+        """
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state == CLOSED:
+                return
+
+            now = time.monotonic()
+            retry_in = circuit.opened_at + self.reset_seconds - now
+            if circuit.state == OPEN:
+                if retry_in > 0:
+                    raise CircuitOpenError(
+                        f"{circuit.host} is failing, skipping request (retrying in {retry_in:.0f}s)"
+                    )
+                circuit.state = HALF_OPEN
+                circuit.probe_started_at = []
+                logger.info(f"🔌 Circuit for {circuit.host} half-open, sending probe request")
+
+            # Probes that never reported back (e.g. cancelled) free their slot after a reset period
+            circuit.probe_started_at = [
+                started for started in circuit.probe_started_at if now - started < self.reset_seconds
+            ]
+            if len(circuit.probe_started_at) >= self.half_open_probes:
+                raise CircuitOpenError(f"{circuit.host} is failing, waiting for probe request to finish")
+            circuit.probe_started_at.append(now)
+
+    def record_success(self, url: str) -> None:
+        """Record a request that got a non-5xx response."""
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.state != CLOSED:
+                logger.info(f"✅ Circuit for {circuit.host} closed, host is responding again")
+            circuit.state = CLOSED
+            circuit.failures = 0
+            circuit.probe_started_at = []
+
+    def record_failure(self, url: str, reason: str) -> None:
+        """Record a connection error, timeout or 5xx response."""
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                if circuit.state != OPEN:
+                    logger.warning(
+                        f"🔌 Circuit for {circuit.host} opened after {circuit.failures} failures "
+                        f"(last: {reason}), failing fast for {self.reset_seconds:.0f}s"
+                    )
+                circuit.state = OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.probe_started_at = []
+
+    def stats(self) -> Dict[str, str]:
+        """State of every host that isn't closed, for monitoring."""
+        with self._lock:
+            return {host: circuit.state for host, circuit in self._circuits.items() if circuit.state != CLOSED}
+
+
+circuit_breaker = CircuitBreaker(
+    failure_threshold=SCRAPE_BREAKER_FAILURE_THRESHOLD,
+    reset_seconds=SCRAPE_BREAKER_RESET_SECONDS,
+    half_open_probes=SCRAPE_BREAKER_HALF_OPEN_PROBES
+)
@@ -0,0 +1,106 @@
+"""
+Content-hash short-circuit for the scraper
+
+Many pages ignore ETag / Last-Modified but still serve byte-identical bodies
+between polls. For each (target_url, rule) this remembers a digest of the body
+the status was computed from, so an unchanged body is answered with the
+stored status without parsing or matching it again.
+
+The digests are also stored on the watches (last_content_hash) so a restarted
+worker can seed this cache instead of re-parsing every page once.
+
+Only complete bodies are hashed, and error statuses are never kept: a digest
+is always paired with the status actually computed from that body, so a
+failed scrape can't be replayed for a healthy page.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from config import SCRAPE_CONTENT_HASH_CACHE_SIZE
+from services.page_cache import RuleKey
+from services.watches import is_error_status
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class ContentHashCache:
+    """Bounded LRU of (content hash, status) keyed by (target_url, rule)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, RuleKey], Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, url: str, rule_keys: List[RuleKey], content_hash: str) -> Optional[Dict[RuleKey, str]]:
+        """Return the stored statuses if every rule was computed from this exact body."""
+        with self._lock:
+            statuses = {}
+            for rule_key in rule_keys:
+                entry = self._entries.get((url, rule_key))
+                if entry is None or entry[0] != content_hash:
+                    self.misses += 1
+                    return None
+                statuses[rule_key] = entry[1]
+
+            for rule_key in rule_keys:
+                self._entries.move_to_end((url, rule_key))
+            self.hits += 1
+            return statuses
+
+    def store(self, url: str, content_hash: str, statuses: Dict[RuleKey, str]) -> None:
+        """Record the statuses computed from a body with the given hash."""
+        if not content_hash:
+            return
+        with self._lock:
+            for rule_key, status in statuses.items():
+                if is_error_status(status):
+                    # Never replay a failure for this body; drop any older digest too
+                    self._entries.pop((url, rule_key), None)
+                    continue
+                self._entries[(url, rule_key)] = (content_hash, status)
+                self._entries.move_to_end((url, rule_key))
+            self._evict()
+
+    def seed(self, url: str, rule_key: RuleKey, content_hash: Optional[str], status: Optional[str]) -> None:
+        """Load a persisted hash and status, unless this process already has a newer one."""
+        if not content_hash or status is None or is_error_status(status):
+            return
+        with self._lock:
+            if (url, rule_key) in self._entries:
+                return
+            self._entries[(url, rule_key)] = (content_hash, status)
+            self._evict()
+
+    def hash_for(self, url: str, rule_key: RuleKey, status: str) -> Optional[str]:
+        """
+        Hash of the body a status was computed from, to persist alongside it.
+
+        None unless the cached entry holds this very status, e.g. when the
+        scrape failed and the entry still belongs to the last good page.
+        """
+        with self._lock:
+            entry = self._entries.get((url, rule_key))
+            if entry is None or entry[1] != status:
+                return None
+            return entry[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+content_hashes = ContentHashCache(SCRAPE_CONTENT_HASH_CACHE_SIZE)
@@ -0,0 +1,98 @@
+"""
+Early-exit conditions for streamed scrapes
+
+Each condition is called with the page text read so far and returns True
+once enough of the page has arrived to compute the status, so the rest of
+the body never has to be downloaded. They look at raw HTML, so they are only
+hints: the scraper checks the parsed result and reads the whole page if the
+hint turns out to be wrong.
+"""
+import re
+from typing import Callable, Optional
+
+# Text read past a search term hit, so the rest of its line is in the page
+TERM_CONTEXT_CHARS = 4096
+
+# An element's id attribute must be within this many chars of its tag start
+MAX_TAG_LENGTH = 2048
+
+# "#id" or "tag#id" selectors, whose element can be found in raw HTML
+ID_SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*)?#([\w-]+)$')
+
+
+class TermFoundCondition:
+    """Stop once the search term and the text after it have been read."""
+
+    def __init__(self, search_term: str):
+        self.search_term = search_term.lower()
+        self.scanned = 0
+        self.found_at: Optional[int] = None
+
+    def __call__(self, text: str) -> bool:
+        if self.found_at is None:
+            # Only scan new text, overlapping enough to catch a term split across chunks
+            start = max(0, self.scanned - len(self.search_term) + 1)
+            self.scanned = len(text)
+            index = text[start:].lower().find(self.search_term)
+            if index == -1:
+                return False
+            self.found_at = start + index
+
+        end_of_line = text.find('\n', self.found_at)
+        return end_of_line != -1 and len(text) - self.found_at >= TERM_CONTEXT_CHARS
+
+
+class ElementClosedCondition:
+    """Stop once the element with the given id has been read up to its end tag."""
+
+    def __init__(self, element_id: str, tag: Optional[str] = None):
+        self.id_re = re.compile(r'\bid\s*=\s*["\']?' + re.escape(element_id) + r'(?=["\'\s/>])', re.IGNORECASE)
+        self.tag = tag
+        self.scanned = 0
+        self.tag_re: Optional[re.Pattern] = None
+        self.depth = 0
+        self.position = 0
+
+    def __call__(self, text: str) -> bool:
+        if self.tag_re is None:
+            match = self.id_re.search(text, max(0, self.scanned - MAX_TAG_LENGTH))
+            self.scanned = len(text)
+            if match is None:
+                return False
+
+            tag_start = text.rfind('<', 0, match.start())
+            tag_match = re.match(r'<([a-zA-Z][\w-]*)', text[tag_start:])
+            if tag_start == -1 or tag_match is None:
+                return False
+            tag = self.tag or tag_match.group(1)
+            if tag_match.group(1).lower() != tag.lower():
+                # Same id on a different tag than the selector asks for
+                return False
+
+            self.tag_re = re.compile(r'<(/?)' + re.escape(tag) + r'\b', re.IGNORECASE)
+            self.position = tag_start
+
+        # Track nesting of the same tag until the element's own end tag
+        for match in self.tag_re.finditer(text, self.position):
+            self.depth += -1 if match.group(1) else 1
+            self.position = match.end()
+            if self.depth == 0:
+                return True
+        return False
+
+
+def stop_condition_for(selector_or_pattern: Optional[str], search_term: Optional[str]) -> Optional[Callable[[str], bool]]:
+    """
+    Build the early-exit condition for a scrape, if its target can be spotted in raw HTML.
+
+    Regex patterns and complex selectors need the whole page, so they get none.
+    """
+    if selector_or_pattern:
+        match = ID_SELECTOR_RE.match(selector_or_pattern.strip())
+        if match:
+            return ElementClosedCondition(match.group(2), tag=match.group(1))
+        return None
+
+    if search_term:
+        return TermFoundCondition(search_term)
+    return None
@@ -0,0 +1,118 @@
+"""
+Compiled extraction rules for the scraper
+
+A tracker's selector_or_pattern is the same string on every scrape, so regex
+patterns and CSS selectors are compiled once and kept in a bounded LRU keyed
+by the rule string instead of being re-parsed each time.
+
+Regex rules use search(), which stops at the first match instead of finding
+every match in the document. Every search runs in a worker process with a
+time budget (see services.regex_sandbox): catastrophic backtracking can't be
+reliably spotted from the pattern, e.g. ".*.*.*=x" looks harmless.
+"""
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+import soupsieve
+
+from config import SCRAPE_RULE_CACHE_SIZE, SCRAPE_REGEX_TIMEOUT_SECONDS, SCRAPE_REGEX_WORKERS
+from services.regex_sandbox import MatchValue, RegexSandbox, RegexTimeout  # noqa: F401
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+REGEX_FLAGS = re.IGNORECASE
+
+REGEX_PREFIX = "regex:"
+
+# Longest selector_or_pattern a tracker may store
+MAX_RULE_LENGTH = 500
+
+# Worker processes user regexes are searched in
+regex_sandbox = RegexSandbox(SCRAPE_REGEX_WORKERS, pattern_cache_size=SCRAPE_RULE_CACHE_SIZE)
+
+# Threads that parse pages with regex rules. A search blocks its thread until a
+# sandbox worker is free, so these get their own pool (one thread per worker)
+# instead of tying up the event loop's default executor.
+regex_executor = ThreadPoolExecutor(max_workers=SCRAPE_REGEX_WORKERS, thread_name_prefix="regex-rules")
+
+
+@lru_cache(maxsize=SCRAPE_RULE_CACHE_SIZE)
+def compiled_regex(pattern: str) -> "re.Pattern":
+    """Compile a regex rule (re.error propagates for invalid patterns)."""
+    return re.compile(pattern, REGEX_FLAGS)
+
+
+@lru_cache(maxsize=SCRAPE_RULE_CACHE_SIZE)
+def compiled_selector(selector: str) -> "soupsieve.SoupSieve":
+    """Compile a CSS selector rule for BeautifulSoup trees."""
+    return soupsieve.compile(selector)
+
+
+def regex_first_match(pattern: str, text: str) -> Optional[MatchValue]:
+    """
+    First match of a regex rule in text, as re.findall(pattern, text)[0] would give it.
+
+    Raises:
+        re.error: If the pattern is invalid
+        RegexTimeout: If the search runs past SCRAPE_REGEX_TIMEOUT_SECONDS
+    """
+    compiled_regex(pattern)  # Invalid patterns fail here, without a round-trip to a worker
+    return regex_sandbox.search(pattern, REGEX_FLAGS, text, SCRAPE_REGEX_TIMEOUT_SECONDS)
+
+
+def has_regex_rule(rule_keys: Iterable[Tuple[Optional[str], Optional[str]]]) -> bool:
+    """Whether any (selector_or_pattern, search_term) rule is a regex rule."""
+    return any(rule and rule.startswith(REGEX_PREFIX) for rule, _ in rule_keys)
+
+
+def validate_rule(selector_or_pattern: Optional[str]) -> Optional[str]:
+    """
+    Normalize and check a tracker's selector_or_pattern before it is stored.
+
+    Args:
+        selector_or_pattern: "regex:<pattern>", a CSS selector, or empty for plain search
+
+    Returns:
+        Optional[str]: The stripped rule, or None for no rule
+
+    Raises:
+        ValueError: If the rule is too long or doesn't compile
+    """
+    if selector_or_pattern is None or not selector_or_pattern.strip():
+        return None
+
+    rule = selector_or_pattern.strip()
+    if len(rule) > MAX_RULE_LENGTH:
+        raise ValueError(f"Selector or pattern must be at most {MAX_RULE_LENGTH} characters")
+
+    if rule.startswith(REGEX_PREFIX):
+        pattern = rule[len(REGEX_PREFIX):]
+        if not pattern:
+            raise ValueError("Regex rule needs a pattern after 'regex:'")
+        try:
+            compiled_regex(pattern)
+        except re.error as e:
+            raise ValueError(f"Invalid regex pattern: {e}")
+        return rule
+
+    try:
+        compiled_selector(rule)
+    except soupsieve.SelectorSyntaxError as e:
+        raise ValueError(f"Invalid CSS selector: {e}")
+    return rule
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the compiled rule caches."""
+    regex_info = compiled_regex.cache_info()
+    selector_info = compiled_selector.cache_info()
+    return {
+        "regex_hits": regex_info.hits,
+        "regex_misses": regex_info.misses,
+        "selector_hits": selector_info.hits,
+        "selector_misses": selector_info.misses
+    }
@@ -0,0 +1,172 @@
+"""
+Pluggable HTML parser backends for the scraper
+
+The scraper only ever needs a few things from a page: its text, the text of
+the first element matching a CSS selector, a couple of elements by id, or a
+form's hidden fields.
+Each backend answers those questions as cheaply as it can:
+
+- "html.parser" / "lxml": BeautifulSoup with the given tree builder. When the
+  target is known (an id or class selector, the GNDU result spans) only the
+  matching subtree is built, using a SoupStrainer.
+- "selectolax": the lexbor engine, much faster on large pages.
+
+Pick one per deployment with HTML_PARSER_BACKEND. Backends whose package is
+not installed fall back to "html.parser".
+"""
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from config import HTML_PARSER_BACKEND
+from services.extraction_rules import compiled_selector
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Try to import the optional fast parsers
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Selectors simple enough to parse only the matching subtree: "tag", "#id", "tag#id", ".cls", "tag.cls"
+SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][\w-]*)?(?:([#.])([\w-]+))?$')
+
+
+class SoupParser:
+    """BeautifulSoup-backed parser (html.parser or lxml tree builder)."""
+
+    def __init__(self, features: str):
+        self.name = features
+        self.features = features
+
+    def _soup(self, html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+        return BeautifulSoup(html, self.features, parse_only=parse_only)
+
+    def page_text(self, html: str) -> str:
+        return self._soup(html).get_text()
+
+    def select_first_text(self, html: str, selector: str) -> Optional[str]:
+        soup = self._soup(html, parse_only=self._strainer_for(selector))
+        element = compiled_selector(selector).select_one(soup)
+        return element.get_text(strip=True) if element is not None else None
+
+    def texts_by_id(self, html: str, tag: str, element_ids: List[str]) -> List[Optional[str]]:
+        soup = self._soup(html, parse_only=SoupStrainer(tag, id=element_ids))
+        texts = []
+        for element_id in element_ids:
+            element = soup.find(tag, {'id': element_id})
+            texts.append(element.text if element is not None else None)
+        return texts
+
+    def hidden_inputs(self, html: str) -> Dict[str, str]:
+        is_hidden = lambda input_type: bool(input_type) and input_type.lower() == 'hidden'
+        soup = self._soup(html, parse_only=SoupStrainer('input', type=is_hidden))
+        return {
+            element['name']: element.get('value', '')
+            for element in soup.find_all('input', type=is_hidden)
+            if element.get('name')
+        }
+
+    def title_and_first_paragraph(self, html: str) -> Tuple[Optional[str], Optional[str]]:
+        soup = self._soup(html, parse_only=SoupStrainer(['title', 'p']))
+        title = soup.find('title')
+        first_p = soup.find('p')
+        return (
+            title.get_text(strip=True) if title else None,
+            first_p.get_text(strip=True) if first_p else None
+        )
+
+    @staticmethod
+    def _strainer_for(selector: str) -> Optional[SoupStrainer]:
+        """Strainer that keeps only the elements a simple selector can match."""
+        match = SIMPLE_SELECTOR_RE.match(selector.strip())
+        if not match or not (match.group(1) or match.group(3)):
+            return None
+
+        tag, kind, value = match.groups()
+        # The tree builder lowercases HTML tag names, and the strainer compares them case-sensitively
+        tag = tag.lower() if tag else tag
+        if kind == '#':
+            return SoupStrainer(tag or True, id=value)
+        if kind == '.':
+            # The class attribute can hold several names; match any one of them
+            def has_class(classes) -> bool:
+                if not classes:
+                    return False
+                if isinstance(classes, str):
+                    classes = classes.split()
+                return value in classes
+            return SoupStrainer(tag or True, class_=has_class)
+        return SoupStrainer(tag)
+
+
+class SelectolaxParser:
+    """Parser backed by selectolax's lexbor engine."""
+
+    name = "selectolax"
+
+    def _tree(self, html: str) -> "LexborHTMLParser":
+        return LexborHTMLParser(html)
+
+    def page_text(self, html: str) -> str:
+        tree = self._tree(html)
+        # Match BeautifulSoup, which leaves script and style contents out of get_text()
+        tree.strip_tags(['script', 'style', 'template'])
+        return tree.root.text() if tree.root is not None else ""
+
+    def select_first_text(self, html: str, selector: str) -> Optional[str]:
+        element = self._tree(html).css_first(selector)
+        return element.text(strip=True) if element is not None else None
+
+    def texts_by_id(self, html: str, tag: str, element_ids: List[str]) -> List[Optional[str]]:
+        tree = self._tree(html)
+        texts = []
+        for element_id in element_ids:
+            element = tree.css_first(f'{tag}[id="{element_id}"]')
+            texts.append(element.text() if element is not None else None)
+        return texts
+
+    def hidden_inputs(self, html: str) -> Dict[str, str]:
+        return {
+            element.attributes['name']: element.attributes.get('value') or ''
+            for element in self._tree(html).css('input[type="hidden"]')
+            if element.attributes.get('name')
+        }
+
+    def title_and_first_paragraph(self, html: str) -> Tuple[Optional[str], Optional[str]]:
+        tree = self._tree(html)
+        title = tree.css_first('title')
+        first_p = tree.css_first('p')
+        return (
+            title.text(strip=True) if title is not None else None,
+            first_p.text(strip=True) if first_p is not None else None
+        )
+
+
+def _create_parser(backend: str):
+    if backend == "selectolax":
+        if SELECTOLAX_AVAILABLE:
+            return SelectolaxParser()
+        logger.warning("⚠️ selectolax not installed, falling back to html.parser. Install with: pip install selectolax")
+    elif backend == "lxml":
+        if LXML_AVAILABLE:
+            return SoupParser("lxml")
+        logger.warning("⚠️ lxml not installed, falling back to html.parser. Install with: pip install lxml")
+    elif backend != "html.parser":
+        logger.warning(f"⚠️ Unknown HTML_PARSER_BACKEND '{backend}', falling back to html.parser")
+    return SoupParser("html.parser")
+
+
+html_parser = _create_parser(HTML_PARSER_BACKEND)
+logger.info(f"🧩 Scraper HTML parser backend: {html_parser.name}")
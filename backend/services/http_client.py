@@ -0,0 +1,274 @@
+"""
+Shared pooled HTTP clients for the scraper
+
+All scrapes go through one long-lived httpx.AsyncClient so connections to the
+same university and government hosts are kept alive and reused instead of
+doing a fresh TCP and TLS handshake per scrape. HTTP/2 is negotiated where the
+server supports it, and a per-origin semaphore bounds how many requests (and
+so connections) we open to any single host. Requests are also paced by the
+per-host rate limiter in services.rate_limiter, which learns from each
+response's status and latency, and hosts that keep failing are short-circuited
+by services.circuit_breaker instead of waiting out the timeout every time.
+"""
+import asyncio
+import codecs
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    SCRAPE_HTTP2_ENABLED,
+    SCRAPE_MAX_CONNECTIONS,
+    SCRAPE_MAX_CONNECTIONS_PER_HOST,
+    SCRAPE_KEEPALIVE_SECONDS
+)
+from services.circuit_breaker import circuit_breaker, CircuitOpenError  # noqa: F401 - re-exported for scrapers
+from services.rate_limiter import rate_limiter, RateLimited  # noqa: F401 - re-exported for scrapers
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+    logger.warning("⚠️ h2 not installed. Scraper will use HTTP/1.1 only. Install with: pip install h2")
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_session_clients: List[httpx.AsyncClient] = []
+_origin_semaphores: Dict[str, asyncio.Semaphore] = {}
+_sync_session: Optional[requests.Session] = None
+
+
+def get_origin(url: str) -> str:
+    """Return the scheme://host[:port] origin a URL's connections are pooled under."""
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get the shared async client, creating it on first use.
+
+    The client is tied to the event loop it was created on, so a new one is
+    made if called from a different loop (e.g. a fresh asyncio.run()).
+    """
+    global _async_client, _async_client_loop, _origin_semaphores
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = _create_async_client(SCRAPE_MAX_CONNECTIONS)
+        _async_client_loop = loop
+        _origin_semaphores = {}
+    return _async_client
+
+
+def _create_async_client(max_connections: int) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=SCRAPE_HTTP2_ENABLED and HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=SCRAPE_KEEPALIVE_SECONDS
+        ),
+        follow_redirects=True
+    )
+
+
+def open_session_client() -> httpx.AsyncClient:
+    """
+    Create a client with its own cookie jar, for sites that need a server-side session.
+
+    It still goes through the per-origin limits when passed as client= to
+    fetch_page, and is closed by close_async_client().
+    """
+    get_async_client()  # Reset per-loop state if needed
+    client = _create_async_client(SCRAPE_MAX_CONNECTIONS_PER_HOST)
+    _session_clients.append(client)
+    return client
+
+
+def origin_slot(url: str) -> asyncio.Semaphore:
+    """Semaphore bounding concurrent requests to the URL's origin."""
+    get_async_client()  # Reset per-loop state if needed
+    origin = get_origin(url)
+    semaphore = _origin_semaphores.get(origin)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(SCRAPE_MAX_CONNECTIONS_PER_HOST)
+        _origin_semaphores[origin] = semaphore
+    return semaphore
+
+
+def _record_response(url: str, response, latency: float, breaker: bool = True) -> None:
+    """Let the rate limiter and circuit breaker learn from a response (httpx or requests)."""
+    rate_limiter.record(url, response.status_code, latency, response.headers.get("Retry-After"))
+    if not breaker:
+        return
+    if response.status_code >= 500:
+        circuit_breaker.record_failure(url, f"HTTP {response.status_code}")
+    else:
+        circuit_breaker.record_success(url)
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds the configured byte cap."""
+
+
+@dataclass
+class FetchedPage:
+    response: Union[httpx.Response, requests.Response]  # Status and headers; the body is in text
+    text: str
+    body_size: int  # Bytes actually read
+    complete: bool  # False when reading stopped early
+    content_hash: str = ""  # blake2b digest of the body (complete reads only)
+
+
+async def fetch_page(
+    method: str,
+    url: str,
+    max_bytes: int,
+    stop_when: Optional[Callable[[str], bool]] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    breaker: bool = True,
+    **kwargs
+) -> FetchedPage:
+    """
+    Stream a response body in chunks instead of loading it all at once.
+
+    Args:
+        method: HTTP method
+        url: URL to fetch
+        max_bytes: Abort with ResponseTooLarge once the body exceeds this many bytes
+        stop_when: Called with the text read so far after each chunk; returning
+            True stops reading (the rest of the body is never downloaded)
+        client: Session client from open_session_client (default: the shared client)
+        breaker: Check and update the host's circuit breaker for this request; False
+            when the caller guards a multi-request operation as a whole instead
+        **kwargs: Passed on to httpx (headers, data, timeout, ...)
+
+    Returns:
+        FetchedPage: Response metadata and the decoded text that was read
+    """
+    if breaker:
+        circuit_breaker.before_request(url)
+    client = client or get_async_client()
+    await rate_limiter.acquire(url)
+    async with origin_slot(url):
+        started = time.monotonic()
+        try:
+            async with client.stream(method, url, **kwargs) as response:
+                _record_response(url, response, time.monotonic() - started, breaker)
+                content_length = response.headers.get("Content-Length")
+                if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                    raise ResponseTooLarge(
+                        f"Response body is {content_length} bytes, over the {max_bytes} byte limit"
+                    )
+
+                # Errors and 304s are handled from the status code alone
+                if response.status_code >= 300:
+                    return FetchedPage(response=response, text="", body_size=0, complete=True)
+
+                decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+                hasher = hashlib.blake2b(digest_size=16)
+                text = ""
+                body_size = 0
+                async for chunk in response.aiter_bytes():
+                    body_size += len(chunk)
+                    if body_size > max_bytes:
+                        raise ResponseTooLarge(f"Response body exceeds the {max_bytes} byte limit")
+                    hasher.update(chunk)
+                    text += decoder.decode(chunk)
+                    if stop_when is not None and stop_when(text):
+                        logger.info(f"✂️ Stopped reading {url} early after {body_size} bytes")
+                        # No digest: where reading stops depends on how the body was chunked
+                        return FetchedPage(response=response, text=text, body_size=body_size, complete=False)
+
+                text += decoder.decode(b"", final=True)
+                return FetchedPage(
+                    response=response, text=text, body_size=body_size,
+                    complete=True, content_hash=hasher.hexdigest()
+                )
+        except httpx.TransportError as e:
+            if breaker:
+                circuit_breaker.record_failure(url, type(e).__name__)
+            raise
+
+
+async def close_async_client() -> None:
+    """Close the shared async client, any session clients and their pooled connections."""
+    global _async_client, _async_client_loop
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+    while _session_clients:
+        client = _session_clients.pop()
+        if not client.is_closed:
+            await client.aclose()
+
+
+def get_sync_session() -> requests.Session:
+    """Get the shared requests session used by the legacy synchronous scrapers."""
+    global _sync_session
+    if _sync_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=SCRAPE_MAX_CONNECTIONS,
+            pool_maxsize=SCRAPE_MAX_CONNECTIONS_PER_HOST
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _sync_session = session
+    return _sync_session
+
+
+def fetch_page_sync(method: str, url: str, max_bytes: int, **kwargs) -> FetchedPage:
+    """
+    Send a request through the shared requests session, paced and guarded per host.
+
+    The synchronous counterpart of fetch_page for the legacy scrapers: the body
+    is streamed under the same cap, but always read to the end.
+
+    Args:
+        method: HTTP method
+        url: URL to fetch
+        max_bytes: Abort with ResponseTooLarge once the body exceeds this many bytes
+        **kwargs: Passed on to requests (headers, data, timeout, ...)
+
+    Returns:
+        FetchedPage: The requests response (status and headers) and its decoded body
+    """
+    circuit_breaker.before_request(url)
+    rate_limiter.acquire_sync(url)
+    started = time.monotonic()
+    try:
+        response = get_sync_session().request(method, url, stream=True, **kwargs)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        circuit_breaker.record_failure(url, type(e).__name__)
+        raise
+    _record_response(url, response, time.monotonic() - started)
+
+    with response:
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise ResponseTooLarge(f"Response body is {content_length} bytes, over the {max_bytes} byte limit")
+
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            body += chunk
+            if len(body) > max_bytes:
+                raise ResponseTooLarge(f"Response body exceeds the {max_bytes} byte limit")
+
+    text = bytes(body).decode(response.encoding or "utf-8", errors="replace")
+    return FetchedPage(response=response, text=text, body_size=len(body), complete=True)
@@ -0,0 +1,124 @@
+"""
+Conditional GET page cache for the scraper
+
+Remembers the ETag / Last-Modified validators of each scraped target_url along
+with the statuses already computed from that version of the page. The next
+scrape sends If-None-Match / If-Modified-Since, and a 304 Not Modified answer
+returns the stored status without downloading or parsing the page again.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from config import SCRAPE_PAGE_CACHE_SIZE
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# (selector_or_pattern, search_term) - statuses depend on both
+RuleKey = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass
+class CachedPage:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_size: int = 0
+    statuses: Dict[RuleKey, str] = field(default_factory=dict)
+
+
+class PageCache:
+    """Bounded LRU of page validators and computed statuses keyed by target_url."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def conditional_headers(self, url: str, rule_keys: List[RuleKey]) -> Dict[str, str]:
+        """
+        Validator headers for a scrape of url with the given rules.
+
+        Only returned when a status for every rule is cached, so a 304 can
+        always be answered from the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or any(rule_key not in entry.statuses for rule_key in rule_keys):
+                return {}
+
+            headers = {}
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+            return headers
+
+    def not_modified(self, url: str, rule_keys: List[RuleKey]) -> Optional[Dict[RuleKey, str]]:
+        """Record a 304 for url and return the cached statuses for the rules."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None or any(rule_key not in entry.statuses for rule_key in rule_keys):
+                return None
+            self._entries.move_to_end(url)
+            self.hits += 1
+            self.bytes_saved += entry.body_size
+            return {rule_key: entry.statuses[rule_key] for rule_key in rule_keys}
+
+    def discard(self, url: str) -> None:
+        """
+        Forget url's validators and statuses.
+
+        Used when a 304 can't be answered from the cache after all (the
+        statuses were evicted or replaced between sending the validators and
+        the response), so the page is fetched again without them.
+        """
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def store(
+        self,
+        url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        body_size: int,
+        statuses: Dict[RuleKey, str]
+    ) -> None:
+        """Record a full (200) fetch of url and the statuses computed from it."""
+        with self._lock:
+            self.misses += 1
+
+            # Nothing to revalidate with next time
+            if not etag and not last_modified:
+                self._entries.pop(url, None)
+                return
+
+            entry = self._entries.get(url)
+            if entry is None or entry.etag != etag or entry.last_modified != last_modified:
+                # New version of the page - statuses of other rules are stale
+                entry = CachedPage(etag=etag, last_modified=last_modified)
+                self._entries[url] = entry
+            entry.body_size = body_size
+            entry.statuses.update(statuses)
+            self._entries.move_to_end(url)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved
+            }
+
+
+page_cache = PageCache(SCRAPE_PAGE_CACHE_SIZE)
@@ -0,0 +1,100 @@
+"""
+Profile provisioning for authenticated users
+
+Every authenticated request needs the user's profile row to exist. Instead of
+looking it up each time, a profile is created with a single
+INSERT ... ON CONFLICT DO NOTHING the first time a user is seen, and the user
+ID is then remembered in a bounded in-process set so later requests skip the
+database entirely. Concurrent first requests can't race into a duplicate
+insert: whichever statement loses the conflict simply does nothing.
+"""
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import PROFILE_CACHE_SIZE
+from models import Profile
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class KnownProfiles:
+    """LRU set of user IDs whose profile row is known to exist."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, user_id: Hashable) -> bool:
+        key = str(user_id)
+        if key in self._ids:
+            self._ids.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, user_id: Hashable) -> None:
+        key = str(user_id)
+        self._ids[key] = None
+        self._ids.move_to_end(key)
+        while len(self._ids) > self.max_entries:
+            self._ids.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for monitoring."""
+        return {"size": len(self._ids), "hits": self.hits, "misses": self.misses}
+
+
+known_profiles = KnownProfiles(PROFILE_CACHE_SIZE)
+
+
+async def ensure_profile(
+    db: AsyncSession,
+    user_id: Hashable,
+    email: Optional[str],
+    user_metadata: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Make sure a profile row exists for a user, creating it from their auth data if not.
+
+    Args:
+        db: Database session (committed if a statement was run)
+        user_id: Supabase user ID
+        email: User's email
+        user_metadata: Supabase user_metadata (names, avatar and phone for a new profile)
+
+    Returns:
+        bool: True if this call created the profile
+    """
+    if user_id in known_profiles:
+        return False
+
+    user_metadata = user_metadata or {}
+    result = await db.execute(
+        insert(Profile)
+        .values(
+            id=user_id,
+            email=email,
+            first_name=user_metadata.get("first_name"),
+            last_name=user_metadata.get("last_name"),
+            avatar_url=user_metadata.get("avatar_url"),
+            phone=user_metadata.get("phone"),
+            is_active=True
+        )
+        .on_conflict_do_nothing(index_elements=[Profile.id])
+        .returning(Profile.id)
+    )
+    created = result.scalar_one_or_none() is not None
+    await db.commit()
+
+    known_profiles.add(user_id)
+    if created:
+        logger.info(f"👤 Created profile for user {user_id}")
+    return created
@@ -0,0 +1,223 @@
+"""
+Per-host politeness rate limiter for the scraper
+
+Every scrape takes a token from its host's bucket before the request is sent,
+so a bulk refresh can't flood one origin while requests to other hosts keep
+flowing at full speed. Each host's rate adapts to how the host is coping:
+
+- 429 / 503 halve the rate, and a Retry-After header pauses the host entirely
+  until the given time
+- responses much slower than the host's usual latency cut the rate by a quarter
+- healthy responses raise it again step by step, up to the configured rate
+
+Rates default to SCRAPE_RATE_LIMIT_PER_SECOND and can be set per host with
+SCRAPE_HOST_RATE_LIMITS, e.g. "collegeadmissions.gndu.ac.in=1,example.com=5".
+A request never waits longer than SCRAPE_RATE_LIMIT_MAX_WAIT_SECONDS for its
+turn: if the host is paused or backlogged beyond that, RateLimited is raised
+at once, so request handlers and scheduler batches fail fast instead of
+sleeping through a long Retry-After.
+The state is guarded by a threading lock, so the sync scrapers (which sleep
+the calling thread) and the async ones (which sleep the task) share it.
+"""
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from config import (
+    SCRAPE_RATE_LIMIT_PER_SECOND,
+    SCRAPE_RATE_LIMIT_BURST,
+    SCRAPE_RATE_LIMIT_MIN_PER_SECOND,
+    SCRAPE_HOST_RATE_LIMITS,
+    SCRAPE_RATE_LIMIT_MAX_WAIT_SECONDS
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Statuses that mean the host wants us to slow down
+THROTTLE_STATUS_CODES = {429, 503}
+
+# A response this many times slower than the host's usual latency counts as a slowdown
+SLOW_RESPONSE_FACTOR = 3.0
+
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+
+# Longest Retry-After we honor, so a bogus header can't stall a host for days
+MAX_RETRY_AFTER_SECONDS = 3600
+
+
+class RateLimited(Exception):
+    """Raised instead of waiting longer than the limiter's max_wait for a host."""
+
+
+def parse_host_rates(value: str) -> Dict[str, float]:
+    """Parse "host=rate,host=rate" into a rate per host."""
+    rates = {}
+    for item in value.split(','):
+        host, _, rate = item.partition('=')
+        if not host.strip() or not rate.strip():
+            continue
+        try:
+            rates[host.strip().lower()] = float(rate)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring invalid SCRAPE_HOST_RATE_LIMITS entry: {item}")
+    return rates
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+class HostBucket:
+    """Token bucket for one host whose refill rate adapts to the host's responses."""
+
+    def __init__(self, host: str, max_rate: float, burst: int, min_rate: float):
+        self.host = host
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = max_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.latency: Optional[float] = None  # Moving average of healthy responses
+
+    def reserve(self, max_wait: float) -> float:
+        """
+        Take a token and return how long to wait before using it.
+
+        Raises:
+            RateLimited: If the wait would exceed max_wait (no token is taken then)
+        """
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+        # Tokens may go negative: each waiter reserves the next free slot in order
+        self.tokens -= 1
+        wait = max(-self.tokens / self.rate if self.tokens < 0 else 0.0, self.paused_until - now)
+        if wait > max_wait:
+            self.tokens += 1  # Give the slot back to requests that will wait for it
+            raise RateLimited(f"{self.host} is rate limited (next request allowed in {wait:.0f}s)")
+        return wait
+
+    def record(self, status_code: int, latency: float, retry_after: Optional[float]) -> None:
+        """Adapt the rate to a response from this host."""
+        if status_code in THROTTLE_STATUS_CODES:
+            self._slow_down(0.5, f"HTTP {status_code}")
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+                logger.warning(f"⏸️ {self.host} asked us to retry after {retry_after:.0f}s")
+            return
+
+        if self.latency is not None and latency > self.latency * SLOW_RESPONSE_FACTOR:
+            self._slow_down(0.75, f"slow response ({latency:.1f}s)")
+            return
+
+        self.latency = latency if self.latency is None else (
+            LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency
+        )
+        # Additive increase back towards the configured rate
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def _slow_down(self, factor: float, reason: str) -> None:
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.tokens = min(self.tokens, 0.0)
+        logger.warning(f"🐢 Slowing down {self.host} to {self.rate:.2f} req/s ({reason})")
+
+
+class HostRateLimiter:
+    """Per-host token buckets shared by every scrape in this process."""
+
+    def __init__(
+        self,
+        default_rate: float,
+        burst: int,
+        min_rate: float,
+        host_rates: Dict[str, float],
+        max_wait_seconds: float
+    ):
+        self.default_rate = default_rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.host_rates = host_rates
+        self.max_wait_seconds = max_wait_seconds
+        self._buckets: Dict[str, HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url: str) -> HostBucket:
+        host = (urlsplit(url).hostname or "").lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate = self.host_rates.get(host, self.default_rate)
+            bucket = HostBucket(host, max_rate=rate, burst=self.burst, min_rate=self.min_rate)
+            self._buckets[host] = bucket
+        return bucket
+
+    def _reserve(self, url: str) -> float:
+        with self._lock:
+            return self._bucket(url).reserve(self.max_wait_seconds)
+
+    async def acquire(self, url: str) -> None:
+        """
+        Wait (without blocking the event loop) until a request to url's host is allowed.
+
+        Raises:
+            RateLimited: If that would take longer than max_wait_seconds
+        """
+        wait = self._reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_sync(self, url: str) -> None:
+        """Blocking variant of acquire for the synchronous scrapers (raises RateLimited the same way)."""
+        wait = self._reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+
+    def record(self, url: str, status_code: int, latency: float, retry_after: Optional[str] = None) -> None:
+        """
+        Feed a response back into its host's rate.
+
+        Args:
+            url: URL the request was sent to
+            status_code: HTTP status of the response
+            latency: Seconds until the response headers arrived
+            retry_after: Raw Retry-After header, if any
+        """
+        with self._lock:
+            self._bucket(url).record(status_code, latency, parse_retry_after(retry_after))
+
+    def stats(self) -> Dict[str, float]:
+        """Current request rate of each host, for monitoring."""
+        with self._lock:
+            return {host: round(bucket.rate, 3) for host, bucket in self._buckets.items()}
+
+
+rate_limiter = HostRateLimiter(
+    default_rate=SCRAPE_RATE_LIMIT_PER_SECOND,
+    burst=SCRAPE_RATE_LIMIT_BURST,
+    min_rate=SCRAPE_RATE_LIMIT_MIN_PER_SECOND,
+    host_rates=parse_host_rates(SCRAPE_HOST_RATE_LIMITS),
+    max_wait_seconds=SCRAPE_RATE_LIMIT_MAX_WAIT_SECONDS
+)
@@ -0,0 +1,147 @@
+"""
+Run regex searches in separate processes with a time budget
+
+Python's re module can't be interrupted, so a catastrophically backtracking
+user pattern would pin a CPU (and a scraper thread) indefinitely. Every user
+pattern is therefore searched in a worker process. Each search has a worker
+to itself, and its budget starts once the worker has been handed the search
+(not while waiting for a free worker). If a search overruns, only its worker
+is killed and a fresh one is started on demand, so a slow pattern never fails
+searches running next to it. Workers keep their compiled patterns, so a
+tracker's pattern is compiled once per worker rather than once per search.
+
+Workers are started with spawn, which imports this module - but also the
+parent's __main__ module, as __mp_main__ - in each new worker. This module is
+kept free of project imports, and scripts that search through a sandbox must
+start their work under an `if __name__ == "__main__":` guard (as worker.py
+does), or every worker would run the script again.
+"""
+import multiprocessing
+import re
+import threading
+import weakref
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+MatchValue = Union[str, Tuple[str, ...]]
+
+# spawn: forking a process that runs threads and an event loop isn't safe
+_context = multiprocessing.get_context("spawn")
+
+# Every sandbox, so shutdown() can stop all of their workers
+_sandboxes: "weakref.WeakSet[RegexSandbox]" = weakref.WeakSet()
+
+
+class RegexTimeout(Exception):
+    """Raised when a regex search exceeds its time budget."""
+
+
+def match_value(match: Optional["re.Match"]) -> Optional[MatchValue]:
+    """
+    Value of a match, shaped like the first item re.findall would return.
+
+    Without groups that's the whole match, with one group the group's text and
+    with several a tuple of all group texts (unmatched groups as "").
+    """
+    if match is None:
+        return None
+    if not match.re.groups:
+        return match.group(0)
+    if match.re.groups == 1:
+        return match.group(1) or ""
+    return match.groups(default="")
+
+
+def _serve(conn, pattern_cache_size: int) -> None:
+    """Worker process loop: answer (pattern, flags, text) requests until the pipe closes."""
+    compile_pattern = lru_cache(maxsize=pattern_cache_size)(re.compile)
+    conn.send("ready")
+    while True:
+        try:
+            pattern, flags, text = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, match_value(compile_pattern(pattern, flags).search(text))))
+        except re.error as e:
+            conn.send((False, str(e)))
+
+
+class _Worker:
+    """One worker process and the pipe to it."""
+
+    def __init__(self, pattern_cache_size: int):
+        self.conn, child_conn = _context.Pipe()
+        self.process = _context.Process(target=_serve, args=(child_conn, pattern_cache_size), daemon=True)
+        self.process.start()
+        child_conn.close()
+        # Wait out the interpreter start-up here, so it isn't charged to a search's budget
+        self.conn.recv()
+
+    def kill(self) -> None:
+        self.conn.close()
+        self.process.kill()
+        self.process.join()
+
+
+class RegexSandbox:
+    """Up to max_workers worker processes, each running one search at a time."""
+
+    def __init__(self, max_workers: int, pattern_cache_size: int = 256):
+        self.max_workers = max_workers
+        self.pattern_cache_size = pattern_cache_size
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        _sandboxes.add(self)
+
+    def search(self, pattern: str, flags: int, text: str, timeout: float) -> Optional[MatchValue]:
+        """
+        match_value of the first match of pattern in text, searched in a worker process of its own.
+
+        Blocks until a worker is free; the timeout only counts the search itself.
+        Callers on an event loop should run this on an executor with no more
+        threads than max_workers (see extraction_rules.regex_executor), so
+        threads waiting for a worker aren't taken from anyone else.
+
+        Raises:
+            re.error: If the pattern is invalid
+            RegexTimeout: If the search doesn't finish within timeout seconds
+        """
+        with self._slots:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                worker = _Worker(self.pattern_cache_size)
+
+            try:
+                worker.conn.send((pattern, flags, text))
+                finished = worker.conn.poll(timeout)
+                ok, value = worker.conn.recv() if finished else (None, None)
+            except (EOFError, OSError):
+                # The worker died (e.g. out of memory); don't reuse it
+                worker.kill()
+                raise RegexTimeout("Regex worker stopped unexpectedly")
+
+            if not finished:
+                worker.kill()
+                raise RegexTimeout(f"Regex search took longer than {timeout:g}s and was stopped")
+
+            with self._lock:
+                self._idle.append(worker)
+            if not ok:
+                raise re.error(value)
+            return value
+
+    def shutdown(self) -> None:
+        """Stop the idle workers (searches still running stop their own)."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.kill()
+
+
+def shutdown() -> None:
+    """Stop the worker processes of every sandbox."""
+    for sandbox in list(_sandboxes):
+        sandbox.shutdown()
@@ -0,0 +1,181 @@
+"""
+Local replica of user roles
+
+A user's role lives in Supabase user_metadata.role, which used to mean one
+Supabase admin API call per user whenever admins listed users. The role is
+now mirrored into the roles/user_roles tables, so admin listings are a single
+SQL join. The replica is written whenever an admin changes a role and is
+brought back in line with Supabase (e.g. after roles were edited in the
+Supabase dashboard) by a periodic bulk sync over the admin list_users API.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, delete, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from config import (
+    AsyncSessionLocal,
+    supabase_admin,
+    ROLE_SYNC_INTERVAL_SECONDS,
+    ROLE_SYNC_PAGE_SIZE
+)
+from models import Profile, Role, UserRole
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Role of users without a user_roles row (and without user_metadata.role)
+DEFAULT_ROLE = "user"
+
+# A profile's role name in the replica
+profile_role = func.coalesce(Role.name, DEFAULT_ROLE)
+
+
+def profiles_with_roles():
+    """SELECT of (Profile, role name) rows joined through the local role replica."""
+    return (
+        select(Profile, profile_role.label("role"))
+        .outerjoin(UserRole, UserRole.user_id == Profile.id)
+        .outerjoin(Role, Role.id == UserRole.role_id)
+    )
+
+
+async def set_user_role(db: AsyncSession, user_id: str, role_name: str) -> None:
+    """
+    Record a user's role in the replica (replacing any other role); the caller commits.
+
+    Args:
+        db: Database session
+        user_id: User (profile) ID
+        role_name: Name of a row in the roles table
+    """
+    role_id = select(Role.id).where(Role.name == role_name).scalar_subquery()
+    await db.execute(
+        delete(UserRole).where(UserRole.user_id == user_id, UserRole.role_id != role_id)
+    )
+    await db.execute(
+        insert(UserRole)
+        .from_select(
+            ["user_id", "role_id"],
+            select(Profile.id, Role.id).where(Profile.id == user_id, Role.name == role_name)
+        )
+        .on_conflict_do_nothing()
+    )
+
+
+async def apply_roles(db: AsyncSession, roles_by_user: Dict[str, str]) -> int:
+    """
+    Bring the replica in line with a batch of users' roles; the caller commits.
+
+    Users without a profile are skipped, as are roles not in the roles table.
+
+    Args:
+        db: Database session
+        roles_by_user: Role name keyed by user ID
+
+    Returns:
+        int: Number of users whose role was applied
+    """
+    result = await db.execute(select(Role.name, Role.id))
+    role_ids = dict(result.all())
+
+    users_by_role: Dict[str, List[str]] = defaultdict(list)
+    for user_id, role_name in roles_by_user.items():
+        if role_name in role_ids:
+            users_by_role[role_name].append(user_id)
+        else:
+            logger.warning(f"⚠️ Skipping unknown role '{role_name}' of user {user_id}")
+
+    # One DELETE and one INSERT per role, whatever the number of users
+    applied = 0
+    for role_name, user_ids in users_by_role.items():
+        role_id = role_ids[role_name]
+        await db.execute(
+            delete(UserRole).where(UserRole.user_id.in_(user_ids), UserRole.role_id != role_id)
+        )
+        await db.execute(
+            insert(UserRole)
+            .from_select(
+                ["user_id", "role_id"],
+                select(Profile.id, literal(role_id)).where(Profile.id.in_(user_ids))
+            )
+            .on_conflict_do_nothing()
+        )
+        applied += len(user_ids)
+    return applied
+
+
+async def sync_roles_from_supabase(page_size: int = ROLE_SYNC_PAGE_SIZE) -> int:
+    """
+    Copy every Supabase user's role into the replica, one list_users page at a time.
+
+    Args:
+        page_size: Users fetched per admin API call
+
+    Returns:
+        int: Number of users whose role was synced
+    """
+    synced = 0
+    page = 1
+    while True:
+        # The Supabase client is blocking, keep it off the event loop
+        users = await asyncio.to_thread(supabase_admin.auth.admin.list_users, page=page, per_page=page_size)
+        roles_by_user = {
+            str(user.id): (user.user_metadata or {}).get("role", DEFAULT_ROLE)
+            for user in users
+        }
+        if roles_by_user:
+            async with AsyncSessionLocal() as session:
+                synced += await apply_roles(session, roles_by_user)
+                await session.commit()
+
+        if len(users) < page_size:
+            break
+        page += 1
+
+    logger.info(f"🔐 Synced roles of {synced} users from Supabase")
+    return synced
+
+
+class RoleSyncScheduler:
+    """Runs sync_roles_from_supabase on startup and then every interval_seconds."""
+
+    def __init__(self, interval_seconds: int = ROLE_SYNC_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._stop_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the sync loop on the running event loop."""
+        if self._task is not None:
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"🔐 Role sync started (interval: {self.interval_seconds}s)")
+
+    async def stop(self) -> None:
+        """Stop the sync loop, cancelling a sync in progress."""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        logger.info("🔐 Role sync stopped")
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                await sync_roles_from_supabase()
+            except Exception as e:
+                logger.error(f"❌ Role sync failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,139 @@
+"""
+Postgres-backed scrape queue
+
+Due work lives on the watches table itself (one row per unique scrape, shared
+by all trackers subscribed to it): `next_run_at` says when a watch should be
+scraped and `locked_until` is the lease held by the worker scraping it.
+Workers claim batches with FOR UPDATE SKIP LOCKED, so any number of processes
+can poll concurrently and each due watch is handed to exactly one of them. A
+worker that dies simply lets its lease expire and the watch is claimed again,
+so no due work is lost across restarts. A worker that overruns its lease only
+completes the watches whose lease it still holds; anything reclaimed in the
+meantime belongs to the new claimant.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, update, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from models import Watch
+from services.watches import StatusChange, fan_out_statuses, next_run_time
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+async def claim_due_watches(
+    session: AsyncSession,
+    batch_size: int,
+    lease_seconds: int,
+    target_url: Optional[str] = None
+) -> List[Watch]:
+    """
+    Claim up to batch_size due watches for this worker.
+
+    Args:
+        session: Database session (committed before returning)
+        batch_size: Maximum number of watches to claim
+        lease_seconds: How long the claim is held before another worker may retake it
+        target_url: Only claim watches of this URL (to batch them into one fetch)
+
+    Returns:
+        List[Watch]: Claimed watches
+    """
+    due_filters = [
+        Watch.next_run_at <= func.now(),
+        or_(Watch.locked_until.is_(None), Watch.locked_until < func.now())
+    ]
+    if target_url is not None:
+        due_filters.append(Watch.target_url == target_url)
+
+    due_ids = (
+        select(Watch.id)
+        .where(*due_filters)
+        .order_by(Watch.next_run_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+
+    result = await session.execute(
+        update(Watch)
+        .where(Watch.id.in_(due_ids))
+        .values(
+            locked_until=func.now() + timedelta(seconds=lease_seconds),
+            updated_at=Watch.updated_at  # A lease is not a user-visible update
+        )
+        .returning(Watch)
+        .execution_options(synchronize_session=False)
+    )
+    watches = result.scalars().all()
+    await session.commit()
+
+    if watches:
+        logger.info(f"📥 Claimed {len(watches)} due watches")
+    return watches
+
+
+async def complete_watch_jobs(
+    session: AsyncSession,
+    results: Dict[int, str],
+    leases: Dict[int, datetime],
+    interval_seconds: int,
+    jitter_seconds: int,
+    content_hashes: Optional[Dict[int, Optional[str]]] = None
+) -> List[StatusChange]:
+    """
+    Store scrape results, fan them out to subscribers, release the leases and schedule the next runs.
+
+    Args:
+        session: Database session
+        results: New status of each scraped watch, keyed by watch ID
+        leases: locked_until of each watch as claimed, keyed by watch ID
+        interval_seconds: Base delay until the next run
+        jitter_seconds: Maximum random spread added to the delay
+        content_hashes: Digest of the page each new status was computed from, keyed by watch ID
+
+    Returns:
+        List[StatusChange]: Subscribed trackers whose status changed
+    """
+    if not results:
+        return []
+
+    # Lock the watches this worker still holds the lease on; rows reclaimed by
+    # another worker (because this one overran its lease) are left alone
+    held = await session.execute(
+        select(Watch.id)
+        .where(tuple_(Watch.id, Watch.locked_until).in_(
+            [(watch_id, leases[watch_id]) for watch_id in results]
+        ))
+        .with_for_update()
+    )
+    held_ids = set(held.scalars().all())
+    if len(held_ids) < len(results):
+        logger.warning(f"⚠️ Lease expired on {len(results) - len(held_ids)} watches before completion, discarding their results")
+    results = {watch_id: status for watch_id, status in results.items() if watch_id in held_ids}
+    if not results:
+        await session.commit()
+        return []
+
+    content_hashes = content_hashes or {}
+    await session.execute(
+        update(Watch),
+        [
+            {
+                "id": watch_id,
+                "last_status": new_status,
+                "last_content_hash": content_hashes.get(watch_id),
+                "next_run_at": next_run_time(interval_seconds, jitter_seconds),
+                "locked_until": None
+            }
+            for watch_id, new_status in results.items()
+        ]
+    )
+    changes = await fan_out_statuses(session, results)
+    await session.commit()
+    return changes
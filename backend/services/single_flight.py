@@ -0,0 +1,99 @@
+"""
+Single-flight coalescing for identical scrapes
+
+On result day many users refresh or add trackers for the same page and roll
+number at the same moment. Calls sharing a key while one is already running
+wait for that call instead of starting their own, and its result is then kept
+for a short freshness window so a burst right after it is answered without
+another upstream request.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+from config import SCRAPE_RESULT_TTL_SECONDS, SCRAPE_RESULT_CACHE_SIZE
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls by key and caches their results for ttl_seconds."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._results: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        call: Callable[[], Awaitable[T]],
+        cacheable: Callable[[T], bool] = lambda result: True
+    ) -> T:
+        """
+        Return call()'s result, sharing it with every caller using the same key.
+
+        Args:
+            key: Identifies calls that produce the same result
+            call: Starts the actual work; only invoked when nothing is cached or in flight
+            cacheable: Whether a result may be served to later callers for the freshness window
+
+        Returns:
+            The (possibly shared or cached) result
+        """
+        cached = self._results.get(key)
+        if cached is not None:
+            expires_at, result = cached
+            if expires_at > time.monotonic():
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.create_task(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done, cacheable))
+        else:
+            self.shared += 1
+            logger.info(f"🤝 Joining in-flight scrape for {key}")
+
+        # A caller that goes away (e.g. client disconnect) must not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task, cacheable: Callable[[object], bool]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None or self.ttl_seconds <= 0:
+            return
+
+        result = task.result()
+        if cacheable(result):
+            self._results[key] = (time.monotonic() + self.ttl_seconds, result)
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/share/miss counters for monitoring."""
+        return {
+            "in_flight": len(self._in_flight),
+            "cached": len(self._results),
+            "hits": self.hits,
+            "shared": self.shared,
+            "misses": self.misses
+        }
+
+
+scrape_flights = SingleFlight(SCRAPE_RESULT_TTL_SECONDS, SCRAPE_RESULT_CACHE_SIZE)
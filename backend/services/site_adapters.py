@@ -0,0 +1,96 @@
+"""
+Site adapter registry for the scraper
+
+A site adapter knows how to scrape one family of target sites: which URLs it
+handles, how to build the request, how little of the response it needs to
+parse, and whether one fetch can serve many trackers at once. Each tracker
+stores the name of its adapter when it is created, so scrapes dispatch with a
+dict lookup instead of re-running URL checks.
+
+The built-in adapters ("gndu" and the catch-all "generic") are registered by
+routers.trackers.helpers. A fast path for another heavily used portal is one
+more SiteAdapter subclass passed to register_adapter().
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from services.page_cache import RuleKey
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SiteAdapter:
+    """Base class for site adapters."""
+
+    name: str = ""
+    supports_batching: bool = False  # One fetch (or session) of a URL can serve many trackers' rules
+    max_batch_size: Optional[int] = None  # Most rules per async_scrape_many batch, if batching is slow
+
+    def matches(self, target_url: str) -> bool:
+        """Whether this adapter handles the URL (checked once, when a tracker is created)."""
+        return False
+
+    def scrape(self, target_url: str, selector_or_pattern: Optional[str], search_term: Optional[str]) -> str:
+        """Scrape one rule synchronously and return its status."""
+        raise NotImplementedError
+
+    async def async_scrape(self, target_url: str, selector_or_pattern: Optional[str], search_term: Optional[str]) -> str:
+        """Scrape one rule and return its status."""
+        raise NotImplementedError
+
+    async def async_scrape_many(self, target_url: str, rules: List[RuleKey]) -> Dict[RuleKey, str]:
+        """Scrape many rules on one URL; without batching, one scrape per rule (concurrently)."""
+        statuses = await asyncio.gather(*(
+            self.async_scrape(target_url, selector_or_pattern, search_term)
+            for selector_or_pattern, search_term in rules
+        ))
+        return dict(zip(rules, statuses))
+
+
+_adapters: Dict[str, SiteAdapter] = {}
+_fallback_adapter: Optional[SiteAdapter] = None
+
+
+def register_adapter(adapter: SiteAdapter, fallback: bool = False) -> SiteAdapter:
+    """
+    Add an adapter to the registry.
+
+    Args:
+        adapter: Adapter instance; its name is what trackers store
+        fallback: Use this adapter for URLs no other adapter matches
+
+    Returns:
+        SiteAdapter: The registered adapter
+    """
+    global _fallback_adapter
+    _adapters[adapter.name] = adapter
+    if fallback:
+        _fallback_adapter = adapter
+    return adapter
+
+
+def adapter_for_url(target_url: str) -> SiteAdapter:
+    """Pick the adapter for a new tracker's URL (specific adapters first, then the fallback)."""
+    for adapter in _adapters.values():
+        if adapter is not _fallback_adapter and adapter.matches(target_url):
+            return adapter
+    if _fallback_adapter is None:
+        raise LookupError("No fallback site adapter registered")
+    return _fallback_adapter
+
+
+def get_adapter(adapter_name: Optional[str], target_url: str) -> SiteAdapter:
+    """
+    Adapter stored on a tracker, by name.
+
+    Trackers created before adapters existed (or naming one that's no longer
+    registered) fall back to matching the URL.
+    """
+    adapter = _adapters.get(adapter_name) if adapter_name else None
+    if adapter is None:
+        if adapter_name:
+            logger.warning(f"⚠️ Unknown site adapter '{adapter_name}', matching {target_url} instead")
+        adapter = adapter_for_url(target_url)
+    return adapter
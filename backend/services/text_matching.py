@@ -0,0 +1,79 @@
+"""
+Multi-term text matching
+
+Aho-Corasick automaton that finds the first occurrence of many search terms
+in a single pass over the text, instead of one substring scan per term.
+"""
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+class MultiTermMatcher:
+    """Case-insensitive matcher for a fixed set of search terms."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({term.lower() for term in terms if term})
+
+        # Node 0 is the root; each node has transitions, a failure link and outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+
+        for term in self.terms:
+            self._add(term)
+        self._build_failure_links()
+
+    def _add(self, term: str) -> None:
+        node = 0
+        for char in term:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+        self._output[node].append(term)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def first_occurrences(self, text: str) -> Dict[str, int]:
+        """
+        Find where each term first occurs in text.
+
+        Args:
+            text: Text to scan (compared case-insensitively)
+
+        Returns:
+            Dict mapping each found (lowercased) term to the index of its first
+            occurrence in text.lower()
+        """
+        found: Dict[str, int] = {}
+        if not self.terms:
+            return found
+
+        goto, fail, output = self._goto, self._fail, self._output
+        remaining = len(self.terms)
+        node = 0
+        for index, char in enumerate(text.lower()):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term in output[node]:
+                if term not in found:
+                    found[term] = index - len(term) + 1
+                    remaining -= 1
+            if not remaining:
+                break
+        return found
@@ -0,0 +1,177 @@
+"""
+Background scheduler that periodically refreshes every tracker
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from config import (
+    AsyncSessionLocal,
+    TRACKER_REFRESH_INTERVAL_SECONDS,
+    TRACKER_REFRESH_JITTER_SECONDS,
+    TRACKER_REFRESH_CONCURRENCY,
+    SCRAPE_QUEUE_BATCH_SIZE,
+    SCRAPE_QUEUE_LEASE_SECONDS,
+    SCRAPE_QUEUE_POLL_SECONDS,
+    SCRAPE_QUEUE_GROUP_SIZE,
+    SCRAPE_QUEUE_MAX_CLAIMED
+)
+from models import Watch
+from routers.trackers.helpers import async_scrape_many, notify_status_changes, shared_fetch_limit
+from services.content_hashes import content_hashes
+from services.scrape_queue import claim_due_watches, complete_watch_jobs
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class TrackerRefreshScheduler:
+    """
+    Refreshes watches as they come due in the Postgres scrape queue.
+
+    Work is claimed in batches with FOR UPDATE SKIP LOCKED, so running this in
+    several processes scrapes each due watch once across all of them. After
+    a scrape the watch is rescheduled one interval (plus random jitter) later,
+    which keeps the scrape load flat, and no more than `concurrency` scrapes
+    run at once in this process. Watches sharing a target_url are refreshed
+    together from a single fetch of the page, and every new status is fanned
+    out to the trackers subscribed to the watch. At most `max_claimed`
+    watches are leased at once, counting every watch of every URL group, so
+    claims never outgrow what can be scraped within one lease.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = TRACKER_REFRESH_INTERVAL_SECONDS,
+        jitter_seconds: int = TRACKER_REFRESH_JITTER_SECONDS,
+        concurrency: int = TRACKER_REFRESH_CONCURRENCY,
+        batch_size: int = SCRAPE_QUEUE_BATCH_SIZE,
+        lease_seconds: int = SCRAPE_QUEUE_LEASE_SECONDS,
+        poll_seconds: int = SCRAPE_QUEUE_POLL_SECONDS,
+        group_size: int = SCRAPE_QUEUE_GROUP_SIZE,
+        max_claimed: int = SCRAPE_QUEUE_MAX_CLAIMED
+    ):
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.group_size = group_size
+        self.max_claimed = max_claimed
+        self._claimed = 0  # Watches leased by this scheduler and not yet completed
+        self._in_flight: Set[asyncio.Task] = set()
+        self._stop_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the scheduler loop on the running event loop."""
+        if self._task is not None:
+            return
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"⏰ Tracker refresh scheduler started "
+            f"(interval: {self.interval_seconds}s, concurrency: {self.concurrency})"
+        )
+
+    async def stop(self) -> None:
+        """
+        Stop the scheduler and cancel in-flight refreshes.
+
+        Cancelled watches keep their lease until it expires and are then
+        picked up again by whichever worker is still running.
+        """
+        if self._task is None:
+            return
+        self._stop_event.set()
+        self._task.cancel()
+        for task in list(self._in_flight):
+            task.cancel()
+        await asyncio.gather(self._task, *self._in_flight, return_exceptions=True)
+        self._task = None
+        logger.info("⏰ Tracker refresh scheduler stopped")
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            free_slots = self.concurrency - len(self._in_flight)
+            unclaimed = self.max_claimed - self._claimed
+            if free_slots <= 0 or unclaimed <= 0:
+                await asyncio.wait(self._in_flight, return_when=asyncio.FIRST_COMPLETED)
+                continue
+
+            claimed = await self._claim(min(free_slots, self.batch_size, unclaimed))
+
+            watches_by_url: Dict[str, List[Watch]] = defaultdict(list)
+            for watch in claimed:
+                watches_by_url[watch.target_url].append(watch)
+
+            for target_url, watches in watches_by_url.items():
+                task = asyncio.create_task(self._refresh(target_url, watches))
+                self._in_flight.add(task)
+                task.add_done_callback(self._in_flight.discard)
+
+            # Nothing due right now - sleep until the next poll
+            if not claimed:
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _claim(self, batch_size: int, target_url: Optional[str] = None) -> List[Watch]:
+        """Claim up to batch_size due watches, counting them against max_claimed until they are completed."""
+        # Reserve the batch before awaiting, so concurrent claims can't overshoot max_claimed
+        self._claimed += batch_size
+        claimed = []
+        try:
+            async with AsyncSessionLocal() as session:
+                claimed = await claim_due_watches(
+                    session,
+                    batch_size=batch_size,
+                    lease_seconds=self.lease_seconds,
+                    target_url=target_url
+                )
+        except Exception as e:
+            logger.error(f"❌ Failed to claim due watches: {e}")
+        finally:
+            self._claimed -= batch_size - len(claimed)
+        return claimed
+
+    async def _refresh(self, target_url: str, watches: List[Watch]) -> None:
+        try:
+            # Pull in the rest of this URL's due watches so one batch serves them all
+            group_size = min(self.group_size, shared_fetch_limit(target_url, watches[0].adapter) or self.group_size)
+            top_up = min(group_size - len(watches), self.max_claimed - self._claimed)
+            if top_up > 0:
+                watches += await self._claim(top_up, target_url=target_url)
+
+            await refresh_claimed_watches(target_url, watches, self.interval_seconds, self.jitter_seconds)
+        except Exception as e:
+            logger.error(f"❌ Scheduled refresh of {len(watches)} watches for {target_url} failed: {e}")
+        finally:
+            self._claimed -= len(watches)
+
+
+async def refresh_claimed_watches(
+    target_url: str,
+    watches: List[Watch],
+    interval_seconds: int,
+    jitter_seconds: int
+) -> None:
+    """Scrape claimed watches of one URL, store their new statuses and notify subscribers on change."""
+    rules = {watch.id: (watch.selector_or_pattern, watch.search_term) for watch in watches}
+
+    # Let pages unchanged since the last run skip parsing, even right after a restart
+    for watch in watches:
+        content_hashes.seed(target_url, rules[watch.id], watch.last_content_hash, watch.last_status)
+
+    statuses = await async_scrape_many(target_url, list(rules.values()), adapter_name=watches[0].adapter)
+    results = {watch.id: statuses[rules[watch.id]] for watch in watches}
+    hashes = {watch.id: content_hashes.hash_for(target_url, rules[watch.id], results[watch.id]) for watch in watches}
+
+    async with AsyncSessionLocal() as session:
+        leases = {watch.id: watch.locked_until for watch in watches}
+        changes = await complete_watch_jobs(session, results, leases, interval_seconds, jitter_seconds, content_hashes=hashes)
+
+    await notify_status_changes(changes)
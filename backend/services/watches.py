@@ -0,0 +1,190 @@
+"""
+Shared watch subscriptions
+
+Many users track the same result (same target_url, search term and rule), so
+the scrape state lives on one Watch row per unique scrape and each user's
+Tracker subscribes to it through watch_id. The scrape queue works on watches,
+which makes scraping cost scale with unique watches instead of with users;
+a new status is then fanned out to every subscribed tracker in one batch.
+"""
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import select, update, delete, exists, case
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from config import TRACKER_REFRESH_INTERVAL_SECONDS, TRACKER_REFRESH_JITTER_SECONDS
+from models import Tracker, Watch, WATCH_SCRAPE_KEY
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Tracker.validation_status: trackers created with background validation stay
+# pending until the first scrape of their watch decides whether they are valid.
+# A failed tracker keeps being re-checked and turns valid once its scrape works
+VALIDATION_PENDING = "pending"
+VALIDATION_VALID = "valid"
+VALIDATION_FAILED = "failed"
+
+
+def is_error_status(status: str) -> bool:
+    """
+    Whether a scrape status means the tracker's scrape doesn't work.
+
+    The one check for failed scrapes, shared by validation, the content-hash
+    cache and the single-flight result cache. Case-insensitive, so the engine's
+    "Error: ...", "Generic scraping error: ..." and "GNDU scraping error: ..."
+    all count.
+    """
+    return "error" in status.lower()
+
+
+class StatusChange(NamedTuple):
+    """A subscribed tracker whose status changed (what a notification needs)."""
+    tracker_id: int
+    tracker_name: str
+    old_status: Optional[str]
+    new_status: str
+
+
+async def find_watch(
+    session: AsyncSession,
+    target_url: str,
+    search_term: str,
+    selector_or_pattern: Optional[str]
+) -> Optional[Watch]:
+    """Existing watch for a scrape, if anyone already tracks it."""
+    result = await session.execute(
+        select(Watch).where(
+            Watch.target_url == target_url,
+            Watch.search_term == search_term,
+            func.coalesce(Watch.selector_or_pattern, '') == (selector_or_pattern or '')
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+def next_run_time(interval_seconds: int, jitter_seconds: int) -> datetime:
+    """When a watch scraped just now is next due: interval_seconds plus up to jitter_seconds of random spread."""
+    return datetime.now(timezone.utc) + timedelta(seconds=interval_seconds + random.uniform(0, jitter_seconds))
+
+
+async def get_or_create_watch(
+    session: AsyncSession,
+    target_url: str,
+    search_term: str,
+    selector_or_pattern: Optional[str],
+    adapter_name: Optional[str],
+    last_status: Optional[str] = None,
+    last_content_hash: Optional[str] = None,
+    interval_seconds: int = TRACKER_REFRESH_INTERVAL_SECONDS,
+    jitter_seconds: int = TRACKER_REFRESH_JITTER_SECONDS
+) -> Watch:
+    """
+    Watch for a scrape, created if it doesn't exist yet.
+
+    Without a last_status a new watch is due right away, so the scheduler
+    makes its first scrape on its next poll. With one, the scrape was just
+    made and the watch is next due a refresh interval from now.
+
+    Safe against concurrent creation of the same watch; the caller commits.
+
+    Args:
+        session: Database session
+        target_url: URL to scrape
+        search_term: Term to look for
+        selector_or_pattern: Extraction rule (None = plain search)
+        adapter_name: Site adapter for target_url
+        last_status: Status of a scrape just made (None to queue the first scrape instead)
+        last_content_hash: Digest of the page that status came from
+        interval_seconds: Base delay until the next run after a scrape just made
+        jitter_seconds: Maximum random spread added to the delay
+
+    Returns:
+        Watch: The new or existing watch
+    """
+    stmt = insert(Watch).values(
+        target_url=target_url,
+        search_term=search_term,
+        selector_or_pattern=selector_or_pattern,
+        adapter=adapter_name,
+        last_status=last_status,
+        last_content_hash=last_content_hash,
+        next_run_at=func.now() if last_status is None else next_run_time(interval_seconds, jitter_seconds)
+    )
+    # DO UPDATE rather than DO NOTHING so the existing row is returned as well;
+    # a status from a scrape just made replaces the stored one, no status keeps it
+    no_new_status = stmt.excluded.last_status.is_(None)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(WATCH_SCRAPE_KEY),
+        set_={
+            "last_status": case((no_new_status, Watch.last_status), else_=stmt.excluded.last_status),
+            "last_content_hash": case((no_new_status, Watch.last_content_hash), else_=stmt.excluded.last_content_hash),
+            "next_run_at": case((no_new_status, Watch.next_run_at), else_=stmt.excluded.next_run_at)
+        }
+    ).returning(Watch)
+
+    result = await session.execute(stmt, execution_options={"populate_existing": True})
+    return result.scalar_one()
+
+
+async def release_watch(session: AsyncSession, watch_id: int) -> None:
+    """Delete a watch once no tracker subscribes to it any more; the caller commits."""
+    result = await session.execute(
+        delete(Watch).where(
+            Watch.id == watch_id,
+            ~exists().where(Tracker.watch_id == watch_id)
+        )
+    )
+    if result.rowcount:
+        logger.info(f"🗑️ Removed watch {watch_id} (no subscribers left)")
+
+
+async def fan_out_statuses(session: AsyncSession, results: Dict[int, str]) -> List[StatusChange]:
+    """
+    Copy new watch statuses to their subscribed trackers; the caller commits.
+
+    Trackers pending validation, or whose validation failed, get the status
+    here and are marked valid or failed instead of being notified. So a
+    failed tracker turns valid as soon as its watch scrapes cleanly (e.g. the
+    site came back), and is notified like any other tracker from then on.
+
+    Args:
+        session: Database session
+        results: New status of each watch, keyed by watch ID
+
+    Returns:
+        List[StatusChange]: Trackers whose status changed, to notify
+    """
+    if not results:
+        return []
+
+    subscribers = await session.execute(
+        select(Tracker.id, Tracker.name, Tracker.watch_id, Tracker.last_status, Tracker.validation_status)
+        .where(Tracker.watch_id.in_(list(results)))
+    )
+
+    changes: List[StatusChange] = []
+    updates = []
+    for tracker_id, name, watch_id, old_status, validation_status in subscribers:
+        new_status = results[watch_id]
+        if validation_status in (VALIDATION_PENDING, VALIDATION_FAILED):
+            new_validation = VALIDATION_FAILED if is_error_status(new_status) else VALIDATION_VALID
+            if old_status != new_status or validation_status != new_validation:
+                updates.append({
+                    "id": tracker_id,
+                    "last_status": new_status,
+                    "validation_status": new_validation
+                })
+        elif old_status != new_status:
+            changes.append(StatusChange(tracker_id, name, old_status, new_status))
+            updates.append({"id": tracker_id, "last_status": new_status})
+
+    if updates:
+        await session.execute(update(Tracker), updates)
+        logger.info(f"📣 Fanned out {len(results)} watch statuses to {len(updates)} trackers")
+    return changes
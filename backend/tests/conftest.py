@@ -0,0 +1,11 @@
+import os
+import sys
+
+# config builds the Supabase clients at import time; point them at a dummy
+# project so the scraper modules can be imported without real credentials
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test-anon-key")
+os.environ.setdefault("SUPABASE_KEY", "test-service-key")
+
+# Modules are imported the way the app does (from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
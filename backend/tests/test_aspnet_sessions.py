@@ -0,0 +1,99 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from routers.trackers import helpers
+from services import http_client
+from services.aspnet_sessions import AspNetSessionPool
+from services.circuit_breaker import CircuitBreaker
+from services.rate_limiter import HostRateLimiter
+
+FORM_URL = "https://gndu.example.edu/results.aspx"
+
+
+def form_page(viewstate, body=""):
+    return (
+        f"<form><input type='hidden' name='__VIEWSTATE' value='{viewstate}'>"
+        f"<input type='hidden' name='__EVENTVALIDATION' value='ev-{viewstate}'>{body}</form>"
+    )
+
+
+class FakeGndu:
+    """The result form: each postback answers with fresh view state; post_statuses scripts the POST status codes."""
+
+    def __init__(self, post_statuses=()):
+        self.post_statuses = list(post_statuses)
+        self.posted_viewstates = []
+        self.gets = 0
+
+    def __call__(self, request):
+        if request.method == "GET":
+            self.gets += 1
+            return httpx.Response(200, text=form_page("v0"))
+
+        self.posted_viewstates.append(parse_qs(request.content.decode())["__VIEWSTATE"][0])
+        status_code = self.post_statuses.pop(0) if self.post_statuses else 200
+        if status_code >= 500:
+            return httpx.Response(status_code, text="Server Error")
+        viewstate = f"v{len(self.posted_viewstates)}"
+        return httpx.Response(200, text=form_page(viewstate, "<span id='lblSGPA'>8.2</span>"))
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60, half_open_probes=1)
+    monkeypatch.setattr(helpers, "circuit_breaker", breaker)
+    monkeypatch.setattr(http_client, "circuit_breaker", breaker)
+    monkeypatch.setattr(
+        http_client, "rate_limiter",
+        HostRateLimiter(default_rate=100, burst=100, min_rate=1, host_rates={}, max_wait_seconds=5)
+    )
+    return breaker
+
+
+def lookup(monkeypatch, server, roll_numbers):
+    monkeypatch.setattr(
+        http_client, "_create_async_client",
+        lambda max_connections: httpx.AsyncClient(transport=httpx.MockTransport(server))
+    )
+    pool = AspNetSessionPool(FORM_URL, size=1, max_bytes=100_000, timeout=5)
+
+    async def main():
+        try:
+            return [await helpers._async_scrape_gndu_specific(pool, roll_number) for roll_number in roll_numbers]
+        finally:
+            await http_client.close_async_client()
+
+    return asyncio.run(main())
+
+
+def test_each_postback_carries_the_view_state_of_the_previous_response(breaker, monkeypatch):
+    server = FakeGndu()
+
+    statuses = lookup(monkeypatch, server, ["1701", "1702", "1703"])
+
+    assert statuses == ["Pass - SGPA: 8.2"] * 3
+    assert server.gets == 1
+    assert server.posted_viewstates == ["v0", "v1", "v2"]
+
+
+def test_retried_lookup_records_one_breaker_failure(breaker, monkeypatch):
+    server = FakeGndu(post_statuses=[500, 500])
+
+    statuses = lookup(monkeypatch, server, ["1702"])
+
+    assert "500" in statuses[0]
+    assert server.gets == 2  # The retry reloaded the form
+    assert breaker._circuit(FORM_URL).failures == 1
+
+
+def test_lookup_that_recovers_on_retry_counts_as_a_success(breaker, monkeypatch):
+    breaker.record_failure(FORM_URL, "HTTP 500")
+    server = FakeGndu(post_statuses=[500])
+
+    statuses = lookup(monkeypatch, server, ["1702"])
+
+    assert statuses == ["Pass - SGPA: 8.2"]
+    assert breaker._circuit(FORM_URL).failures == 0
@@ -0,0 +1,237 @@
+import asyncio
+import time
+
+import httpx
+import jwt
+import pytest
+
+from dependencies import auth_verifier
+from dependencies.auth_verifier import TokenVerificationError, decode_token, identity_from_claims
+
+SECRET = "test-jwt-secret-with-enough-bytes-for-hs256"
+USER_ID = "5b4cf8b2-8c50-4c1e-9d1e-0d4b1c2f7a10"
+
+
+def make_token(secret=SECRET, algorithm="HS256", **claims):
+    claims = {"sub": USER_ID, "aud": "authenticated", "exp": int(time.time()) + 3600, **claims}
+    return jwt.encode(claims, secret, algorithm=algorithm)
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    monkeypatch.setattr(auth_verifier, "JWT_SECRET_KEY", SECRET)
+
+
+def decode(token):
+    return asyncio.run(decode_token(token))
+
+
+def test_valid_token_gives_its_claims(secret):
+    claims = decode(make_token(email="a@example.edu", user_metadata={"role": "admin"}))
+
+    assert claims["sub"] == USER_ID
+    assert identity_from_claims(claims) == {
+        "user_id": USER_ID,
+        "email": "a@example.edu",
+        "role": "admin",
+        "user_metadata": {"role": "admin"},
+        "user": None
+    }
+
+
+def test_role_defaults_to_user():
+    assert identity_from_claims({"sub": USER_ID})["role"] == "user"
+
+
+@pytest.mark.parametrize("token", [
+    pytest.param(lambda: make_token(exp=int(time.time()) - 60), id="expired"),
+    pytest.param(lambda: make_token(aud="anon"), id="wrong audience"),
+    pytest.param(lambda: make_token(secret="another-secret-with-enough-bytes-for-hs256"), id="bad signature"),
+    pytest.param(lambda: jwt.encode({"aud": "authenticated", "exp": int(time.time()) + 60}, SECRET), id="no sub"),
+    pytest.param(lambda: make_token(secret="", algorithm="none"), id="unsigned"),
+])
+def test_invalid_tokens_are_rejected(secret, token):
+    with pytest.raises(TokenVerificationError):
+        decode(token())
+
+
+def test_expiry_within_leeway_is_accepted(secret, monkeypatch):
+    monkeypatch.setattr(auth_verifier, "JWT_LEEWAY_SECONDS", 30)
+    assert decode(make_token(exp=int(time.time()) - 5))["sub"] == USER_ID
+
+
+def test_hs256_token_without_a_secret_is_rejected(monkeypatch):
+    monkeypatch.setattr(auth_verifier, "JWT_SECRET_KEY", None)
+    with pytest.raises(TokenVerificationError, match="JWT_SECRET_KEY"):
+        decode(make_token())
+
+
+def test_asymmetric_token_without_cryptography_is_rejected(monkeypatch):
+    monkeypatch.setattr(auth_verifier, "ASYMMETRIC_JWT_AVAILABLE", False)
+    header = jwt.utils.base64url_encode(b'{"alg":"RS256","typ":"JWT"}').decode()
+    payload = jwt.utils.base64url_encode(f'{{"sub":"{USER_ID}"}}'.encode()).decode()
+
+    with pytest.raises(TokenVerificationError, match="cryptography"):
+        decode(f"{header}.{payload}.c2ln")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(auth_verifier.time, "monotonic", fake)
+    return fake
+
+
+def identity(user_id=USER_ID):
+    return {"user_id": user_id, "email": None, "role": "user", "user_metadata": {}, "user": None}
+
+
+def test_cached_token_is_served_until_the_ttl_passes(clock):
+    cache = auth_verifier.VerifiedTokenCache(ttl_seconds=60, max_entries=10)
+    token = make_token()
+    cache.put(token, identity())
+
+    assert cache.get(token) == identity()
+    clock.now += 61
+    assert cache.get(token) is None
+    assert cache.stats() == {"size": 0, "hits": 1, "misses": 1}
+
+
+def test_token_expiring_before_the_ttl_is_dropped_at_its_exp(clock):
+    cache = auth_verifier.VerifiedTokenCache(ttl_seconds=60, max_entries=10)
+    token = make_token(exp=int(time.time()) + 10)
+    cache.put(token, identity())
+
+    clock.now += 11
+    assert cache.get(token) is None
+
+
+def test_expired_tokens_and_a_zero_ttl_store_nothing():
+    cache = auth_verifier.VerifiedTokenCache(ttl_seconds=60, max_entries=10)
+    cache.put(make_token(exp=int(time.time()) - 1), identity())
+    disabled = auth_verifier.VerifiedTokenCache(ttl_seconds=0, max_entries=10)
+    disabled.put(make_token(), identity())
+
+    assert cache.stats()["size"] == disabled.stats()["size"] == 0
+
+
+def test_cache_is_bounded_and_drops_a_users_tokens_on_request():
+    cache = auth_verifier.VerifiedTokenCache(ttl_seconds=60, max_entries=2)
+    first, second, third = (make_token(jti=str(n)) for n in range(3))
+    cache.put(first, identity())
+    cache.put(second, identity("other-user"))
+    cache.put(third, identity())
+
+    assert cache.get(first) is None  # Least recently used
+
+    cache.invalidate_user(USER_ID)
+    assert cache.get(third) is None
+    assert cache.get(second) == identity("other-user")
+
+
+def test_token_is_verified_once_and_failures_are_not_cached(monkeypatch):
+    monkeypatch.setattr(auth_verifier, "token_cache", auth_verifier.VerifiedTokenCache(ttl_seconds=60, max_entries=10))
+    monkeypatch.setattr(auth_verifier, "AUTH_VERIFICATION_MODE", "supabase")
+    verified = []
+
+    async def verify_with_supabase(token):
+        verified.append(token)
+        if token == "bad":
+            raise TokenVerificationError("invalid JWT")
+        return identity()
+
+    monkeypatch.setattr(auth_verifier, "verify_with_supabase", verify_with_supabase)
+    token = make_token()
+
+    async def main():
+        for _ in range(3):
+            await auth_verifier.verify_access_token(token)
+        for _ in range(2):
+            with pytest.raises(TokenVerificationError):
+                await auth_verifier.verify_access_token("bad")
+
+    asyncio.run(main())
+
+    assert verified == [token, "bad", "bad"]
+
+
+SUPABASE_USER = {
+    "id": USER_ID,
+    "aud": "authenticated",
+    "email": "a@example.edu",
+    "app_metadata": {},
+    "user_metadata": {"role": "admin"},
+    "created_at": "2024-01-01T00:00:00Z"
+}
+
+
+def verify_against(monkeypatch, handler, tokens):
+    """verify_with_supabase for each token, concurrently, against a mock Supabase Auth."""
+    def auth_client():
+        return httpx.AsyncClient(base_url="http://supabase.test/auth/v1", transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(auth_verifier, "get_auth_client", auth_client)
+
+    async def main():
+        return await asyncio.gather(
+            *(auth_verifier.verify_with_supabase(token) for token in tokens), return_exceptions=True
+        )
+
+    return asyncio.run(main())
+
+
+def test_concurrent_verifications_each_send_only_their_own_token(monkeypatch):
+    def handler(request):
+        user_id = request.headers["Authorization"].removeprefix("Bearer token-")
+        return httpx.Response(200, json={**SUPABASE_USER, "id": user_id})
+
+    identities = verify_against(monkeypatch, handler, [f"token-{n}" for n in range(5)])
+
+    assert [identity["user_id"] for identity in identities] == [str(n) for n in range(5)]
+    assert identities[0]["role"] == "admin"
+    assert identities[0]["user"].email == "a@example.edu"
+
+
+@pytest.mark.parametrize("respond, message", [
+    (lambda request: httpx.Response(401, json={"msg": "invalid JWT"}), "Supabase verification failed"),
+    (lambda request: httpx.Response(404, json={"msg": "User not found"}), "user not found"),
+    (lambda request: httpx.Response(200, json={"id": USER_ID}), "Supabase verification failed"),
+])
+def test_rejected_or_malformed_answers_fail_verification(monkeypatch, respond, message):
+    [error] = verify_against(monkeypatch, respond, ["token"])
+
+    assert isinstance(error, TokenVerificationError) and str(error) == message
+
+
+def test_unreachable_supabase_fails_verification(monkeypatch):
+    def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    [error] = verify_against(monkeypatch, handler, ["token"])
+
+    assert isinstance(error, TokenVerificationError)
+
+
+def test_auth_client_is_pooled_per_event_loop():
+    async def clients():
+        first, second = auth_verifier.get_auth_client(), auth_verifier.get_auth_client()
+        return first, second
+
+    async def close():
+        await auth_verifier.close_auth_client()
+
+    first, second = asyncio.run(clients())
+    other_loop, _ = asyncio.run(clients())
+    asyncio.run(close())
+
+    assert first is second
+    assert other_loop is not first
+    assert str(first.base_url).endswith("/auth/v1/")
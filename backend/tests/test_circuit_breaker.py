@@ -0,0 +1,111 @@
+import pytest
+
+from services import circuit_breaker as breaker_module
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+URL = "https://results.example.edu/page"
+OTHER_URL = "https://other.example.org/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(breaker_module.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failure_threshold=3, reset_seconds=60, half_open_probes=1)
+
+
+def state(breaker, url=URL):
+    return breaker._circuit(url).state
+
+
+def test_opens_after_threshold_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.before_request(URL)
+        breaker.record_failure(URL, "HTTP 503")
+    assert state(breaker) == CLOSED
+
+    breaker.record_failure(URL, "HTTP 503")
+    assert state(breaker) == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+
+    # Other hosts are unaffected
+    breaker.before_request(OTHER_URL)
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure(URL, "ConnectTimeout")
+    breaker.record_failure(URL, "ConnectTimeout")
+    breaker.record_success(URL)
+    breaker.record_failure(URL, "ConnectTimeout")
+
+    assert state(breaker) == CLOSED
+
+
+def test_half_open_after_reset_period_lets_one_probe_through(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure(URL, "HTTP 500")
+
+    clock.now += 59
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+
+    clock.now += 1
+    breaker.before_request(URL)
+    assert state(breaker) == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)  # The only probe slot is taken
+
+
+def test_probe_success_closes_the_circuit(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure(URL, "HTTP 500")
+    clock.now += 60
+    breaker.before_request(URL)
+
+    breaker.record_success(URL)
+
+    assert state(breaker) == CLOSED
+    breaker.before_request(URL)
+    breaker.before_request(URL)
+
+
+def test_probe_failure_reopens_for_another_period(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure(URL, "HTTP 500")
+    clock.now += 60
+    breaker.before_request(URL)
+
+    breaker.record_failure(URL, "HTTP 500")
+
+    assert state(breaker) == OPEN
+    clock.now += 30
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(URL)
+    clock.now += 30
+    breaker.before_request(URL)
+    assert state(breaker) == HALF_OPEN
+
+
+def test_abandoned_probe_frees_its_slot_after_reset_period(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure(URL, "HTTP 500")
+    clock.now += 60
+    breaker.before_request(URL)  # Probe that never reports back
+
+    clock.now += 60
+    breaker.before_request(URL)
+    assert state(breaker) == HALF_OPEN
@@ -0,0 +1,42 @@
+from services.content_hashes import ContentHashCache
+
+URL = "https://results.example.edu/page"
+RULE = (None, "1702")
+GOOD = "Found: Roll 1702 PASSED..."
+ERROR = "Generic scraping error: Server error '500 Internal Server Error'"
+
+
+def test_hash_is_only_given_for_the_status_computed_from_it():
+    cache = ContentHashCache(max_entries=10)
+    cache.store(URL, "good-digest", {RULE: GOOD})
+
+    assert cache.hash_for(URL, RULE, GOOD) == "good-digest"
+    # The scrape failed after the good page: nothing may be persisted next to the error
+    assert cache.hash_for(URL, RULE, ERROR) is None
+
+
+def test_error_statuses_are_never_seeded_or_stored():
+    cache = ContentHashCache(max_entries=10)
+    cache.seed(URL, RULE, "good-digest", ERROR)
+    assert cache.lookup(URL, [RULE], "good-digest") is None
+
+    cache.store(URL, "good-digest", {RULE: GOOD})
+    cache.store(URL, "other-digest", {RULE: "Error: Response body exceeds the 5242880 byte limit"})
+    assert cache.lookup(URL, [RULE], "good-digest") is None
+
+
+def test_unchanged_body_reuses_the_stored_status():
+    cache = ContentHashCache(max_entries=10)
+    other_rule = ("regex:Roll (\\d+)", None)
+    cache.store(URL, "digest", {RULE: GOOD, other_rule: "Found: 1702"})
+
+    assert cache.lookup(URL, [RULE, other_rule], "digest") == {RULE: GOOD, other_rule: "Found: 1702"}
+    assert cache.lookup(URL, [RULE], "changed-digest") is None
+
+
+def test_seed_does_not_override_a_newer_entry():
+    cache = ContentHashCache(max_entries=10)
+    cache.store(URL, "new-digest", {RULE: GOOD})
+    cache.seed(URL, RULE, "old-digest", "Term '1702' not found on page")
+
+    assert cache.hash_for(URL, RULE, GOOD) == "new-digest"
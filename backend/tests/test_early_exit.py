@@ -0,0 +1,45 @@
+import pytest
+
+from services.early_exit import ElementClosedCondition, TermFoundCondition, TERM_CONTEXT_CHARS, stop_condition_for
+
+
+def feed(condition, chunks):
+    """Index of the chunk after which the condition stopped reading, or None."""
+    text = ""
+    for index, chunk in enumerate(chunks):
+        text += chunk
+        if condition(text):
+            return index
+    return None
+
+
+@pytest.mark.parametrize("selector_or_pattern, search_term, expected", [
+    ("#result", None, ElementClosedCondition),
+    ("span#lblSGPA", "1702", ElementClosedCondition),
+    (None, "1702", TermFoundCondition),
+    ("regex:Roll (\\d+)", None, type(None)),
+    ("div.result p", None, type(None)),
+    (None, None, type(None)),
+])
+def test_only_targets_visible_in_raw_html_get_a_condition(selector_or_pattern, search_term, expected):
+    assert isinstance(stop_condition_for(selector_or_pattern, search_term), expected)
+
+
+def test_term_split_across_chunks_is_found_with_its_context():
+    chunks = ["<p>Roll 17", "02 PASSED\n", "x" * (TERM_CONTEXT_CHARS - 20), "y" * 40, "never read"]
+
+    assert feed(TermFoundCondition("roll 1702"), chunks) == 3
+
+
+def test_absent_term_reads_the_whole_page():
+    assert feed(TermFoundCondition("1702"), ["<p>Roll 1703</p>\n", "x" * TERM_CONTEXT_CHARS]) is None
+
+
+def test_element_is_read_up_to_its_own_end_tag():
+    chunks = ["<div id='res", "ult'><div>inner</div>", "<p>SGPA 8.2</p>", "</div>", "<footer>never read</footer>"]
+
+    assert feed(ElementClosedCondition("result"), chunks) == 3
+
+
+def test_id_on_a_different_tag_than_the_selector_asks_for_does_not_stop():
+    assert feed(ElementClosedCondition("result", tag="span"), ["<div id=\"result\">8.2</div>"]) is None
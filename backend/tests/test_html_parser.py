@@ -0,0 +1,22 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from services.html_parser import html_parser
+
+HTML = (
+    "<html><body><DIV id='main'><P>hello</P></DIV>"
+    "<div class='notice Result'>declared</div><span id='roll'>1702</span></body></html>"
+)
+
+
+@pytest.mark.parametrize("selector", ["P", "p", "DIV#main", "div#main", "#main", "Div.Result", ".notice", "SPAN#roll", "div p"])
+def test_select_first_text_matches_a_full_parse(selector):
+    element = BeautifulSoup(HTML, "html.parser").select_one(selector)
+    expected = element.get_text(strip=True) if element is not None else None
+
+    assert expected is not None
+    assert html_parser.select_first_text(HTML, selector) == expected
+
+
+def test_missing_element_gives_none():
+    assert html_parser.select_first_text(HTML, "table#results") is None
@@ -0,0 +1,118 @@
+import asyncio
+import io
+
+import httpx
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from services import http_client
+from services.circuit_breaker import CircuitBreaker
+from services.http_client import ResponseTooLarge
+from services.rate_limiter import HostRateLimiter
+
+URL = "https://notices.example.edu/page"
+BODY = b"<html>" + b"x" * 1000 + b"</html>"
+
+
+@pytest.fixture(autouse=True)
+def fresh_guards(monkeypatch):
+    monkeypatch.setattr(http_client, "circuit_breaker", CircuitBreaker(failure_threshold=3, reset_seconds=60, half_open_probes=1))
+    monkeypatch.setattr(
+        http_client, "rate_limiter",
+        HostRateLimiter(default_rate=100, burst=100, min_rate=1, host_rates={}, max_wait_seconds=5)
+    )
+
+
+def chunked(body, size=100):
+    """Stream body in chunks without a Content-Length header."""
+    async def stream():
+        for start in range(0, len(body), size):
+            yield body[start:start + size]
+    return stream()
+
+
+def fetch(monkeypatch, respond, **kwargs):
+    monkeypatch.setattr(
+        http_client, "_create_async_client",
+        lambda max_connections: httpx.AsyncClient(transport=httpx.MockTransport(lambda request: respond()))
+    )
+
+    async def main():
+        try:
+            return await http_client.fetch_page("GET", URL, **kwargs)
+        finally:
+            await http_client.close_async_client()
+
+    return asyncio.run(main())
+
+
+def test_complete_read_has_a_content_hash(monkeypatch):
+    page = fetch(monkeypatch, lambda: httpx.Response(200, content=chunked(BODY)), max_bytes=len(BODY))
+
+    assert page.text == BODY.decode()
+    assert page.body_size == len(BODY)
+    assert page.complete and page.content_hash
+
+
+def test_declared_length_over_the_cap_is_refused_unread(monkeypatch):
+    with pytest.raises(ResponseTooLarge, match="over the 100 byte limit"):
+        fetch(monkeypatch, lambda: httpx.Response(200, content=BODY), max_bytes=100)
+
+
+def test_streamed_body_over_the_cap_is_cut_off(monkeypatch):
+    with pytest.raises(ResponseTooLarge, match="exceeds the 500 byte limit"):
+        fetch(monkeypatch, lambda: httpx.Response(200, content=chunked(BODY)), max_bytes=500)
+
+
+def test_stop_when_ends_the_read_without_a_hash(monkeypatch):
+    page = fetch(
+        monkeypatch, lambda: httpx.Response(200, content=chunked(BODY)),
+        max_bytes=len(BODY), stop_when=lambda text: len(text) >= 300
+    )
+
+    assert page.body_size == 300
+    assert not page.complete and page.content_hash == ""
+
+
+class StaticAdapter(BaseAdapter):
+    """requests transport answering every request with one body."""
+
+    def __init__(self, body, headers):
+        super().__init__()
+        self.body = body
+        self.headers = headers
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update(self.headers)
+        response.encoding = "utf-8"
+        response.raw = io.BytesIO(self.body)
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def fetch_sync(monkeypatch, headers, max_bytes):
+    session = requests.Session()
+    session.mount("https://", StaticAdapter(BODY, headers))
+    monkeypatch.setattr(http_client, "get_sync_session", lambda: session)
+    return http_client.fetch_page_sync("GET", URL, max_bytes=max_bytes)
+
+
+def test_sync_fetch_returns_the_body_alongside_the_response(monkeypatch):
+    page = fetch_sync(monkeypatch, {"ETag": '"v1"'}, max_bytes=len(BODY))
+
+    assert page.text == BODY.decode()
+    assert page.body_size == len(BODY)
+    assert page.response.headers["ETag"] == '"v1"'
+
+
+@pytest.mark.parametrize("headers", [{"Content-Length": str(len(BODY))}, {}])
+def test_sync_fetch_enforces_the_cap(monkeypatch, headers):
+    with pytest.raises(ResponseTooLarge):
+        fetch_sync(monkeypatch, headers, max_bytes=500)
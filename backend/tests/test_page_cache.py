@@ -0,0 +1,114 @@
+import asyncio
+
+import httpx
+import pytest
+
+from routers.trackers import helpers
+from services import http_client
+from services.content_hashes import ContentHashCache
+from services.page_cache import PageCache
+
+URL = "https://notices.example.edu/results"
+RULE = (None, "1702")
+OTHER_RULE = ("regex:Roll (\\d+)", None)
+PAGE = "<html><body><p>Roll 1702 PASSED</p></body></html>"
+
+
+def test_validators_only_sent_when_every_rule_is_cached():
+    cache = PageCache(max_entries=10)
+    assert cache.conditional_headers(URL, [RULE]) == {}
+
+    cache.store(URL, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT", body_size=100, statuses={RULE: "Found: x"})
+
+    assert cache.conditional_headers(URL, [RULE]) == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    assert cache.conditional_headers(URL, [RULE, OTHER_RULE]) == {}
+
+
+def test_not_modified_returns_cached_statuses():
+    cache = PageCache(max_entries=10)
+    cache.store(URL, etag='"v1"', last_modified=None, body_size=100, statuses={RULE: "Found: x"})
+
+    assert cache.not_modified(URL, [RULE]) == {RULE: "Found: x"}
+    assert cache.not_modified(URL, [OTHER_RULE]) is None
+    assert cache.stats()["bytes_saved"] == 100
+
+
+def test_new_version_drops_statuses_of_the_old_one():
+    cache = PageCache(max_entries=10)
+    cache.store(URL, etag='"v1"', last_modified=None, body_size=100, statuses={RULE: "Found: x", OTHER_RULE: "Found: 1"})
+    cache.store(URL, etag='"v2"', last_modified=None, body_size=100, statuses={RULE: "Found: y"})
+
+    assert cache.not_modified(URL, [RULE]) == {RULE: "Found: y"}
+    assert cache.not_modified(URL, [OTHER_RULE]) is None
+
+
+def test_pages_without_validators_and_discarded_pages_are_not_kept():
+    cache = PageCache(max_entries=10)
+    cache.store(URL, etag=None, last_modified=None, body_size=100, statuses={RULE: "Found: x"})
+    assert cache.conditional_headers(URL, [RULE]) == {}
+
+    cache.store(URL, etag='"v1"', last_modified=None, body_size=100, statuses={RULE: "Found: x"})
+    cache.discard(URL)
+    assert cache.conditional_headers(URL, [RULE]) == {}
+
+
+@pytest.fixture
+def site(monkeypatch):
+    """A page served with an ETag that answers If-None-Match with 304."""
+    cache = PageCache(max_entries=10)
+    monkeypatch.setattr(helpers, "page_cache", cache)
+    monkeypatch.setattr(helpers, "content_hashes", ContentHashCache(max_entries=10))
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, text=PAGE, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(
+        http_client, "_create_async_client",
+        lambda max_connections: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    return cache, requests
+
+
+def scrape():
+    async def main():
+        try:
+            return await helpers._async_scrape_generic_website(URL, None, "1702")
+        finally:
+            await http_client.close_async_client()
+    return asyncio.run(main())
+
+
+def test_unchanged_page_is_answered_from_the_cache(site):
+    cache, requests = site
+
+    first = scrape()
+    second = scrape()
+
+    assert first == second == "Found: Roll 1702 PASSED..."
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert cache.stats()["hits"] == 1
+
+
+def test_304_without_cached_statuses_refetches_unconditionally(site, monkeypatch):
+    cache, requests = site
+    scrape()
+
+    # The entry is evicted between sending the validators and the 304 arriving
+    conditional_headers = cache.conditional_headers
+
+    def headers_then_evict(url, rule_keys):
+        headers = conditional_headers(url, rule_keys)
+        cache.discard(url)
+        return headers
+
+    monkeypatch.setattr(cache, "conditional_headers", headers_then_evict)
+
+    assert scrape() == "Found: Roll 1702 PASSED..."
+    assert [request.headers.get("If-None-Match") for request in requests] == [None, '"v1"', None]
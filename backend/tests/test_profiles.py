@@ -0,0 +1,70 @@
+import asyncio
+import uuid
+
+import pytest
+
+from services import profiles
+from services.profiles import KnownProfiles, ensure_profile
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    """Answers the profile INSERT as if it created the row (or lost the conflict)."""
+
+    def __init__(self, created=True):
+        self.created = created
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return FakeResult(uuid.uuid4() if self.created else None)
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def known(monkeypatch):
+    known = KnownProfiles(max_entries=2)
+    monkeypatch.setattr(profiles, "known_profiles", known)
+    return known
+
+
+def test_known_profiles_is_a_bounded_lru_set():
+    known = KnownProfiles(max_entries=2)
+    user_a, user_b, user_c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    known.add(user_a)
+    known.add(user_b)
+
+    assert str(user_a) in known  # IDs match whether given as UUID or str
+    known.add(user_c)            # Evicts user_b, the least recently used
+
+    assert user_a in known and user_c in known
+    assert user_b not in known
+    assert known.stats() == {"size": 2, "hits": 3, "misses": 1}
+
+
+def test_first_request_creates_the_profile_and_later_ones_skip_the_database(known):
+    user_id = uuid.uuid4()
+    session = FakeSession(created=True)
+
+    assert asyncio.run(ensure_profile(session, user_id, "a@example.edu", {"first_name": "Asha"}))
+    assert not asyncio.run(ensure_profile(session, user_id, "a@example.edu"))
+
+    assert len(session.statements) == 1 and session.commits == 1
+    assert "ON CONFLICT (id) DO NOTHING" in str(session.statements[0].compile())
+
+
+def test_existing_profile_is_remembered_without_being_created(known):
+    user_id = uuid.uuid4()
+
+    assert not asyncio.run(ensure_profile(FakeSession(created=False), user_id, "a@example.edu"))
+    assert user_id in known
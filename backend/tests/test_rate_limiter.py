@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from routers.trackers import helpers
+from services import http_client
+from services import rate_limiter as limiter_module
+from services.rate_limiter import HostRateLimiter, RateLimited, parse_host_rates, parse_retry_after
+
+URL = "https://results.example.edu/page"
+OTHER_URL = "https://other.example.org/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(limiter_module.time, "monotonic", fake)
+    return fake
+
+
+@pytest.fixture
+def limiter(clock):
+    return HostRateLimiter(default_rate=2, burst=2, min_rate=0.1, host_rates={}, max_wait_seconds=5)
+
+
+def test_burst_then_paced_waits(limiter):
+    assert limiter._reserve(URL) == 0
+    assert limiter._reserve(URL) == 0
+    assert limiter._reserve(URL) == pytest.approx(0.5)
+    assert limiter._reserve(URL) == pytest.approx(1.0)
+    assert limiter._reserve(OTHER_URL) == 0  # Hosts don't share a bucket
+
+
+def test_tokens_refill_over_time(limiter, clock):
+    limiter._reserve(URL)
+    limiter._reserve(URL)
+    clock.now += 1
+    assert limiter._reserve(URL) == 0
+    assert limiter._reserve(URL) == 0
+
+
+def test_backlog_beyond_max_wait_fails_fast_without_taking_a_slot(limiter):
+    waits = [limiter._reserve(URL) for _ in range(12)]
+    assert waits[-1] == pytest.approx(5.0)
+
+    with pytest.raises(RateLimited, match="rate limited"):
+        limiter._reserve(URL)
+    with pytest.raises(RateLimited):
+        limiter._reserve(URL)
+
+
+def test_long_retry_after_fails_fast_until_it_has_passed(limiter, clock):
+    limiter.record(URL, 429, 0.2, "3600")
+    with pytest.raises(RateLimited):
+        limiter._reserve(URL)
+
+    clock.now += 3596
+    assert 0 < limiter._reserve(URL) <= 5
+
+
+def test_throttle_and_slow_responses_lower_the_rate_and_healthy_ones_restore_it(limiter):
+    limiter.record(URL, 200, 0.1)
+    limiter.record(URL, 503, 0.1)
+    assert limiter.stats()["results.example.edu"] == pytest.approx(1.0)
+    limiter.record(URL, 200, 1.0)  # 10x the usual latency
+    assert limiter.stats()["results.example.edu"] == pytest.approx(0.75)
+
+    for _ in range(20):
+        limiter.record(URL, 200, 0.1)
+    assert limiter.stats()["results.example.edu"] == pytest.approx(2.0)
+
+
+def test_parse_helpers():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("999999") == limiter_module.MAX_RETRY_AFTER_SECONDS
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_host_rates("A.example.com=1, b.example.com=0.5,bad,c=x") == {"a.example.com": 1.0, "b.example.com": 0.5}
+
+
+def test_scrape_of_a_paused_host_returns_rate_limited_instead_of_sleeping(monkeypatch):
+    limiter = HostRateLimiter(default_rate=2, burst=5, min_rate=0.1, host_rates={}, max_wait_seconds=5)
+    monkeypatch.setattr(http_client, "rate_limiter", limiter)
+    monkeypatch.setattr(helpers.page_cache, "conditional_headers", lambda url, rule_keys: {})
+
+    def handler(request):
+        return httpx.Response(429, headers={"Retry-After": "3600"})
+
+    monkeypatch.setattr(
+        http_client, "_create_async_client",
+        lambda max_connections: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+
+    async def main():
+        first = await helpers._async_scrape_generic_website(URL, None, "1702")
+        started = time.monotonic()
+        second = await asyncio.wait_for(helpers._async_scrape_generic_website(URL, None, "1702"), timeout=5)
+        await http_client.close_async_client()
+        return first, second, time.monotonic() - started
+
+    first, second, elapsed = asyncio.run(main())
+
+    assert "429" in first
+    assert second.startswith("Error: ") and "rate limited" in second
+    assert elapsed < 1
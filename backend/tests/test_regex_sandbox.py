@@ -0,0 +1,111 @@
+import asyncio
+import re
+import threading
+import time
+
+import pytest
+
+from routers.trackers import helpers
+from services import regex_sandbox
+from services.regex_sandbox import RegexSandbox, RegexTimeout
+
+FLAGS = re.IGNORECASE
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = RegexSandbox(max_workers=2)
+    yield sandbox
+    sandbox.shutdown()
+
+
+def test_search_gives_first_match_value(sandbox):
+    assert sandbox.search(r"roll (\d+)", FLAGS, "ROLL 1702 passed, roll 1703", 5) == "1702"
+    assert sandbox.search(r"(a)(b)?", FLAGS, "xa", 5) == ("a", "")
+    assert sandbox.search(r"absent", FLAGS, "text", 5) is None
+
+
+def test_invalid_pattern_raises_re_error(sandbox):
+    with pytest.raises(re.error):
+        sandbox.search(r"(unclosed", FLAGS, "text", 5)
+
+
+def test_backtracking_pattern_is_stopped(sandbox):
+    # Not obviously "risky" from its shape, but exponential on a long line
+    with pytest.raises(RegexTimeout):
+        sandbox.search(r".*.*.*=x", FLAGS, "a" * 3000, 0.5)
+
+    # The killed worker is replaced
+    assert sandbox.search(r"\d+", FLAGS, "abc 42", 5) == "42"
+
+
+def test_slow_search_does_not_fail_searches_next_to_it(sandbox):
+    sandbox.search(r"warm", FLAGS, "warm", 5)  # Start a worker up front
+    outcome = {}
+
+    def slow():
+        try:
+            sandbox.search(r"(a+)+$", FLAGS, "a" * 40 + "!", 1)
+        except RegexTimeout:
+            outcome["slow"] = "timeout"
+
+    def harmless():
+        time.sleep(0.2)
+        outcome["harmless"] = sandbox.search(r"(b+)+", FLAGS, "xxbbb", 1)
+
+    threads = [threading.Thread(target=slow), threading.Thread(target=harmless)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert outcome == {"slow": "timeout", "harmless": "bbb"}
+
+
+class FakeConn:
+    """Feeds _serve a list of requests, then hangs up."""
+
+    def __init__(self, requests):
+        self.requests = list(requests)
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+    def recv(self):
+        if not self.requests:
+            raise EOFError
+        return self.requests.pop(0)
+
+
+def test_worker_compiles_each_pattern_once(monkeypatch):
+    compiled = []
+    compile_pattern = re.compile
+
+    def counting_compile(pattern, flags=0):
+        compiled.append(pattern)
+        return compile_pattern(pattern, flags)
+
+    monkeypatch.setattr(regex_sandbox.re, "compile", counting_compile)
+    conn = FakeConn([(r"roll (\d+)", FLAGS, "roll 1702"), (r"roll (\d+)", FLAGS, "roll 1703"), (r"\d+", FLAGS, "42")])
+
+    regex_sandbox._serve(conn, pattern_cache_size=8)
+
+    assert conn.sent == ["ready", (True, "1702"), (True, "1703"), (True, "42")]
+    assert compiled == [r"roll (\d+)", r"\d+"]
+
+
+def test_regex_parses_run_on_their_own_threads():
+    def thread_name(html):
+        return threading.current_thread().name
+
+    async def main():
+        return (
+            await helpers._run_parse([("regex:\\d+", None)], thread_name, ""),
+            await helpers._run_parse([("div.result", None)], thread_name, "")
+        )
+
+    regex_thread, selector_thread = asyncio.run(main())
+
+    assert regex_thread.startswith("regex-rules")
+    assert not selector_thread.startswith("regex-rules")
@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from routers.admin import helpers as admin_helpers
+from services.role_sync import apply_roles
+
+USER_ID = "5b4cf8b2-8c50-4c1e-9d1e-0d4b1c2f7a10"
+OTHER_ID = "9a0e0c2e-34f1-4d9b-b8a8-5d6a0a3e21c4"
+ADMIN_ROLE_ID = "1c8b0f8e-1f55-4b6e-8f0c-3a2a4a6c9b01"
+
+
+def sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeSession:
+    """Answers every SELECT with fixed rows and records the statements it was given."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return FakeResult(self.rows)
+
+    async def commit(self):
+        self.committed = True
+
+
+def test_apply_roles_writes_one_delete_and_insert_per_role():
+    session = FakeSession([("admin", ADMIN_ROLE_ID), ("user", "2f3c")])
+
+    applied = asyncio.run(apply_roles(session, {USER_ID: "admin", OTHER_ID: "admin", "x": "superuser"}))
+
+    assert applied == 2
+    statements = [sql(statement) for statement in session.statements[1:]]
+    assert len(statements) == 2
+    assert statements[0].startswith("DELETE FROM user_roles")
+    assert USER_ID in statements[0] and OTHER_ID in statements[0]
+    assert statements[1].startswith("INSERT INTO user_roles")
+    assert "ON CONFLICT DO NOTHING" in statements[1]
+
+
+class FakeAdminApi:
+    def __init__(self):
+        self.calls = []
+
+    def update_user_by_id(self, uid, attributes):
+        self.calls.append((uid, attributes, threading.current_thread() is threading.main_thread()))
+        return SimpleNamespace(user=SimpleNamespace(id=uid))
+
+
+@pytest.fixture
+def admin_api(monkeypatch):
+    api = FakeAdminApi()
+    monkeypatch.setattr(admin_helpers, "supabase_admin", SimpleNamespace(auth=SimpleNamespace(admin=api)))
+    return api
+
+
+def update_role(session, new_role="admin"):
+    return asyncio.run(admin_helpers.update_user_role_admin(USER_ID, new_role, {"role": "admin"}, session))
+
+
+def test_role_update_reads_the_old_role_from_the_replica(admin_api):
+    profile = SimpleNamespace(id=USER_ID, updated_at=None)
+    session = FakeSession([(profile, "user")])
+
+    response = update_role(session)
+
+    assert (response.old_role, response.new_role) == ("user", "admin")
+    assert "user_roles" in sql(session.statements[0])
+    # The blocking Supabase call ran off the event loop thread
+    assert admin_api.calls == [(USER_ID, {"user_metadata": {"role": "admin"}}, False)]
+    assert profile.updated_at is not None and session.committed
+
+
+def test_role_update_of_unknown_user_is_404_without_calling_supabase(admin_api):
+    with pytest.raises(HTTPException) as error:
+        update_role(FakeSession([]))
+
+    assert error.value.status_code == 404
+    assert admin_api.calls == []
@@ -0,0 +1,108 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from services import tracker_scheduler
+from services.scrape_queue import complete_watch_jobs
+from services.tracker_scheduler import TrackerRefreshScheduler
+
+URL = "https://results.example.edu/"
+LEASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class FakeSession:
+    """Answers the lease SELECT with the held watch IDs and records the bulk UPDATE."""
+
+    def __init__(self, held_ids):
+        self.held_ids = held_ids
+        self.updates = None
+        self.committed = False
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            self.updates = self.updates or params
+            return FakeResult([])
+        if self.updates is None:
+            return FakeResult(self.held_ids)
+        return FakeResult([])  # No subscribers to fan out to
+
+    async def commit(self):
+        self.committed = True
+
+
+def complete(held_ids, results):
+    session = FakeSession(held_ids)
+    leases = {watch_id: LEASE for watch_id in results}
+    asyncio.run(complete_watch_jobs(session, results, leases, interval_seconds=900, jitter_seconds=60))
+    return session
+
+
+def test_only_watches_still_leased_are_completed():
+    session = complete([1], {1: "Found: PASSED", 2: "Found: PASSED"})
+
+    assert [update["id"] for update in session.updates] == [1]
+    assert session.updates[0]["locked_until"] is None
+    assert session.updates[0]["next_run_at"] > datetime.now(timezone.utc)
+    assert session.committed
+
+
+def test_results_are_discarded_when_every_lease_expired():
+    session = complete([], {1: "Found: PASSED"})
+
+    assert session.updates is None
+    assert session.committed
+
+
+class FakeSessionFactory:
+    async def __aenter__(self):
+        return None
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def test_scheduler_caps_watches_claimed_across_url_groups(monkeypatch):
+    requested = []
+    refreshed = []
+
+    async def claim_due_watches(session, batch_size, lease_seconds, target_url=None):
+        requested.append(batch_size)
+        return [SimpleNamespace(id=len(requested) * 1000 + i, adapter="generic") for i in range(batch_size)]
+
+    async def refresh_claimed_watches(target_url, watches, interval_seconds, jitter_seconds):
+        refreshed.append(len(watches))
+
+    monkeypatch.setattr(tracker_scheduler, "claim_due_watches", claim_due_watches)
+    monkeypatch.setattr(tracker_scheduler, "refresh_claimed_watches", refresh_claimed_watches)
+    monkeypatch.setattr(tracker_scheduler, "AsyncSessionLocal", FakeSessionFactory)
+    monkeypatch.setattr(tracker_scheduler, "shared_fetch_limit", lambda target_url, adapter_name: None)
+    scheduler = TrackerRefreshScheduler(batch_size=20, group_size=1000, max_claimed=50)
+
+    async def main():
+        first = await scheduler._claim(20)
+        second = await scheduler._claim(20)
+        assert scheduler._claimed == 40
+        # A URL group may only top up to the process-wide cap, not to group_size...
+        await scheduler._refresh(URL, first)
+        # ...and completed groups hand their share back
+        await scheduler._refresh(URL, second)
+
+    asyncio.run(main())
+
+    assert requested == [20, 20, 10, 30]
+    assert refreshed == [30, 50]
+    assert scheduler._claimed == 0
@@ -0,0 +1,31 @@
+import pytest
+
+from routers.trackers.helpers import _match_search_terms, _parse_generic_page
+
+PAGES = [
+    "<html><body><p>Roll No 1702 PASSED</p><p>Roll No 17021 FAILED</p></body></html>",
+    "<html><head><title>Results</title><script>var x = '9999';</script></head>"
+    "<body><table><tr><td>RESULT declared</td></tr>\n<tr><td>Merit list 2025</td></tr></table></body></html>",
+    "<div>first line\n  second Line with Term  \nthird</div><div>term again</div>",
+    "<p>" + "filler " * 500 + "needle at the end</p>",
+]
+
+TERMS = ["1702", "17021", "passed", "RESULT", "merit LIST", "9999", "term", "second line", "needle", "absent", "e"]
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_one_pass_matches_single_term_parse(html):
+    statuses = _match_search_terms(html, TERMS)
+
+    for term in TERMS:
+        assert statuses[term] == _parse_generic_page(html, None, term), term
+
+
+def test_overlapping_and_repeated_terms():
+    html = "<p>abc</p>\n<p>abcd</p>\n<p>bcd</p>"
+    terms = ["abcd", "bcd", "abc", "ABC", "cd"]
+
+    statuses = _match_search_terms(html, terms)
+
+    for term in terms:
+        assert statuses[term] == _parse_generic_page(html, None, term), term
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight(ttl_seconds=0, max_entries=10)
+    calls = []
+
+    async def scrape():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "Found: PASSED"
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", scrape) for _ in range(20)))
+
+    results = asyncio.run(main())
+
+    assert results == ["Found: PASSED"] * 20
+    assert len(calls) == 1
+    assert flights.stats()["shared"] == 19
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight(ttl_seconds=0, max_entries=10)
+    calls = []
+
+    async def scrape(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key
+
+    async def main():
+        return await asyncio.gather(*(flights.run(key, lambda key=key: scrape(key)) for key in ("a", "b", "a")))
+
+    assert asyncio.run(main()) == ["a", "b", "a"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_result_cached_for_ttl_unless_not_cacheable():
+    flights = SingleFlight(ttl_seconds=30, max_entries=10)
+    calls = []
+
+    async def scrape():
+        calls.append(1)
+        return f"Error: attempt {len(calls)}" if len(calls) == 1 else "Found: PASSED"
+
+    async def main():
+        first = await flights.run("key", scrape, cacheable=lambda result: "Error" not in result)
+        second = await flights.run("key", scrape, cacheable=lambda result: "Error" not in result)
+        third = await flights.run("key", scrape, cacheable=lambda result: "Error" not in result)
+        return first, second, third
+
+    assert asyncio.run(main()) == ("Error: attempt 1", "Found: PASSED", "Found: PASSED")
+    assert len(calls) == 2
+
+
+def test_failure_is_shared_but_not_cached():
+    flights = SingleFlight(ttl_seconds=30, max_entries=10)
+    calls = []
+
+    async def scrape():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        results = await asyncio.gather(*(flights.run("key", scrape) for _ in range(5)), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flights.run("key", scrape)
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 2
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from services.watches import (
+    VALIDATION_FAILED,
+    VALIDATION_PENDING,
+    VALIDATION_VALID,
+    StatusChange,
+    fan_out_statuses,
+    get_or_create_watch,
+    is_error_status
+)
+
+
+class FakeSession:
+    """Answers the subscriber SELECT with fixed rows and records the bulk UPDATE."""
+
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.updates = None
+
+    async def execute(self, statement, params=None):
+        if params is None:
+            return iter(self.subscribers)
+        self.updates = params
+
+
+def fan_out(subscribers, results):
+    session = FakeSession(subscribers)
+    changes = asyncio.run(fan_out_statuses(session, results))
+    return changes, session.updates
+
+
+@pytest.mark.parametrize("status", [
+    "Error: Response body exceeds the 5242880 byte limit",
+    "Generic scraping error: Server error '500 Internal Server Error'",
+    "GNDU scraping error: timed out",
+    "Error: results.example.edu is rate limited (next request allowed in 3600s)",
+])
+def test_engine_failures_are_errors(status):
+    assert is_error_status(status)
+
+
+@pytest.mark.parametrize("status", ["Found: Roll 1702 PASSED...", "Term '1702' not found on page", "Content: declared"])
+def test_results_are_not_errors(status):
+    assert not is_error_status(status)
+
+
+def test_pending_tracker_is_validated_without_notification():
+    changes, updates = fan_out(
+        [(1, "ok", 10, None, VALIDATION_PENDING), (2, "broken", 11, None, VALIDATION_PENDING)],
+        {10: "Found: PASSED", 11: "Generic scraping error: boom"}
+    )
+
+    assert changes == []
+    assert updates == [
+        {"id": 1, "last_status": "Found: PASSED", "validation_status": VALIDATION_VALID},
+        {"id": 2, "last_status": "Generic scraping error: boom", "validation_status": VALIDATION_FAILED},
+    ]
+
+
+def test_failed_tracker_turns_valid_once_its_scrape_works():
+    changes, updates = fan_out(
+        [(1, "recovered", 10, "Error: boom", VALIDATION_FAILED), (2, "still broken", 11, "Error: boom", VALIDATION_FAILED)],
+        {10: "Found: PASSED", 11: "Error: boom"}
+    )
+
+    assert changes == []
+    assert updates == [{"id": 1, "last_status": "Found: PASSED", "validation_status": VALIDATION_VALID}]
+
+
+def test_valid_trackers_are_notified_of_changes_only():
+    changes, updates = fan_out(
+        [(1, "changed", 10, "Term '1702' not found on page", VALIDATION_VALID), (2, "same", 10, "Found: PASSED", VALIDATION_VALID)],
+        {10: "Found: PASSED"}
+    )
+
+    assert changes == [StatusChange(1, "changed", "Term '1702' not found on page", "Found: PASSED")]
+    assert updates == [{"id": 1, "last_status": "Found: PASSED"}]
+
+
+class UpsertSession:
+    """Records the watch upsert it is given."""
+
+    def __init__(self):
+        self.statement = None
+
+    async def execute(self, statement, params=None, execution_options=None):
+        self.statement = statement.compile(dialect=postgresql.dialect())
+        return self
+
+    def scalar_one(self):
+        return None
+
+
+def upsert(**kwargs):
+    session = UpsertSession()
+    asyncio.run(get_or_create_watch(
+        session, target_url="https://results.example.edu/", search_term="1702",
+        selector_or_pattern=None, adapter_name="generic", **kwargs
+    ))
+    return session.statement
+
+
+def test_watch_without_a_status_is_due_right_away():
+    statement = upsert()
+
+    assert "next_run_at" not in statement.params
+    assert "now()" in str(statement)
+
+
+def test_watch_validated_by_a_scrape_is_due_a_refresh_interval_later():
+    statement = upsert(last_status="Found: PASSED", interval_seconds=900, jitter_seconds=60)
+
+    delay = statement.params["next_run_at"] - datetime.now(timezone.utc)
+    assert timedelta(seconds=890) < delay <= timedelta(seconds=960)
+    # A conflicting (existing) watch takes the new schedule along with the new status
+    assert "next_run_at = CASE" in str(statement)
@@ -0,0 +1,67 @@
+"""
+Standalone scraper worker
+
+Consumes the Postgres scrape queue (scraping and WhatsApp notifications only)
+without serving the API, so scraper capacity can be sized and scaled apart from
+the API processes. Run it from the backend directory:
+
+    python -m worker
+
+API processes that leave scraping to dedicated workers should set
+TRACKER_REFRESH_ENABLED=false. Any number of workers can run at once; each due
+watch is still claimed by exactly one of them.
+"""
+import asyncio
+import logging
+import signal
+
+from config import AsyncSessionLocal, async_engine
+from services.tracker_scheduler import TrackerRefreshScheduler
+from services.http_client import close_async_client
+from services import regex_sandbox
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+async def run_worker() -> None:
+    """Run the scrape queue consumer until SIGINT/SIGTERM."""
+    if AsyncSessionLocal is None:
+        raise Exception("Database not configured")
+
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Signal handlers are not available on Windows event loops
+            pass
+
+    scheduler = TrackerRefreshScheduler()
+    scheduler.start()
+    logger.info("👷 Scraper worker running")
+
+    try:
+        await stop_event.wait()
+    finally:
+        logger.info("👷 Scraper worker shutting down")
+        await scheduler.stop()
+        await close_async_client()
+        regex_sandbox.shutdown()
+        await async_engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s"
+    )
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()